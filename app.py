@@ -33,20 +33,21 @@ size<   Size of file must be less than...
 before= File mustve been last modified before... (can interpret dates: separator = "-", supported formats: year-month-day, day-month-year and month-day-year)
 after=  File mustve been last modified after...
 on=     File mustve been last modified on... (exact date)
+kind=   Only searches files (kind=file) or directories (kind=dir)
 """
 
+import sys
+# measures the imports too, so it's created before them
+from modules.StartupProfile import StartupProfile
+profile = StartupProfile("--profile-startup" in sys.argv)
+
 import random
 import platform
-if platform.system() == "Linux": raise RuntimeError("This app does not run on Linux. Sorry Luke & DNA, get a real OS. 😉")
-import sys
 import os
-import queue
-import keyboard
 import subprocess
 import datetime
 import warnings
-from rich.traceback import install
-install()
+profile.mark("import standard library")
 from PyQt5.QtCore import(
     Qt,
     QTimer,
@@ -54,6 +55,7 @@ from PyQt5.QtCore import(
     QSize,
     QThread,
     QEvent,
+    QModelIndex,
 )
 from PyQt5.QtWidgets import(
     QApplication,
@@ -64,9 +66,9 @@ from PyQt5.QtWidgets import(
     QAction,
 )
 from PyQt5.QtGui import(
-    QIcon,
     QContextMenuEvent,
     QKeyEvent,
+    QImage,
     QPixmap
 )
 from typing import (
@@ -74,6 +76,7 @@ from typing import (
     Any,
     Dict
 )
+profile.mark("import PyQt5")
 from colorama import (
     Fore,
     Back,
@@ -83,11 +86,22 @@ import modules.FileManager as FileManager
 import modules.Logger as Logger
 import modules.UserData as UserData
 import modules.config as Config
-import modules.utils as utils
 import modules.OSM as osm
+from modules.AdaptiveDebounce import AdaptiveDebounce
+from modules.IconCache import IconCache
+from modules.MetadataService import (
+    FileMetadata,
+    MetadataService
+)
 from modules.Relevancy import Relevance
+from modules.ResultModel import (
+    PATH_ROLE,
+    ResultModel
+)
+from modules.ThumbnailService import ThumbnailService
 from modules.menus import menus
 from ui.bar import Ui_Form
+profile.mark("import modules")
 
 class SearchBar(QWidget):
     """This is the SearchBar
@@ -126,19 +140,17 @@ class SearchBar(QWidget):
         self.setWindowFlags(Qt.WindowType.FramelessWindowHint | Qt.WindowType.WindowStaysOnTopHint) # type: ignore  
         self.setFixedSize(1600, 384)
         
-        keyboard.add_hotkey("+".join([self.config.KEY1, self.config.KEY2]), self.toggleSignal.emit) # type: ignore
-        
         #####   DATABASE SETUP   ######
         
         self.dataset = {
             'hash': random.uniform(1, 2),
-            'current': 0,
+            'generation': 0,
+            'shards': {},
             'templates': {},
-            'templatesReverse': {},
-            'queue': queue.Queue(),
-            'files': {
-                "0": set()
-            },
+            'queues': {},
+            'files': {},
+            'dirs': {},
+            'tombstones': {'files': {}, 'dirs': {}},
         }
         self.userData: Dict[str, Any] = {
             'bookmarks':    [],
@@ -147,35 +159,29 @@ class SearchBar(QWidget):
         }
         
         self.logger = Logger.Logger(self)
+        # changes of the user data are written in the background
+        self.journal = UserData.UserDataJournal()
         
-        db = FileManager.FileDBLoader(self.logger).loadJSON()
-        if db:
-            self.dataset = db
-            self.logger.finishedScan = True
-        else:
-            del db
-            self.backgroundTask = FileManager.FileSpider(self.dataset, self.logger)
-            self.FileQueue = FileManager.FileDBInserter(self.dataset, self.logger)
-            
-            self.backgroundTask.start(QThread.Priority.HighestPriority)
-            self.FileQueue.start(QThread.Priority.HighPriority)
-        
-        data = UserData.loadData()
-        if data:
-            self.userData = data
+        # every volume is its own shard, they're either loaded from ./user/shards/ or crawled.
+        # they're started in `userDataLoaded()`, once the window is shown
+        self.volumes = FileManager.FileVolumeManager(self.dataset, self.logger, self.userData)
+        
+        # everything that waits for the index subscribes to this signal
+        self.volumes.indexed.connect(self.logger.scanFinished)
+        self.volumes.indexed.connect(self.indexingFinished)
+        self.volumes.started.connect(self.volumesStarted)
         
         #####   THREAD SETTINGS   ######
         
         self.reconstructWorker = FileManager.FileSearcher(self.dataset, self.logger)
-        self.fileAmountHelper = FileAmountUpdater(self)
         self.reconstructThread = QThread()
         
         self.reconstructWorker.moveToThread(self.reconstructThread)
         self.reconstructWorker.reconstruct.connect(self.filesFromPaths)
         
         self.reconstructThread.start(QThread.Priority.NormalPriority)
-        self.fileAmountHelper.start(QThread.Priority.LowestPriority)
         self.logger.start(QThread.Priority.LowestPriority)
+        self.form.aboutToQuit.connect(self.shutdown)
         
         self.toggleSignal.connect(self.toggleVisibility) # type: ignore
         
@@ -185,8 +191,23 @@ class SearchBar(QWidget):
         self.ui.setupUi(self)
         self.ui.textEdit.textChanged.connect(self.inputManager)
         
-        self.ui.searchResults.itemClicked.connect(self.openFile)
-        self.ui.searchResults.itemEntered.connect(self.displayPreview)
+        # files are only stat'ed in the background, the lists are updated once the metadata is there
+        self.metadata = MetadataService()
+        self.metadata.resolved.connect(self.decorateItems)
+        
+        # the results only hold paths, the view decorates the visible rows
+        self.results = ResultModel(self.metadata, self.getToolTip)
+        self.results.missing.connect(self.fileMissing)
+        self.ui.searchResults.setModel(self.results)
+        self.ui.searchResults.clicked.connect(self.openFile)
+        self.ui.searchResults.entered.connect(self.displayPreview)
+        
+        # previews are decoded in the background, the visible ones before they're hovered
+        self.previewPath: Union[str, None] = None
+        self.thumbnails = ThumbnailService()
+        self.thumbnails.ready.connect(self.showPreview)
+        self.results.modelReset.connect(lambda: QTimer.singleShot(0, self.prefetchPreviews))
+        self.ui.searchResults.verticalScrollBar().valueChanged.connect(self.prefetchPreviews)
         
         self.ui.bookmarks.itemClicked.connect(self.openFile)
         self.ui.bookmarks.itemEntered.connect(self.displayPreview)
@@ -194,6 +215,9 @@ class SearchBar(QWidget):
         self.ui.recentFiles.itemClicked.connect(self.openFile)
         self.ui.recentFiles.itemEntered.connect(self.displayPreview)
         
+        # the counters are updated by the index itself, the label only shows them
+        self.volumes.counters.changed.connect(self.displayFileAmount)
+        
         self.ui.tabs.currentChanged.connect(self.tabChangeEvent)
         self.ui.tabs.installEventFilter(self)
         
@@ -203,12 +227,95 @@ class SearchBar(QWidget):
         self.debounceTimer = QTimer()
         
         self.fadeTimer.setInterval(self.config.FADE_TIMER)
+        # the interval follows the search latency and the user's typing speed
+        self.debounce = AdaptiveDebounce()
         self.debounceTimer.setSingleShot(True)
         self.debounceTimer.setInterval(self.config.DEBOUNCE)
         self.debounceTimer.timeout.connect(self._emit_checkPaths)
         
         self.setupUi()
+        self.displayFileAmount()
         self.fadeIn()
+        self.registerHotkey()
+        profile.mark("window")
+        
+        # everything else is loaded once the window is shown
+        self.userDataLoader = UserDataLoader(self)
+        self.userDataLoader.loaded.connect(self.userDataLoaded)
+        QTimer.singleShot(0, self.loadInBackground)
+    
+    def registerHotkey(self) -> None:
+        """Registers the global hotkey which toggles the window.
+        
+        The keyboard module hooks into the OS when it's imported,
+        so it's only imported here, after the window is set up.
+        """
+        try:
+            import keyboard
+            keyboard.add_hotkey("+".join([self.config.KEY1, self.config.KEY2]), self.toggleSignal.emit) # type: ignore
+        except (ImportError, OSError) as e:
+            # global hotkeys need root on Linux, the bar still works without them
+            warnings.warn(f"Couldn't register the hotkey ({e})", Warning)
+    
+    def loadInBackground(self) -> None:
+        """Called by the event loop once the window is shown.
+        
+        Installs the rich tracebacks and starts loading the user data,
+        the volumes are started once it's loaded.
+        """
+        try:
+            from rich.traceback import install
+            install()
+        except ImportError:
+            pass
+        profile.mark("tracebacks")
+        self.userDataLoader.start()
+    
+    def userDataLoaded(
+        self,
+        data: dict[str, Any]
+    ) -> None:
+        """Takes over the loaded user data and starts the volumes.
+        
+        The user data is loaded before the volumes are started so the spider
+        can crawl the user's directories first. The dict is updated instead of
+        replaced, since the FileVolumeManager already holds it. Anything the
+        user did before it was loaded is kept, clicks are replayed onto the loaded relevance.
+
+        Args:
+            data (dict[str, Any]): user data, empty if there's none yet
+        """
+        if data:
+            bookmarks = data['bookmarks'] + [path for path in self.userData['bookmarks'] if path not in data['bookmarks']]
+            recent = self.userData['recent'] + [path for path in data['recent'] if path not in self.userData['recent']]
+            for path, session in self.userData['relevancy'].items():
+                loaded = data['relevancy'].get(path)
+                if loaded is None:
+                    data['relevancy'][path] = session
+                    continue
+                # the clicks of this session are added to the loaded history instead of replacing it
+                for at in session.recent:
+                    loaded.click(at)
+                self.journal.record('relevancy', loaded.toDict(), path)
+            data['bookmarks'] = bookmarks
+            data['recent'] = recent[:20]
+            # the journal only got the lists of this session so far
+            if self.userData['bookmarks'] or self.userData['recent']:
+                self.journal.record('bookmarks', list(bookmarks))
+                self.journal.record('recent', list(data['recent']))
+            self.userData.clear()
+            self.userData.update(data)
+            if self.ui.tabs.currentIndex():
+                self.tabChangeEvent()
+        profile.mark("user data")
+        
+        self.volumes.start()
+    
+    def volumesStarted(self) -> None:
+        """Called once the shards are mounted and the crawls started
+        """
+        profile.mark("shards")
+        profile.report()
     
     @property
     def files(self) -> int:
@@ -217,7 +324,7 @@ class SearchBar(QWidget):
         Returns:
             int: Amount of files
         """
-        return sum(len(files) for files in list(self.dataset['files'].values()))
+        return self.volumes.counters.files
     
     @property
     def templates(self) -> int:
@@ -226,12 +333,12 @@ class SearchBar(QWidget):
         Returns:
             int: amount of templates
         """
-        return len(self.dataset['templates'])
+        return self.volumes.counters.templates
     
     def setupUi(self) -> None:
         """Sets a few settings and connections for the UI widgets
         """
-        with open(f"{self.osm.exeDir()}\\ui\\style.css", "r") as css:
+        with open(os.path.join(self.osm.exeDir(), "ui", "style.css"), "r") as css:
             self.UIStyle = css.read()
         
         self.ui.searchResults.setMouseTracking(True)
@@ -265,45 +372,19 @@ class SearchBar(QWidget):
         else:
             warnings.warn(f"{Fore.LIGHTRED_EX}No function for tab index '{tab}' found.{Fore.RESET}")
     
-    def rebuildPath(
-        self, 
-        data: Union[tuple[str, str], str],
-        strict: bool = True
-    ) -> str:
-        """Rebuilds paths if the given string is not a path but rather a display-name.
-        
-        There are multiple formats that can be transformed into a real path.
+    def pathOf(
+        self,
+        item: Union[QListWidgetItem, QModelIndex]
+    ) -> Union[str, None]:
+        """Returns the full path of a list item or a row of the results
 
         Args:
-            data (Union[tuple[str, str], str]): Can be for example ("1293", "hello.txt")
-            strict (bool, optional): If strict it automatically raises error if format can't be found. Defaults to True.
-
-        Raises:
-            NotImplementedError: If format is not supported yet it will raise an error.
-            TypeError: If type is not supported
+            item (Union[QListWidgetItem, QModelIndex]): item or index of the row
 
         Returns:
-            str: Full path to file
-        """
-        if type(data) is tuple:
-            template = data[0]
-            filename = data[1]
-            path = self.dataset['templates'][template]
-        elif type(data) is str:
-            if "(" in data:
-                split = data.split(" ")
-                filename = split[0]
-                path = " ".join(split[1:len(split)])
-                path = path.strip("()")
-            else:
-                if strict:
-                    raise NotImplementedError("Couldn't find appropriate path-rebuilding.")
-                else:
-                    return data
-        else:
-            raise TypeError("Type not supported by rebuildPath()\tSupported types:\ttuple\tstr")
-        
-        return os.path.join(path, filename)
+            Union[str, None]: Full path to the file or None for messages like "Loading..."
+        """
+        return item.data(PATH_ROLE)
     
     def setRelevance(
         self, 
@@ -317,27 +398,24 @@ class SearchBar(QWidget):
             saveRelevance (bool, optional): If the function should save it in the userData dict. Defaults to False.
         """
         if not path in self.userData['relevancy']:
-            obj = Relevance(path)
-            self.userData['relevancy'][path] = obj
-        else:
-            obj: Relevance = self.userData['relevancy'][path]
-            now = datetime.datetime.today()
-            obj.clicks.append(now)
+            self.userData['relevancy'][path] = Relevance(path)
+        obj: Relevance = self.userData['relevancy'][path]
+        obj.click()
         
         if saveRelevance:
-            UserData.saveData(self.userData)
+            self.journal.record('relevancy', obj.toDict(), path)
     
     def getRelevance(
         self, 
         path: str
-    ) -> int:
+    ) -> float:
         """Returns the relevance of a file's path
 
         Args:
             path (str): Full path to the file
 
         Returns:
-            int: Relevance score
+            float: Relevance score
         """
         try:
             obj: Relevance = self.userData['relevancy'][path]
@@ -355,14 +433,17 @@ class SearchBar(QWidget):
     def sortRelevance(self) -> list[Relevance]:
         """Sorts all the files saved in the relevance dictionary 
         by their relevance score.
+        
+        Every score is calculated once, for the same point in time.
 
         Returns:
             list[Relevance]: Sorted list of 'Relevance' objects.
         """
         try:
             relevances: dict[str, Relevance] = self.userData['relevancy']
+            now = datetime.datetime.today()
             l = list(relevances.values())
-            l.sort(key=lambda r: r.relevanceScore, reverse=True)
+            l.sort(key=lambda r: r.relevanceScoreAt(now), reverse=True)
             return l
         except:
             warnings.warn(
@@ -406,7 +487,7 @@ class SearchBar(QWidget):
         self.userData['recent'].insert(0, path)
         
         if saveRecent:
-            UserData.saveData(self.userData)
+            self.journal.record('recent', list(self.userData['recent']))
     
     def refreshRecent(self) -> None:
         """Refreshes ListWidget with the most recently opened files.
@@ -416,34 +497,32 @@ class SearchBar(QWidget):
         recents = self.userData['recent']
         if recents:
             for recent in recents:
-                if os.path.exists(recent):
-                    self.addFileItem(recent, self.ui.recentFiles)
-                else:
-                    warnings.warn(f"File '{recent}' does {Fore.LIGHTRED_EX}not exist{Style.RESET_ALL} anymore: {Fore.LIGHTGREEN_EX}skipping file.{Style.RESET_ALL}")
-                    continue
+                self.addFileItem(recent, self.ui.recentFiles)
         else:
             warnings.warn(f"Recent files list does {Fore.LIGHTRED_EX}not exist or is empty.{Style.RESET_ALL}")
             return
     
     def addToBookmarks(
         self, 
-        item: QListWidgetItem, 
+        item: Union[QListWidgetItem, QModelIndex], 
         saveBookmarks: bool = False
     ) -> None:
         """Adds the file to the bookmarked files.
 
         Args:
-            item (QListWidgetItem): Selected item
+            item (Union[QListWidgetItem, QModelIndex]): Selected item
             saveBookmarks (bool, optional): If it should be saved to the bookmarks. Defaults to False.
         """
-        fullPath = self.rebuildPath(item.text())
+        fullPath = self.pathOf(item)
+        if not fullPath:
+            return
         if fullPath in self.userData['bookmarks']:
             pass
         else:
             self.userData['bookmarks'].append(fullPath)
         
         if saveBookmarks:
-            UserData.saveData(self.userData)
+            self.journal.record('bookmarks', list(self.userData['bookmarks']))
         else:
             return
     
@@ -458,11 +537,11 @@ class SearchBar(QWidget):
             item (QListWidgetItem): Selected item
             saveBookmarks (bool, optional): If it should be saved to the bookmarks. Defaults to False.
         """
-        fullPath = self.rebuildPath(item.text())
+        fullPath = self.pathOf(item)
         self.userData['bookmarks'].remove(fullPath)
         
         if saveBookmarks:
-            UserData.saveData(self.userData)
+            self.journal.record('bookmarks', list(self.userData['bookmarks']))
         else:
             pass
         self.refreshBookmarks()
@@ -475,11 +554,7 @@ class SearchBar(QWidget):
         bookmarks = self.userData['bookmarks']
         if bookmarks:
             for path in bookmarks:
-                if os.path.exists(path):
-                    self.addFileItem(path, self.ui.bookmarks)
-                else:
-                    warnings.warn(f"File '{path}' does {Fore.LIGHTRED_EX}not exist{Style.RESET_ALL} anymore: {Fore.LIGHTGREEN_EX}skipping file.{Style.RESET_ALL} (Bookmarks)")
-                    continue
+                self.addFileItem(path, self.ui.bookmarks)
         else:
             warnings.warn(f"Bookmarks list does {Fore.LIGHTRED_EX}not exist or is empty.{Style.RESET_ALL}")
             return
@@ -499,42 +574,106 @@ class SearchBar(QWidget):
             - Filename
             - File size
             - File relevance
+        
+        If the file's metadata isn't cached yet, the item gets the icon of
+        its extension and is decorated by `decorateItems()` once it's fetched.
+        Files that don't exist anymore are removed again then.
 
         Args:
             path (str): Full path to file
             listWidget (QListWidget): ListWidget the item should be added to.
         """
-        if not os.path.exists(path):
-            warnings.warn(f"File '{path}' does {Fore.LIGHTRED_EX}not exist{Style.RESET_ALL}. Can't add file item.")
+        metadata = self.metadata.get(path)
+        if metadata is not None and not metadata.exists:
+            self.fileMissing(path)
             return
         
         template, filename = self.osm.splitPath(path)
         displayText = filename + f" ({template})"
         item = QListWidgetItem(displayText)
+        item.setData(PATH_ROLE, path)
         
-        icon = QIcon(utils.getIcon(path))
-        item.setIcon(icon)
-        item.setToolTip(self.getToolTip(path))
+        if metadata is None:
+            item.setIcon(IconCache.instance().icon(path, False))
+        else:
+            self.decorateItem(item, metadata)
         
         listWidget.addItem(item)
     
+    def decorateItem(
+        self, 
+        item: QListWidgetItem, 
+        metadata: FileMetadata
+    ) -> None:
+        """Sets the icon and tool-tip of an item
+
+        Args:
+            item (QListWidgetItem): item of a file
+            metadata (FileMetadata): metadata of the file
+        """
+        path = item.data(PATH_ROLE)
+        item.setIcon(IconCache.instance().icon(path, metadata.isDir))
+        item.setToolTip(self.getToolTip(path, metadata))
+    
+    def decorateItems(
+        self, 
+        path: str, 
+        metadata: FileMetadata
+    ) -> None:
+        """Decorates the items of a file in the bookmarks, recent and
+        relevance lists once its metadata was fetched.
+        Items of files that don't exist anymore are removed.
+        
+        The search results update themselves.
+
+        Args:
+            path (str): Full path to the file
+            metadata (FileMetadata): metadata of the file
+        """
+        removed = False
+        for listWidget in (self.ui.bookmarks, self.ui.recentFiles, self.ui.relevantFiles):
+            for row in reversed(range(listWidget.count())):
+                item = listWidget.item(row)
+                if item.data(PATH_ROLE) != path:
+                    continue
+                if metadata.exists:
+                    self.decorateItem(item, metadata)
+                else:
+                    listWidget.takeItem(row)
+                    removed = True
+        if removed:
+            self.fileMissing(path)
+    
+    def fileMissing(
+        self, 
+        path: str
+    ) -> None:
+        """Called when a file that's shown doesn't exist anymore
+
+        Args:
+            path (str): Full path to the file
+        """
+        warnings.warn(f"File '{path}' does {Fore.LIGHTRED_EX}not exist{Style.RESET_ALL} anymore: {Fore.LIGHTGREEN_EX}skipping file.{Style.RESET_ALL}")
+        # the index is outdated, so the file won't show up in the next search
+        self.volumes.locator.removePathLater(path)
+    
     def openFile(
         self, 
-        item: Union[QListWidgetItem, None] = None,
+        item: Union[QListWidgetItem, QModelIndex, None] = None,
         addToData: bool = True
     ) -> None:
         """Opens file of given item or currently selected item and saves it to
         userData dict if `addToData = True`
 
         Args:
-            item (Union[QListWidgetItem, None], optional): Listwidget item. Defaults to None.
+            item (Union[QListWidgetItem, QModelIndex, None], optional): Listwidget item or row of the results. Defaults to None.
             addToData (bool): If the file should be added to the userData. Defaults to True.
         """
-        if not item:
-            item = self.ui.searchResults.currentItem()
+        if item is None:
+            item = self.ui.searchResults.currentIndex()
         
-        if item is not None:
-            path = self.rebuildPath(item.text())
+        path = self.pathOf(item)
+        if path:
             try:
                 if platform.system() == 'Windows':
                     os.startfile(path)
@@ -549,40 +688,38 @@ class SearchBar(QWidget):
             return
         
         if addToData:
-            self.addToRecent(path)
-            self.setRelevance(path)
-            UserData.saveData(self.userData)
+            self.addToRecent(path, True)
+            self.setRelevance(path, True)
         else:
             pass
     
-    def openDirectory(self, item: Union[QListWidgetItem, None] = None, addToData: bool = True) -> None:
+    def openDirectory(self, item: Union[QListWidgetItem, QModelIndex, None] = None, addToData: bool = True) -> None:
         """Opens the directory with the path of the current
         item in the listWidget or a given item and saves it to
         userData dict if `addToData = True`
 
         Args:
-            item (Union[QListWidgetItem, None], optional): Listwidget item. Defaults to None.
+            item (Union[QListWidgetItem, QModelIndex, None], optional): Listwidget item or row of the results. Defaults to None.
             addToData (bool): If the file should be added to the userData. Defaults to True.
         """
-        if not item:
-            item = self.ui.searchResults.currentItem()
+        if item is None:
+            item = self.ui.searchResults.currentIndex()
         
-        if item is not None:
-            path = self.rebuildPath(item.text())
+        path = self.pathOf(item)
+        if path:
             folder, filename = self.osm.splitPath(path)
             del filename
             try:
-                subprocess.run(['explorer', folder], check=False)
-            except subprocess.CalledProcessError as e:
+                self.osm.openFolder(folder)
+            except (OSError, subprocess.CalledProcessError) as e:
                 print(e)
             self.fadeOut()
         else:
             return
         
         if addToData:
-            self.addToRecent(path)
-            self.setRelevance(path)
-            UserData.saveData(self.userData)
+            self.addToRecent(path, True)
+            self.setRelevance(path, True)
         else:
             pass
     
@@ -602,6 +739,18 @@ class SearchBar(QWidget):
             return
         self.fadeOut()
     
+    def refreshDrive(
+        self, 
+        path: str
+    ) -> None:
+        """Crawls the drive of a path again, e.g. after
+        files were changed while FlashBar wasn't running
+
+        Args:
+            path (str): path
+        """
+        self.volumes.refreshPath(path)
+    
     def switchTab(
         self, 
         change: int
@@ -647,18 +796,18 @@ class SearchBar(QWidget):
                 self.fadeOut()
         if event.modifiers() == Qt.KeyboardModifier.ControlModifier and event.key() == Qt.Key.Key_Return:
             try:
-                topItem = self.ui.searchResults.item(0)
+                topItem = self.results.index(0)
                 self.openFile(topItem)
             except:
                 return
         elif event.modifiers() == Qt.KeyboardModifier.AltModifier and event.key() == Qt.Key.Key_Return:
             try:
-                topItem = self.ui.searchResults.item(0)
+                topItem = self.results.index(0)
                 self.openDirectory(topItem)
             except:
                 return
         elif event.modifiers() == Qt.KeyboardModifier.ControlModifier and event.key() == Qt.Key.Key_Backspace:
-            self.ui.searchResults.clear()
+            self.results.clear()
         elif event.key() == Qt.Key.Key_Right:
             self.switchTab(1)
         elif event.key() == Qt.Key.Key_Left:
@@ -726,41 +875,71 @@ class SearchBar(QWidget):
     def _emit_checkPaths(self) -> None:
         """Checks for possible paths the user is looking for
         if the input is longer than 2 characters
+        
+        If a search is still running, the input is searched
+        once its results are there.
         """
         text = self.ui.textEdit.toPlainText()
+        self.volumes.governor.resume("typing")
         
+        if self.debounce.submit(text):
+            self.startSearch(text)
+    
+    def startSearch(
+        self, 
+        text: str
+    ) -> None:
+        """Lets the FileSearcher search for the input
+
+        Args:
+            text (str): input of the search bar
+        """
+        # the crawl waits until the results are there
+        self.volumes.governor.pause("search")
         
-        self.ui.searchResults.clear()
-        self.ui.searchResults.addItem("Loading...")
+        # older results stay visible until the new ones are there
+        if not self.results.entries:
+            self.results.setMessage("Loading...")
         self.reconstructWorker.checkPaths.emit(text)
     
     def inputManager(self) -> None:
         """Starts the debounce timer, mostly to reduce CPU usage
+        and pauses the crawl while the user is typing.
+        
+        The timer waits shorter the faster searches are.
         """
-        self.debounceTimer.start()
+        self.volumes.governor.pause("typing")
+        self.debounceTimer.start(self.debounce.keystroke())
     
     def filesFromPaths(
         self, 
-        paths: list
+        entries: list,
+        templates: dict[str, str]
     ) -> None:
-        """Adds each file from the list of paths to the listWidget
-        
-        First, it clears the listWidget to ensure the items added to
-        the listWidget are only the ones for the corresponding SearchBar input
+        """Replaces the search results with the found entries
         
-        it creates a QListWidgetItem and a QIcon and then adds
-        them to the listWidget
+        The model only stores the entries, paths, icons and tool-tips
+        are created by the model once a row becomes visible.
 
         Args:
-            paths (list): _description_
+            entries (list): (template ID, name) of the results
+            templates (dict[str, str]): templates of the searched snapshot
         """
-        self.ui.searchResults.clear()
+        self.volumes.governor.resume("search")
         
-        if len(paths) <= 0:
-            self.ui.searchResults.addItem("No results found.")
+        if len(entries) <= 0:
+            self.results.setMessage("No results found.")
         else:
-            for path in paths:
-                self.addFileItem(path, self.ui.searchResults)
+            self.results.setEntries(entries, templates)
+        
+        queued = self.debounce.finished()
+        stats = self.debounce.stats
+        self.logger.log.debug(
+            "Search latency p50 %.1f ms, typing gap p50 %.1f ms, debounce %d ms, %d queries coalesced",
+            stats['latency'], stats['gap'], stats['interval'], stats['coalesced']
+        )
+        if queued is not None:
+            self.startSearch(queued)
     
     def formattedSize(
         self, 
@@ -790,30 +969,67 @@ class SearchBar(QWidget):
     
     def displayPreview(
         self, 
-        item: QListWidgetItem
+        item: Union[QListWidgetItem, QModelIndex]
     ) -> None:
         """Displays a preview of an image if the extension is in
         the list of image extensions
+        
+        The thumbnail is decoded in the background if it isn't cached,
+        `showPreview()` shows it once it's ready.
 
         Args:
-            item (QListWidgetItem): _description_
+            item (Union[QListWidgetItem, QModelIndex]): hovered item or row of the results
         """
-        path = self.rebuildPath(item.text(), False)
-        if path.endswith(tuple(utils.imageExts)):
-            pixmap = QPixmap(path).scaled(256, 256, Qt.AspectRatioMode.KeepAspectRatio)
-            self.ui.previewLabel.setPixmap(pixmap)
+        path = self.pathOf(item)
+        if path and self.thumbnails.isImage(path):
+            self.previewPath = path
+            image = self.thumbnails.get(path)
+            if image is not None:
+                self.showPreview(path, image)
+                return
+            self.thumbnails.request(path)
         else:
-            self.ui.previewLabel.setPixmap(QPixmap())
+            self.previewPath = None
+            self.thumbnails.cancelRequest()
+        self.ui.previewLabel.setPixmap(QPixmap())
+    
+    def showPreview(
+        self, 
+        path: str, 
+        image: QImage
+    ) -> None:
+        """Shows a decoded thumbnail if its image is still hovered
+
+        Args:
+            path (str): Full path to the image
+            image (QImage): thumbnail
+        """
+        if path == self.previewPath:
+            self.ui.previewLabel.setPixmap(QPixmap.fromImage(image))
+    
+    def prefetchPreviews(self) -> None:
+        """Lets the thumbnails of the visible search results be decoded
+        """
+        view = self.ui.searchResults
+        first = view.indexAt(view.viewport().rect().topLeft())
+        if not first.isValid():
+            return
+        last = view.indexAt(view.viewport().rect().bottomLeft())
+        lastRow = last.row() if last.isValid() else self.results.rowCount() - 1
+        paths = [self.results.index(row).data(PATH_ROLE) for row in range(first.row(), lastRow + 1)]
+        self.thumbnails.prefetch([path for path in paths if path])
     
     def getToolTip(
         self, 
-        path: str
+        path: str,
+        metadata: FileMetadata
     ) -> str:
         """Creates the tool-tip for a listWidget's item
         and its corresponding file
 
         Args:
             path (str): path to the file
+            metadata (FileMetadata): metadata of the file
 
         Returns:
             str: tool-tip string
@@ -826,9 +1042,9 @@ class SearchBar(QWidget):
         
         template, name = self.osm.splitPath(path)
         del template
-        fileSize = self.formattedSize(os.path.getsize(path))
+        fileSize = self.formattedSize(metadata.size)
         relevance = self.getRelevance(path)
-        return f"Extension:\t{extension}\nFilename:\t{name}\nFile size:\t{fileSize}\nRelevance:\t{relevance}"
+        return f"Extension:\t{extension}\nFilename:\t{name}\nFile size:\t{fileSize}\nRelevance:\t{relevance:.2f}"
     
     def _nextFadeStep(
         self, 
@@ -856,7 +1072,7 @@ class SearchBar(QWidget):
         """Toggles the visibility of the window
         """
         self.ui.textEdit.clear()
-        self.ui.searchResults.clear()
+        self.results.clear()
         self.ui.previewLabel.clear()
         
         if self.isVisible():
@@ -868,32 +1084,52 @@ class SearchBar(QWidget):
             self.fadeIn()
             self.ui.textEdit.setFocus()
     
-    def displayFileAmount(self) -> None:
-        self.ui.fileLabel.setText(f"{self.files:,} Files")
+    def displayFileAmount(
+        self, 
+        totals: Union[dict[str, int], None] = None
+    ) -> None:
+        """Shows the amount of files
+
+        Args:
+            totals (Union[dict[str, int], None], optional): totals sent by the counters. Defaults to None.
+        """
+        files = totals['files'] if totals is not None else self.files
+        self.ui.fileLabel.setText(f"{files:,} Files")
+    
+    def indexingFinished(self) -> None:
+        """Called once the FileDBInserter indexed every file.
+        
+        The label is updated one last time.
+        """
+        self.displayFileAmount()
+    
+    def shutdown(self) -> None:
+        """Stops every background thread before the application quits.
+        
+        A running crawl is cancelled without saving, a DB that is
+        currently being saved is waited for so it doesn't get corrupted.
+        """
+        self.logger.log.debug("Shutting down")
+        self.volumes.stop()
+        self.metadata.stop()
+        self.thumbnails.stop()
+        self.journal.stop()
+        
+        self.logger.scanFinished()
+        self.logger.wait()
+        self.reconstructThread.quit()
+        self.reconstructThread.wait()
 
-class FileAmountUpdater(QThread):
-    """Updates the amount of files in a seperate thread
+class UserDataLoader(QThread):
+    """Loads the user data in a seperate thread,
+    so the window doesn't wait for it
 
     **Inherits from QThread**
     """
-    def __init__(
-        self, 
-        parent: SearchBar
-    ) -> None:
-        super().__init__(parent)
-        self.parentObject = parent
-        self.running = True
-    
-    def run(self):
-        while self.running:
-            if self.parentObject.isVisible():
-                self.parentObject.displayFileAmount()
-            else:
-                self.msleep(500)
-            self.msleep(50)  # update every 0.05 seconds
+    loaded = pyqtSignal(dict)
     
-    def stop(self):
-        self.running = False
+    def run(self) -> None:
+        self.loaded.emit(UserData.loadData() or {})
 
 if __name__ == "__main__":
     form = QApplication(sys.argv)
@@ -952,7 +1188,7 @@ if __name__ == "__main__":
 #           - Menus are now in seperate file lol                                            (DONE)
 #       - More settings                                                                     (IN PROGRESS)
 #       NEXT MAJOR UPDATE:  
-#           - Show directories too, not just files
+#           - Show directories too, not just files                                          (DONE)
 #           - Show overlap and relevancy of files
 #           - Lite Mode: Instant look-up
 #           - Also do a look-up thing for the filenames?    <-- I have no clue what I meant with this
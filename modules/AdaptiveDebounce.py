@@ -0,0 +1,158 @@
+# FlashBar - ./modules/AdaptiveDebounce.py -> Decides when a search is started while the user types.
+# Copyright (C) 2025  Florian, Floerianc on Github (https://www.github.com/floerianc)
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import time
+import statistics
+from collections import deque
+from typing import (
+    Any,
+    Union
+)
+import modules.config as Config
+
+# amount of searches and keystrokes the medians are taken from
+HISTORY = 32
+# pauses between keystrokes longer than this (ms) are a new query, not typing speed
+MAX_GAP = 1500
+# a search without results after this many seconds is treated as lost
+STALE_SEARCH = 5.0
+
+class AdaptiveDebounce:
+    """Decides how long to wait after a keystroke before searching.
+
+    It keeps the median (p50) latency of the last searches and the
+    median time between the user's keystrokes. If a search is usually
+    done before the next keystroke, searching right away costs nothing,
+    so it waits only MIN_DEBOUNCE. Otherwise it waits a bit longer than
+    the user's typing gap, so it searches once the user pauses, but never
+    longer than DEBOUNCE.
+
+    Only one search runs at a time. Queries made while a search is
+    running are coalesced, only the last one is searched afterwards.
+    """
+    def __init__(self) -> None:
+        """Initializes the AdaptiveDebounce and loads its limits from the config
+        """
+        self.config = Config.Config('Control')
+        self.latencies: deque[float] = deque(maxlen=HISTORY)
+        self.gaps: deque[float] = deque(maxlen=HISTORY)
+        self.lastKeystroke: Union[float, None] = None
+        self.started: Union[float, None] = None
+        self.queued: Union[str, None] = None
+        self.coalesced = 0
+
+    @property
+    def latency(self) -> float:
+        """Returns the median latency of the last searches
+
+        Returns:
+            float: latency in ms, 0 if nothing was searched yet
+        """
+        return statistics.median(self.latencies) if self.latencies else 0.0
+
+    @property
+    def gap(self) -> float:
+        """Returns the median time between the last keystrokes
+
+        Returns:
+            float: gap in ms, DEBOUNCE if the user didn't type yet
+        """
+        return statistics.median(self.gaps) if self.gaps else float(self.config.DEBOUNCE)
+
+    @property
+    def interval(self) -> int:
+        """Returns how long to wait after a keystroke before searching
+
+        Returns:
+            int: interval in ms, between MIN_DEBOUNCE and DEBOUNCE
+        """
+        minimum = min(self.config.MIN_DEBOUNCE, self.config.DEBOUNCE)
+        if self.latency <= self.gap:
+            return minimum
+        return int(min(self.config.DEBOUNCE, max(minimum, self.gap * 1.5)))
+
+    @property
+    def busy(self) -> bool:
+        """Returns True if a search is running
+
+        Returns:
+            bool: True if the results of the last search aren't there yet
+        """
+        return self.started is not None and time.perf_counter() - self.started < STALE_SEARCH
+
+    def keystroke(self) -> int:
+        """Remembers the time of a keystroke
+
+        Returns:
+            int: interval in ms to wait before searching
+        """
+        now = time.perf_counter()
+        if self.lastKeystroke is not None:
+            gap = (now - self.lastKeystroke) * 1000
+            if gap <= MAX_GAP:
+                self.gaps.append(gap)
+        self.lastKeystroke = now
+        return self.interval
+
+    def submit(
+        self,
+        query: str
+    ) -> bool:
+        """Called once the interval is over. Queues the query if a search is running.
+
+        Args:
+            query (str): text of the search bar
+
+        Returns:
+            bool: True if the query should be searched now
+        """
+        if self.busy:
+            if self.queued is not None:
+                self.coalesced += 1
+            self.queued = query
+            return False
+        self.queued = None
+        self.started = time.perf_counter()
+        return True
+
+    def finished(self) -> Union[str, None]:
+        """Called when the results of a search are there
+
+        Returns:
+            Union[str, None]: the query queued meanwhile, which should be searched now
+        """
+        if self.started is not None:
+            self.latencies.append((time.perf_counter() - self.started) * 1000)
+            self.started = None
+        queued = self.queued
+        self.queued = None
+        if queued is not None:
+            self.started = time.perf_counter()
+        return queued
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Returns the current state for logging
+
+        Returns:
+            dict[str, Any]: median latency and typing gap in ms, the interval and how many queries were coalesced
+        """
+        return {
+            'latency': self.latency,
+            'gap': self.gap,
+            'interval': self.interval,
+            'coalesced': self.coalesced,
+        }
@@ -0,0 +1,186 @@
+# FlashBar - ./modules/FileManager/FileBatchQueue.py -> Queue between the spider and the inserter.
+# Copyright (C) 2025  Florian, Floerianc on Github (https://www.github.com/floerianc)
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import sys
+import time
+import queue
+import threading
+from collections import deque
+from typing import (
+    Any,
+    Union
+)
+import modules.config as Config
+
+# rough memory overhead of one str object plus its slot in the list
+STR_OVERHEAD = sys.getsizeof("") + 8
+
+# put into the queue by `finish()`, tells the inserter that no more batches will come
+END_OF_CRAWL = None
+
+class FileBatchQueue:
+    """A queue for batches of files which is bounded by the
+    amount of memory the queued batches take up instead of the
+    amount of batches.
+
+    If the spider is faster than the inserter, `put()` blocks until
+    the inserter caught up again, so the batches can't pile up in memory.
+
+    It also keeps track of the depth and how long the spider had to wait,
+    so the Logger can tell us if the BATCH_SIZE is too big or too small.
+    """
+    def __init__(self) -> None:
+        """Initializes the FileBatchQueue and loads its
+        memory budget (QUEUE_BUDGET in MB) from the config
+        """
+        self.config = Config.Config('Spider')
+        self.budget = self.config.QUEUE_BUDGET * 1024 * 1024
+        self.batches: deque[tuple[Any, int]] = deque()
+        self.lock = threading.Lock()
+        self.notEmpty = threading.Condition(self.lock)
+        self.notFull = threading.Condition(self.lock)
+
+        self.queuedBytes = 0
+        self.peakBytes = 0
+        self.stalls = 0
+        self.stallTime = 0.0
+
+    def estimateSize(
+        self,
+        batch: Any
+    ) -> int:
+        """Estimates how many bytes a batch of files takes up
+
+        Args:
+            batch (Any): list of (directory, file names, subdirectory names)
+
+        Returns:
+            int: estimated amount of bytes
+        """
+        return sum(
+            len(directory) + sum(map(len, names)) + sum(map(len, dirs)) + (len(names) + len(dirs) + 1) * STR_OVERHEAD
+            for directory, names, dirs in batch
+        )
+
+    def put(
+        self,
+        batch: Any
+    ) -> None:
+        """Puts a batch into the queue. Blocks while the queue
+        is over its budget.
+
+        A single batch bigger than the whole budget is still let through
+        if the queue is empty, otherwise it would block forever.
+
+        Args:
+            batch (Any): batch of (directory, file names, subdirectory names)
+        """
+        size = self.estimateSize(batch)
+        with self.notFull:
+            if self.queuedBytes and self.queuedBytes + size > self.budget:
+                self.stalls += 1
+                stallStart = time.perf_counter()
+                while self.queuedBytes and self.queuedBytes + size > self.budget:
+                    self.notFull.wait()
+                self.stallTime += time.perf_counter() - stallStart
+
+            self.batches.append((batch, size))
+            self.queuedBytes += size
+            self.peakBytes = max(self.peakBytes, self.queuedBytes)
+            self.notEmpty.notify()
+
+    def get(
+        self,
+        block: bool = True,
+        timeout: Union[float, None] = None
+    ) -> Any:
+        """Takes the oldest batch out of the queue
+
+        Args:
+            block (bool, optional): If it should wait for a batch. Defaults to True.
+            timeout (Union[float, None], optional): Maximum amount of seconds to wait. Defaults to None.
+
+        Raises:
+            queue.Empty: If there's no batch in time (same as queue.Queue)
+
+        Returns:
+            Any: batch of files
+        """
+        with self.notEmpty:
+            if not self.notEmpty.wait_for(lambda: self.batches, timeout if block else 0):
+                raise queue.Empty
+            batch, size = self.batches.popleft()
+            self.queuedBytes -= size
+            self.notFull.notify_all()
+            return batch
+
+    def finish(self) -> None:
+        """Puts the END_OF_CRAWL sentinel into the queue.
+        
+        It ignores the budget, so finishing never blocks even if
+        nobody is taking batches out of the queue anymore.
+        """
+        with self.notEmpty:
+            self.batches.append((END_OF_CRAWL, 0))
+            self.notEmpty.notify_all()
+
+    def checkpoint(
+        self,
+        checkpoint: dict[str, Any]
+    ) -> None:
+        """Puts a checkpoint of the spider into the queue.
+        
+        Once the inserter reaches it, every batch queued before it
+        has been indexed, so the inserter can save the shard together
+        with the checkpoint. Like `finish()` it ignores the budget.
+
+        Args:
+            checkpoint (dict[str, Any]): frontier of the spider
+        """
+        with self.notEmpty:
+            self.batches.append((checkpoint, 0))
+            self.notEmpty.notify_all()
+    
+    def empty(self) -> bool:
+        """Checks if there are no batches queued
+
+        Returns:
+            bool: True if the queue is empty
+        """
+        return not self.batches
+
+    def qsize(self) -> int:
+        """Returns the amount of queued batches
+
+        Returns:
+            int: amount of batches
+        """
+        return len(self.batches)
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Returns the current state of the queue for logging
+
+        Returns:
+            dict[str, Any]: depth, queued bytes, peak bytes, stalls and stall time
+        """
+        return {
+            'depth': len(self.batches),
+            'bytes': self.queuedBytes,
+            'peak': self.peakBytes,
+            'stalls': self.stalls,
+            'stallTime': self.stallTime,
+        }
@@ -0,0 +1,146 @@
+# FlashBar - ./modules/FileManager/FileCompactor.py -> Reclaims the space of deleted entries in the background.
+# Copyright (C) 2025  Florian, Floerianc on Github (https://www.github.com/floerianc)
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import threading
+from PyQt5.QtCore import QThread
+from typing import (
+    Any,
+    Callable
+)
+import modules.config as Config
+from modules.Logger import Logger
+from modules.FileManager.FileDBInserter import ENTRY_KINDS
+from modules.FileManager.FileDBSaver import FileDBSaver
+from modules.FileManager.FileLocator import FileLocator
+
+class FileCompactor(QThread):
+    """Every COMPACT_INTERVAL seconds it looks for segments where at
+    least COMPACT_RATIO of the entries have a tombstone and lets the
+    locator rewrite them without the deleted entries.
+
+    Then it collects the templates without any entries of every shard
+    that had deletions or was loaded from a file, one shard at a time.
+    At last every shard that changed since its file was saved (deletes,
+    moves, compacted segments, new template IDs) is saved.
+
+    Segments of shards that are being crawled are skipped, as their
+    inserter might still add to them. Templates are only collected
+    while nothing is crawled or saved at all.
+
+    **Inherits from QThread**
+    """
+    def __init__(
+        self,
+        windowData: dict[str, Any],
+        log: Logger,
+        locator: FileLocator,
+        crawlingShards: Callable[[], set[str]]
+    ) -> None:
+        """Initializes the FileCompactor
+
+        Args:
+            windowData (dict[str, Any]): data of all the files and templates stored
+            log (Logger): Logger
+            locator (FileLocator): locator owning the tombstones
+            crawlingShards (Callable[[], set[str]]): returns the IDs of the shards being crawled or saved
+        """
+        super().__init__()
+        self.config = Config.Config('DB')
+        self.data = windowData
+        self.log = log
+        self.locator = locator
+        self.crawlingShards = crawlingShards
+        self.stopped = threading.Event()
+
+    def compactAll(self) -> int:
+        """Compacts every segment which has enough tombstones
+
+        Returns:
+            int: amount of entries removed
+        """
+        removed = 0
+        for kind in ENTRY_KINDS:
+            for key, dead in list(self.data['tombstones'][kind].items()):
+                if self.stopped.is_set():
+                    return removed
+                if key.split(".")[0] in self.crawlingShards():
+                    continue
+                segment = self.data[kind].get(key, ())
+                if dead.count(1) >= max(1, len(segment) * self.config.COMPACT_RATIO):
+                    removed += self.locator.compact(kind, key)
+        return removed
+
+    def collectTemplates(self) -> int:
+        """Collects the unused templates of every dirty shard.
+        Stops as soon as a crawl starts.
+
+        Returns:
+            int: amount of templates removed
+        """
+        removed = 0
+        cancelled = lambda: self.stopped.is_set() or bool(self.crawlingShards())
+        for shard in sorted(self.locator.dirty):
+            if cancelled():
+                break
+            if str(shard) not in self.data['shards']:
+                continue
+            collected = self.locator.collectTemplates(shard, cancelled)
+            if collected is None:
+                # a crawl started or the shard changed meanwhile, it's tried again next time
+                continue
+            removed += collected
+        return removed
+
+    def saveShards(self) -> int:
+        """Saves the shards whose entries were deleted, moved, compacted
+        or collected since their shard file was saved, so the changes
+        are still there after a restart. Shards that are being crawled
+        or saved are saved next time.
+
+        Returns:
+            int: amount of shards saved
+        """
+        with self.locator.lock:
+            shards = sorted(self.locator.unsaved)
+        saved = 0
+        for shard in shards:
+            if str(shard) not in self.data['shards'] or str(shard) in self.crawlingShards():
+                continue
+            version = self.locator.versions.get(shard, 0)
+            FileDBSaver(self.data, self.log, [str(shard)]).saveShard(str(shard))
+            self.locator.saved(shard, version)
+            saved += 1
+        return saved
+
+    def run(self) -> None:
+        """Compacts the segments and collects the templates
+        until the thread is stopped
+        """
+        while not self.stopped.wait(self.config.COMPACT_INTERVAL):
+            removed = self.compactAll()
+            if removed:
+                self.log.log.info("Compacted the index, removed %d deleted entries.", removed)
+            removed = self.collectTemplates()
+            if removed:
+                self.log.log.info("Collected %d unused templates.", removed)
+            saved = self.saveShards()
+            if saved:
+                self.log.log.info("Saved %d changed shards.", saved)
+
+    def stop(self) -> None:
+        """Stops the thread after the current segment
+        """
+        self.stopped.set()
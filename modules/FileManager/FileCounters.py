@@ -0,0 +1,196 @@
+# FlashBar - ./modules/FileManager/FileCounters.py -> Keeps count of the entries in the index.
+# Copyright (C) 2025  Florian, Floerianc on Github (https://www.github.com/floerianc)
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import threading
+from collections import Counter
+from PyQt5.QtCore import (
+    QObject,
+    pyqtSignal
+)
+from typing import (
+    Any,
+    Iterable
+)
+
+COUNTED = ('files', 'dirs', 'templates')
+
+class FileCounters(QObject):
+    """Counts the files, directories and templates of every shard and
+    the files per extension while they're added and deleted, so showing
+    the totals never has to look at the segments.
+
+    Every shard has its own counters, so an unmounted shard can simply
+    be subtracted. Adding and deleting happens on several threads, so
+    the counters are locked.
+
+    `changed` is emitted with the totals (files, dirs, templates)
+    after every batch of changes, it's delivered to the GUI thread.
+
+    **Inherits from QObject**
+    """
+    changed = pyqtSignal(dict)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.lock = threading.Lock()
+        # shard -> files, dirs, templates
+        self.shards: dict[int, dict[str, int]] = {}
+        self.extensions: dict[int, Counter] = {}
+
+    def shardCounts(
+        self,
+        shard: int
+    ) -> dict[str, int]:
+        """Returns the counters of a shard, creates them if needed.
+        Has to be called with the lock held.
+
+        Args:
+            shard (int): ID of the shard
+
+        Returns:
+            dict[str, int]: counters of the shard
+        """
+        counts = self.shards.get(shard)
+        if counts is None:
+            counts = self.shards[shard] = dict.fromkeys(COUNTED, 0)
+            self.extensions[shard] = Counter()
+        return counts
+
+    def add(
+        self,
+        shard: int,
+        kind: str,
+        names: Iterable[str],
+        sign: int = 1
+    ) -> None:
+        """Counts added (or with `sign=-1` deleted) entries
+
+        Args:
+            shard (int): ID of the shard
+            kind (str): "files" or "dirs"
+            names (Iterable[str]): names of the entries
+            sign (int, optional): 1 for added entries, -1 for deleted ones. Defaults to 1.
+        """
+        if kind == 'files':
+            extensions = Counter(os.path.splitext(name)[1].lower() for name in names)
+            amount = sum(extensions.values())
+        else:
+            extensions = None
+            amount = sum(1 for name in names)
+
+        with self.lock:
+            self.shardCounts(shard)[kind] += amount * sign
+            if extensions:
+                if sign > 0:
+                    self.extensions[shard].update(extensions)
+                else:
+                    self.extensions[shard].subtract(extensions)
+
+    def addTemplates(
+        self,
+        shard: int,
+        amount: int
+    ) -> None:
+        """Counts added (or with a negative amount removed) templates
+
+        Args:
+            shard (int): ID of the shard
+            amount (int): amount of templates
+        """
+        with self.lock:
+            self.shardCounts(shard)['templates'] += amount
+
+    def countShard(
+        self,
+        shard: int,
+        db: dict[str, Any]
+    ) -> None:
+        """Counts a whole shard, e.g. after it was loaded from its file.
+        Deleted entries are dropped by the saver, so every entry counts.
+
+        Args:
+            shard (int): ID of the shard
+            db (dict[str, Any]): the shard with its templates and segments
+        """
+        self.dropShard(shard, emit=False)
+        self.addTemplates(shard, len(db['templates']))
+        for kind in ('files', 'dirs'):
+            for segment in db[kind].values():
+                self.add(shard, kind, (name for template, name in segment))
+        self.emitChanged()
+
+    def dropShard(
+        self,
+        shard: int,
+        emit: bool = True
+    ) -> None:
+        """Forgets the counters of a shard, e.g. after it was unmounted
+
+        Args:
+            shard (int): ID of the shard
+            emit (bool, optional): If `changed` should be emitted. Defaults to True.
+        """
+        with self.lock:
+            self.shards.pop(shard, None)
+            self.extensions.pop(shard, None)
+        if emit:
+            self.emitChanged()
+
+    @property
+    def totals(self) -> dict[str, int]:
+        """Returns the totals of every shard
+
+        Returns:
+            dict[str, int]: amount of files, dirs and templates
+        """
+        with self.lock:
+            return {counter: sum(counts[counter] for counts in self.shards.values()) for counter in COUNTED}
+
+    @property
+    def files(self) -> int:
+        """Returns the amount of files
+
+        Returns:
+            int: amount of files
+        """
+        return self.totals['files']
+
+    @property
+    def templates(self) -> int:
+        """Returns the amount of templates
+
+        Returns:
+            int: amount of templates
+        """
+        return self.totals['templates']
+
+    def extensionCounts(self) -> Counter:
+        """Returns how many files every extension has
+
+        Returns:
+            Counter: extension (e.g. ".pdf", "" for none) -> amount of files
+        """
+        with self.lock:
+            total: Counter = Counter()
+            for extensions in self.extensions.values():
+                total.update(extensions)
+            return +total
+
+    def emitChanged(self) -> None:
+        """Emits `changed` with the current totals
+        """
+        self.changed.emit(self.totals)
@@ -0,0 +1,206 @@
+# FlashBar - ./modules/FileManager/FileCrawlGovernor.py -> Throttles the spider so crawling doesn't slow down the system.
+# Copyright (C) 2025  Florian, Floerianc on Github (https://www.github.com/floerianc)
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import time
+import threading
+from typing import Any
+import modules.config as Config
+
+# the rate never drops below this, so the crawl always finishes eventually
+MIN_RATE = 0.05
+# seconds between two adjustments of the rate and worker count
+ADAPT_INTERVAL = 0.5
+# a pause that was never lifted (e.g. a search crashed) expires after this many seconds
+MAX_PAUSE = 10.0
+# weight of the newest directory in the average listing latency
+LATENCY_WEIGHT = 0.1
+
+class FileCrawlGovernor:
+    """Decides how fast the spider is allowed to crawl.
+
+    Every drive thread asks the governor for a slot before listing
+    a directory and tells it how long listing took afterwards and how much
+    CPU time it used since its last directory. From that the governor keeps
+    an average listing latency and checks the CPU time of the drive threads
+    and (where available) the system load. The rest of the program
+    (inserters, searches, thumbnails...) doesn't count against the budget.
+
+    If any of them is over the budget, the rate (share of the time the
+    crawl may work) and the amount of directories listed at the same time
+    are halved, otherwise they slowly grow again (AIMD, like TCP does it).
+    The batch size follows the rate, so a slow crawl still shows new files soon.
+
+    While the user is typing or a search is running the crawl is paused completely.
+    """
+    def __init__(self) -> None:
+        """Initializes the FileCrawlGovernor and loads its
+        budget from the config
+        """
+        self.config = Config.Config('Spider')
+        self.MAX_WORKERS = max(1, self.config.CRAWL_WORKERS)
+        self.CPU_BUDGET = self.config.CRAWL_BUDGET / 100
+        self.LATENCY_TARGET = self.config.LATENCY_TARGET / 1000
+
+        self.lock = threading.Lock()
+        self.slotFree = threading.Condition(self.lock)
+        self.pauses: dict[str, float] = {}
+        self.active = 0
+        self.workers = self.MAX_WORKERS
+        self.rate = 1.0
+        self.latency = 0.0
+
+        self.lastAdapt = time.perf_counter()
+        # CPU time of all drive threads since the last adjustment
+        self.cpu = 0.0
+
+    @property
+    def paused(self) -> bool:
+        """Returns True if the crawl is paused
+
+        Returns:
+            bool: True if any pause is still active
+        """
+        now = time.monotonic()
+        return any(now - since < MAX_PAUSE for since in self.pauses.values())
+
+    @property
+    def batchSize(self) -> int:
+        """Returns how many files the spider should put into one batch
+
+        Returns:
+            int: BATCH_SIZE scaled by the current rate
+        """
+        return max(256, int(self.config.BATCH_SIZE * self.rate))
+
+    def pause(
+        self,
+        reason: str
+    ) -> None:
+        """Pauses the crawl until `resume()` is called with the same reason.
+        Directories that are being listed right now are finished first.
+
+        Args:
+            reason (str): Why the crawl is paused (e.g. "typing")
+        """
+        with self.lock:
+            self.pauses[reason] = time.monotonic()
+
+    def resume(
+        self,
+        reason: str
+    ) -> None:
+        """Lifts a pause. The crawl continues once no pause is left.
+
+        Args:
+            reason (str): The reason given to `pause()`
+        """
+        with self.slotFree:
+            self.pauses.pop(reason, None)
+            self.slotFree.notify_all()
+
+    def acquire(
+        self,
+        stopped: threading.Event
+    ) -> bool:
+        """Waits until the spider is allowed to list the next directory
+
+        Args:
+            stopped (threading.Event): the spider's stop event, waiting is cancelled once it's set
+
+        Returns:
+            bool: False if the spider was stopped while waiting
+        """
+        with self.slotFree:
+            # paused is time based, so it's checked again every now and then
+            while self.paused or self.active >= self.workers:
+                if stopped.is_set():
+                    return False
+                self.slotFree.wait(0.1)
+            self.active += 1
+        return True
+
+    def release(
+        self,
+        elapsed: float,
+        cpu: float = 0.0
+    ) -> float:
+        """Frees the slot of a listed directory and adapts the rate
+
+        Args:
+            elapsed (float): Seconds it took to list the directory
+            cpu (float, optional): CPU seconds the drive thread used since its last directory (`time.thread_time()`). Defaults to 0.0.
+
+        Returns:
+            float: Seconds the drive thread should rest before the next directory
+        """
+        with self.slotFree:
+            self.active -= 1
+            self.cpu += cpu
+            self.latency += (elapsed - self.latency) * LATENCY_WEIGHT
+            if time.perf_counter() - self.lastAdapt >= ADAPT_INTERVAL:
+                self.adapt()
+            self.slotFree.notify()
+            rate = self.rate
+
+        # work `rate` of the time and rest the remaining time
+        return elapsed * (1 / rate - 1)
+
+    def overloaded(self) -> bool:
+        """Checks if the listing latency, the CPU time of the
+        drive threads or the system load are over the budget.
+
+        The load average only exists on unix systems, Windows only
+        uses the latency and CPU time.
+
+        Returns:
+            bool: True if the crawl should slow down
+        """
+        now = time.perf_counter()
+        cpuShare = self.cpu / max(now - self.lastAdapt, 1e-6)
+        self.lastAdapt = now
+        self.cpu = 0.0
+
+        if self.latency > self.LATENCY_TARGET or cpuShare > self.CPU_BUDGET:
+            return True
+        if hasattr(os, "getloadavg"):
+            return os.getloadavg()[0] / (os.cpu_count() or 1) > 1.0
+        return False
+
+    def adapt(self) -> None:
+        """Halves the rate and workers if the system is overloaded,
+        otherwise lets them grow again. Has to be called with the lock held.
+        """
+        if self.overloaded():
+            self.rate = max(MIN_RATE, self.rate / 2)
+            self.workers = max(1, self.workers // 2)
+        else:
+            self.rate = min(1.0, self.rate + 0.1)
+            self.workers = min(self.MAX_WORKERS, self.workers + 1)
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Returns the current state of the governor for logging
+
+        Returns:
+            dict[str, Any]: rate, workers, average latency in ms and if it's paused
+        """
+        return {
+            'rate': self.rate,
+            'workers': self.workers,
+            'latency': self.latency * 1000,
+            'paused': self.paused,
+        }
@@ -15,11 +15,77 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import time
-from PyQt5.QtCore import QThread
-from typing import Any
+import queue
+import threading
+from PyQt5.QtCore import (
+    QObject,
+    QThread,
+    pyqtSignal
+)
+from typing import (
+    Any,
+    Union
+)
 import modules.config as Config
 import modules.OSM as osm
 from modules.Logger import Logger
+from modules.FileManager.FileBatchQueue import (
+    FileBatchQueue,
+    END_OF_CRAWL
+)
+
+# every kind of entry has its own dict of segments in the dataset, with the same keys
+ENTRY_KINDS = ('files', 'dirs')
+
+# the open segment is published at most this often (seconds), every publish copies it
+PUBLISH_INTERVAL = 1.0
+
+# the lowest bits of a template ID are the ID of the shard that created it
+SHARD_BITS = 8
+SHARD_MASK = (1 << SHARD_BITS) - 1
+
+def templateID(
+    shard: int,
+    localID: int
+) -> int:
+    """Combines the ID of a shard and the shard's own template ID
+    into one globally unique template ID.
+
+    Args:
+        shard (int): ID of the shard
+        localID (int): ID of the template inside the shard
+
+    Returns:
+        int: global template ID
+    """
+    return (localID << SHARD_BITS) | shard
+
+def shardOf(template: int) -> int:
+    """Returns the ID of the shard a template belongs to
+
+    Args:
+        template (int): global template ID
+
+    Returns:
+        int: ID of the shard
+    """
+    return template & SHARD_MASK
+
+def nextSegment(
+    windowData: dict[str, Any],
+    shard: int
+) -> int:
+    """Returns the next free segment number of a shard
+
+    Args:
+        windowData (dict[str, Any]): data of all the files and templates stored
+        shard (int): ID of the shard
+
+    Returns:
+        int: segment number
+    """
+    prefix = f"{shard}."
+    return max((int(key.removeprefix(prefix)) + 1 for kind in ENTRY_KINDS for key in windowData[kind] if key.startswith(prefix)), default=0)
 
 class FileDBInserter(QThread):
     """This class handles most of the work with the dataset
@@ -27,15 +93,28 @@ class FileDBInserter(QThread):
     It scans files for it's template (path) and file name and
     then sorts them depending on different factors.
     
+    Every drive gets its own inserter (shard) with its own queue, reverse
+    look-up dict and segments, so the inserters never have to wait for each other.
+    Only publishing a segment is locked, as it replaces the shared files dict.
+    
+    If the shard already has templates and segments (a resumed crawl),
+    the inserter continues with the next free template ID and segment.
+    
     For more information on the whole process, check the
     code and doc-strings of each function-
 
     **Inherits from QThread**
     """
+    indexed = pyqtSignal()
+    publishLock = threading.Lock()
+    
     def __init__(
         self, 
         windowData: dict[str, Any],
-        log: Logger
+        log: Logger,
+        shard: int = 0,
+        saver: Any = None,
+        locator: Any = None
     ) -> None:
         
         super().__init__()
@@ -43,62 +122,276 @@ class FileDBInserter(QThread):
         self.log = log
         self.osm = osm.OSM()
         self.data = windowData
+        self.shard = shard
+        self.queue: FileBatchQueue = self.data['queues'][shard]
         self.CHUNK_SIZE = self.config.CHUNK_SIZE
+        self.running = True
+        self.pending: list[tuple[int, str]] = []
+        self.pendingDirs: list[tuple[int, str]] = []
+        self.saver = saver
+        self.locator = locator
+        self.templatesReverse: dict[str, int] = {
+            template: int(index) for index, template in self.data['templates'].items() if shardOf(int(index)) == shard
+        }
+        self.segment = nextSegment(self.data, shard)
+        self.lastPublish = time.monotonic()
+        # what was added since the last checkpoint, the first checkpoint saves the whole shard
+        self.checkpointed = False
+        self.newTemplates: dict[str, str] = {}
+        self.sealed: list[str] = []
     
     def scanFiles(
         self, 
-        files: list
+        groups: list[tuple[str, list[str], list[str]]]
     ) -> None:
-        """This scans each file in a list of files
-
-        It does this by first splitting up the full path of the file
-        into the path and the raw file name.
+        """This scans each group of files in a batch.
         
-        Then it looks if the path already exists in the database and if
-        it does, it will just be added to the file lists with its given ID to the corresponding path
+        The spider already groups the files by their directory, so the
+        directory is the template and we only have to look it up once
+        per directory instead of once per file.
         
         If the template (path) doesn't exist in the dataset it will save
         the template in the templates dictionary with its own ID so other files
         from that directory can be given that ID so you don't have to save
         paths twice.
+        
+        Then all the file names are added with the template's ID in one go
+        to the private buffer, which gets published once it is full.
+        Subdirectories are entries too, they're (template, name) pairs
+        just like files, with the directory they're in as the template.
+        Where each group ends up and the new templates are told to the
+        locator and the entries of the whole batch are counted by its counters.
+        Templates are always added before the files using them are published.
 
         Args:
-            files (list): list of files
+            groups (list[tuple[str, list[str], list[str]]]): list of (directory, file names, subdirectory names)
         """
-        for file in files:
-            template, filename = self.osm.splitPath(file)
-            
-            if template not in self.data["templatesReverse"]:
-                index = len(self.data["templates"])
-                self.data["templates"][str(index)] = template
-                self.data["templatesReverse"][template] = index
-            else:
-                index = self.data["templatesReverse"][template]
+        templates = self.data["templates"]
+        templatesReverse = self.templatesReverse
+        locator = self.locator
+        added: dict[str, str] = {}
+        
+        if locator is not None:
+            counters = locator.counters
+            counters.add(self.shard, 'files', (name for template, names, dirs in groups for name in names))
+            counters.add(self.shard, 'dirs', (name for template, names, dirs in groups for name in dirs))
+        
+        for template, names, dirs in groups:
+            index = templatesReverse.get(template)
+            if index is None:
+                index = templateID(self.shard, len(templatesReverse))
+                templates[str(index)] = template
+                templatesReverse[template] = index
+                added[str(index)] = template
             
-            fileKey = self.data['current']
-            if len(self.data['files'][str(fileKey)]) >= self.CHUNK_SIZE:
-                fileKey = fileKey + 1
-                self.data['files'][str(fileKey)] = set()
-                self.data['current'] = fileKey
-                self.log.log.info("Reached file batch limit. Initializing new list. file key = %d", fileKey)
+            if locator is not None:
+                fileKey = f"{self.shard}.{self.segment}"
+                if names:
+                    locator.addRun('files', index, fileKey, len(self.pending), len(self.pending) + len(names))
+                if dirs:
+                    locator.addRun('dirs', index, fileKey, len(self.pendingDirs), len(self.pendingDirs) + len(dirs))
             
-            self.data['files'][str(fileKey)].add((index, filename))
+            self.pending.extend([(index, name) for name in names])
+            self.pendingDirs.extend([(index, name) for name in dirs])
+            if len(self.pending) + len(self.pendingDirs) >= self.CHUNK_SIZE:
+                self.publish(seal=True)
+        
+        self.newTemplates.update(added)
+        if locator is not None and added:
+            locator.addTemplates(added)
+            locator.counters.addTemplates(self.shard, len(added))
+    
+    def publish(
+        self,
+        seal: bool = False
+    ) -> None:
+        """Publishes the private buffers as immutable segments so
+        searchers can see the new files and directories.
+        
+        The segment is a tuple and the files dict is never changed,
+        only replaced by a new one (copy-on-write). Searchers that grabbed
+        the old dict keep a consistent snapshot and don't need any locks,
+        as replacing the reference is atomic.
+        
+        An unsealed segment is published again under the same key the next
+        time, a sealed segment is final and the next files get a new key.
+        As publishing copies the open segment, it's only published
+        every PUBLISH_INTERVAL seconds until it's sealed.
+
+        Args:
+            seal (bool, optional): If the segment is full and a new one should be started. Defaults to False.
+        """
+        fileKey = f"{self.shard}.{self.segment}"
+        self.lastPublish = time.monotonic()
+        segments = {'files': tuple(self.pending), 'dirs': tuple(self.pendingDirs)}
+        with self.publishLock:
+            for kind in ENTRY_KINDS:
+                entries = dict(self.data[kind])
+                entries[fileKey] = segments[kind]
+                self.data[kind] = entries
+            self.data['generation'] += 1
+        if self.locator is not None:
+            self.locator.counters.emitChanged()
+        
+        if seal:
+            self.pending = []
+            self.pendingDirs = []
+            self.sealed.append(fileKey)
+            self.segment += 1
+            self.log.log.info("Reached file batch limit. Sealed segment %s (generation %d).", fileKey, self.data['generation'])
+    
+    def checkpoint(
+        self,
+        checkpoint: dict[str, Any]
+    ) -> None:
+        """Seals the current segment and hands the spider's checkpoint
+        to the saver, so the crawl can be resumed from here.
+        
+        Every batch the spider queued before the checkpoint is already indexed.
+        The first checkpoint has every template and segment of the shard,
+        the later ones only the templates and sealed segments since the last one.
+        Sealed segments never change, so the saver encodes them on its own thread.
+
+        Args:
+            checkpoint (dict[str, Any]): frontier of the spider
+        """
+        if self.saver is None or not self.running:
+            return
+        
+        if self.pending or self.pendingDirs:
+            self.publish(seal=True)
+        
+        record: dict[str, Any] = {'full': not self.checkpointed, 'frontier': checkpoint['frontier']}
+        if self.checkpointed:
+            record['templates'] = self.newTemplates
+            for kind in ENTRY_KINDS:
+                entries = self.data[kind]
+                record[kind] = {key: entries[key] for key in self.sealed if key in entries}
+        else:
+            prefix = f"{self.shard}."
+            record['templates'] = {str(index): template for template, index in self.templatesReverse.items()}
+            for kind in ENTRY_KINDS:
+                record[kind] = {key: segment for key, segment in self.data[kind].items() if key.startswith(prefix)}
+        self.checkpointed = True
+        self.newTemplates = {}
+        self.sealed = []
+        self.saver.saveCheckpoint(str(self.shard), record)
     
     def run(self) -> None:
         """The main part of the Thread
         
-        It checks if the queue is empty and if it isn't it will
-        scan the files in the queue.
+        It waits for the next batch in the queue and scans its files
+        until the spider puts END_OF_CRAWL into the queue.
+        Checkpoints of the spider are saved as soon as they arrive.
+        
+        Besides sealing full segments, it publishes what it has got so far
+        every PUBLISH_INTERVAL seconds, also while the spider is paused,
+        so searching during the crawl finds the newest files without
+        copying the open segment after every single batch.
+        Then it emits `indexed`, unless the thread was stopped.
         """
+        fileQueue = self.queue
         while True:
-            files = []
-            
-            if self.data['queue'].empty():
-                if not files:
-                    time.sleep(0.1)
-                else:
-                    self.scanFiles(files)
-            else:
-                files = self.data['queue'].get()
-                self.scanFiles(files)
-            # print(f"Inserted {len(files)} Files.")
\ No newline at end of file
+            try:
+                files = fileQueue.get(timeout=PUBLISH_INTERVAL)
+            except queue.Empty:
+                if self.pending or self.pendingDirs:
+                    self.publish()
+                continue
+            if files is END_OF_CRAWL:
+                break
+            if isinstance(files, dict):
+                self.checkpoint(files)
+                continue
+            self.scanFiles(files)
+            if (self.pending or self.pendingDirs) and time.monotonic() - self.lastPublish >= PUBLISH_INTERVAL:
+                self.publish()
+        
+        if self.pending or self.pendingDirs:
+            self.publish(seal=True)
+        
+        if self.running:
+            self.log.log.debug("Finished indexing shard %d.", self.shard)
+            self.indexed.emit()
+    
+    def stop(self) -> None:
+        """Stops the thread without emitting `indexed`,
+        so an unfinished index doesn't get saved.
+        """
+        self.running = False
+        self.queue.finish()
+
+
+class FileDBIndexer(QObject):
+    """Runs one FileDBInserter per shard (drive) and
+    treats them as one.
+    
+    It creates a queue for every shard it indexes and
+    emits `indexed` once every inserter is done.
+    The saver (if any) is used by the inserters to save checkpoints,
+    the locator (if any) is told where every directory's entries are.
+    """
+    indexed = pyqtSignal()
+    
+    def __init__(
+        self,
+        windowData: dict[str, Any],
+        log: Logger,
+        shards: Union[list[str], None] = None,
+        saver: Any = None,
+        locator: Any = None
+    ) -> None:
+        super().__init__()
+        self.data = windowData
+        self.log = log
+        self.shards = shards if shards is not None else list(self.data['shards'])
+        self.inserters: list[FileDBInserter] = []
+        self.remaining = 0
+        
+        for shard in self.shards:
+            self.data['queues'][int(shard)] = FileBatchQueue()
+            inserter = FileDBInserter(self.data, self.log, int(shard), saver, locator)
+            inserter.indexed.connect(self.shardIndexed)
+            self.inserters.append(inserter)
+    
+    def shardIndexed(self) -> None:
+        """Called whenever one of the inserters is done.
+        Emits `indexed` after the last one.
+        """
+        self.remaining -= 1
+        if self.remaining == 0:
+            self.log.log.debug("Finished indexing all %d shards.", len(self.inserters))
+            self.indexed.emit()
+    
+    def start(
+        self,
+        priority: QThread.Priority = QThread.Priority.InheritPriority
+    ) -> None:
+        """Starts every inserter
+
+        Args:
+            priority (QThread.Priority, optional): Priority of the threads. Defaults to QThread.Priority.InheritPriority.
+        """
+        self.remaining = len(self.inserters)
+        for inserter in self.inserters:
+            inserter.start(priority)
+    
+    def isRunning(self) -> bool:
+        """Returns True if any inserter is still running
+
+        Returns:
+            bool: True if still running
+        """
+        return any(inserter.isRunning() for inserter in self.inserters)
+    
+    def stop(self) -> None:
+        """Stops every inserter without emitting `indexed`
+        """
+        for inserter in self.inserters:
+            inserter.stop()
+    
+    def wait(self) -> None:
+        """Waits until every inserter is done
+        """
+        for inserter in self.inserters:
+            inserter.wait()
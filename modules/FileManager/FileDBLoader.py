@@ -15,51 +15,79 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import time
-import queue
 import os
 import zlib
 import json
-from PyQt5.QtCore import QThread
+from PyQt5.QtCore import (
+    QThread,
+    pyqtSignal
+)
 from typing import(
     Any,
+    Callable,
     Union
 )
 import modules.OSM as osm
 from modules.Logger import Logger
+from modules.FileManager.FileDBInserter import ENTRY_KINDS
 
 class FileDBLoader(QThread):
     """This is a seperate class to load
     a pre-existing DB into the program to regulate CPU usage
+    
+    When started as a thread, it mounts the shards of the given drives
+    (or of every drive of the system) in the background, so the window
+    doesn't wait for them. `loaded` is emitted with the drives it looked at
+    and the ones that couldn't be mounted and have to be crawled.
 
     **Inherits from QThread**
     """
+    loaded = pyqtSignal(list, list)
+    
     def __init__(
         self, 
-        log: Union[Logger, None]
+        log: Union[Logger, None],
+        drives: Union[list[str], None] = None,
+        mount: Union[Callable[[str], bool], None] = None
     ) -> None:
+        """Initializes the FileDBLoader
+
+        Args:
+            log (Union[Logger, None]): Logger
+            drives (Union[list[str], None], optional): drives to mount when started as a thread. Defaults to every drive of the system.
+            mount (Union[Callable[[str], bool], None], optional): mounts a drive, returns False if it has to be crawled. Defaults to None.
+        """
         self.log = log
         self.osm = osm.OSM()
+        self.drives = drives
+        self.mount = mount
         super().__init__()
     
-    def listToSet(
-        self, 
-        l: list
-    ) -> set:
-        """Converts a list of tuples into a set of tuples
+    def shardPath(
+        self,
+        volume: str,
+        extension: str = "db"
+    ) -> str:
+        """Returns the path to the shard file of a volume
 
         Args:
-            l (list): list of tuples
+            volume (str): ID of the volume
+            extension (str, optional): "db" for the shard file, "checkpoint" for the checkpoint log. Defaults to "db".
 
         Returns:
-            set: set of tuples
+            str: full path to the shard file
         """
-        return set((template, filename) for template, filename in l)
+        return os.path.join(self.osm.exeDir(), "user", "shards", f"{volume}.{extension}")
     
     def deJsonifyDB(
         self, 
         jsonDB: dict[str, Any]
     ) -> dict[str, Any]:
         """Converts a JSON object into a dict object
+        
+        Every file and directory list becomes an immutable segment
+        (tuple of tuples), the same way the FileDBInserter publishes them.
+        Shards saved before directories were indexed just have none.
 
         Args:
             jsonDB (dict[str, Any]): JSON
@@ -67,36 +95,28 @@ class FileDBLoader(QThread):
         Returns:
             dict[str, Any]: converted JSON
         """
-        jsonDB['queue'] = queue.Queue()
-        oldFileList = list(jsonDB['files'].values())   # snapshot
-        
-        newFiles = {}
-        for i, fileList in enumerate(oldFileList):
-            fileSet = self.listToSet(fileList)
-            newFiles[i] = fileSet
-        
-        newTemplates = {}
-        for key in jsonDB['templates']:
-            newTemplates[key] = jsonDB['templates'][key]
-        
-        jsonDB['files'] = newFiles
-        jsonDB['templates'] = newTemplates
+        for kind in ENTRY_KINDS:
+            newFiles = {}
+            for key, fileList in jsonDB.get(kind, {}).items():
+                newFiles[key] = tuple((template, filename) for template, filename in fileList)
+            jsonDB[kind] = newFiles
         return jsonDB
     
     def DBIsOlderThan(
         self, 
+        path: str,
         hours: int
     ) -> bool:
         """Checks if the database is older than a 
         set amount of hours
 
         Args:
+            path (str): full path to the shard file
             hours (int): pretty self explaining, no?
 
         Returns:
             bool: True if the DB is older than `hours`
         """
-        path = os.path.join(self.osm.exeDir(), "user\\user.db")
         dbTime = os.path.getmtime(path)
         curTime = time.time()
         difference = curTime - dbTime
@@ -107,17 +127,81 @@ class FileDBLoader(QThread):
         else:
             return False
     
-    def loadJSON(self) -> Union[dict[str, Any], None]:
-        """Tries to load the saved DB in ./user/
-        will return None if it's either a very recent image
-        or if there's no pre-existing DB.
+    def loadCheckpoint(
+        self,
+        volume: str
+    ) -> Union[dict[str, Any], None]:
+        """Replays the checkpoint log of an unfinished crawl.
+        
+        The first record has the whole shard, every later one adds
+        the templates and segments since the record before it and
+        replaces the frontier. A record cut off by a crash ends the log.
+
+        Args:
+            volume (str): ID of the volume
+
+        Returns:
+            Union[dict[str, Any], None]: the shard with its latest checkpoint, None if the log is too old or broken
+        """
+        path = self.shardPath(volume, "checkpoint")
+        if self.DBIsOlderThan(path, 24):
+            return None
+        with open(path, "rb") as log:
+            data = log.read()
+        
+        db = None
+        offset = 0
+        while offset + 4 <= len(data):
+            length = int.from_bytes(data[offset:offset + 4], "little")
+            try:
+                record = json.loads(zlib.decompress(data[offset + 4:offset + 4 + length]).decode())
+            except (zlib.error, ValueError):
+                break
+            offset += 4 + length
+            
+            if db is None:
+                if not record.get('full'):
+                    return None
+                db = {key: record[key] for key in ('shard', 'root', 'volume')}
+                db['templates'] = {}
+                for kind in ENTRY_KINDS:
+                    db[kind] = {}
+            db['templates'].update(record['templates'])
+            for kind in ENTRY_KINDS:
+                db[kind].update(record[kind])
+            db['checkpoint'] = {'frontier': record['frontier']}
+        return db
+    
+    def loadShard(
+        self,
+        volume: str
+    ) -> Union[dict[str, Any], None]:
+        """Tries to load the saved shard of a volume in ./user/shards/
+        will return None if it's either a very old image
+        or if there's no pre-existing shard for that volume.
+        
+        If the checkpoint log of an unfinished crawl is newer than
+        the shard file, the shard is loaded from the log instead.
+
+        Args:
+            volume (str): ID of the volume
 
         Returns:
             Union[dict[str, Any], None]: Converted JSON to dict
         """
+        path = self.shardPath(volume)
+        logPath = self.shardPath(volume, "checkpoint")
+        try:
+            if os.path.exists(logPath) and (not os.path.exists(path) or os.path.getmtime(logPath) >= os.path.getmtime(path)):
+                db = self.loadCheckpoint(volume)
+                if db is not None:
+                    return self.deJsonifyDB(db)
+        except (OSError, KeyError) as e:
+            self.log.log.error("Couldn't load checkpoint of volume %s (%s)", volume, e) #type: ignore
+        
         try:
-            with open(f"{self.osm.exeDir()}\\user\\user.db", "rb") as db:
-                if self.DBIsOlderThan(24):
+            with open(path, "rb") as db:
+                if self.DBIsOlderThan(path, 24):
                     return None
                 else:
                     byte = zlib.decompress(db.read())
@@ -125,6 +209,21 @@ class FileDBLoader(QThread):
                     jsonDB = json.loads(rf"{decodedDB}")
         
         except Exception as e:
-            self.log.log.error("Couldn't find DB") #type: ignore
+            self.log.log.error("Couldn't find shard for volume %s", volume) #type: ignore
             return None
-        return self.deJsonifyDB(jsonDB)
\ No newline at end of file
+        return self.deJsonifyDB(jsonDB)
+    
+    def run(self) -> None:
+        """Mounts every drive and emits `loaded` with the drives and the ones
+        that have to be crawled. Drives left when the thread is interrupted aren't mounted.
+        
+        Listing the drives stats every mount point, so it's done here, too.
+        """
+        drives = self.drives if self.drives is not None else self.osm.drives
+        toCrawl = []
+        for drive in drives:
+            if self.isInterruptionRequested():
+                return
+            if self.mount is None or not self.mount(drive):
+                toCrawl.append(drive)
+        self.loaded.emit(drives, toCrawl)
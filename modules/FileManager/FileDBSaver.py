@@ -0,0 +1,218 @@
+# FlashBar - ./modules/FileManager/FileDBSaver.py -> Saves the DB
+# Copyright (C) 2025  Florian, Floerianc on Github (https://www.github.com/floerianc)
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import json
+import zlib
+import queue
+import threading
+from PyQt5.QtCore import QThread
+from typing import (
+    Any,
+    Union
+)
+import modules.OSM as osm
+from modules.Logger import Logger
+from modules.FileManager.FileDBInserter import (
+    ENTRY_KINDS,
+    shardOf
+)
+
+class FileDBSaver(QThread):
+    """Counterpart of the FileDBLoader. Saves the DB in a
+    seperate thread once the FileDBInserter is done, so compressing
+    millions of files doesn't freeze the GUI.
+    
+    Every shard (volume) is saved into its own file, so a volume
+    can be loaded or refreshed without touching the others.
+    
+    While crawling, the inserters hand their checkpoints to
+    `saveCheckpoint()`, so an interrupted crawl can be resumed.
+    Checkpoints are appended to a log next to the shard file by a
+    thread of their own, so the inserters never wait for them.
+    The first checkpoint of a crawl has the whole shard, every later one only
+    the templates and sealed segments added since the one before.
+
+    **Inherits from QThread**
+    """
+    def __init__(
+        self,
+        windowData: dict[str, Any],
+        log: Logger,
+        shards: list[str]
+    ) -> None:
+        super().__init__()
+        self.data = windowData
+        self.log = log
+        self.osm = osm.OSM()
+        self.shards = shards
+        self.checkpointQueue: queue.Queue = queue.Queue()
+        self.checkpointThread: Union[threading.Thread, None] = None
+
+    def jsonifyShard(
+        self,
+        shard: str
+    ) -> dict[str, Any]:
+        """Collects the templates and segments of one shard into an
+        object which can be dumped into a JSON without problems
+
+        Args:
+            shard (str): ID of the shard
+
+        Returns:
+            dict[str, Any]: the shard
+        """
+        shardID = int(shard)
+        prefix = f"{shard}."
+        
+        db = {
+            'shard': shardID,
+            'root': self.data['shards'][shard]['root'],
+            'volume': self.data['shards'][shard]['volume'],
+            'templates': {key: template for key, template in list(self.data['templates'].items()) if shardOf(int(key)) == shardID},
+        }
+        for kind in ENTRY_KINDS:
+            # the published dicts are never changed, so this is a consistent snapshot
+            segments = {key: list(segment) for key, segment in self.data[kind].items() if key.startswith(prefix)}
+            # deleted entries aren't saved, so a loaded shard is always compacted
+            for key, dead in list(self.data['tombstones'][kind].items()):
+                if key in segments:
+                    segments[key] = [entry for slot, entry in enumerate(segments[key]) if slot >= len(dead) or not dead[slot]]
+            db[kind] = segments
+        return db
+
+    def shardPath(
+        self,
+        shard: str,
+        extension: str = "db"
+    ) -> str:
+        """Returns the path to a file of the shard in ./user/shards/
+        and creates the folder if it doesn't exist yet.
+
+        Args:
+            shard (str): ID of the shard
+            extension (str, optional): "db" for the shard file, "checkpoint" for the checkpoint log. Defaults to "db".
+
+        Returns:
+            str: full path to the file
+        """
+        folder = os.path.join(self.osm.exeDir(), "user", "shards")
+        os.makedirs(folder, exist_ok=True)
+        return os.path.join(folder, f"{self.data['shards'][shard]['volume']}.{extension}")
+
+    def saveShard(
+        self,
+        shard: str
+    ) -> None:
+        """Saves one shard in a JSON. Using zlib compression
+        
+        The file is written next to the old one first and then replaced,
+        so a crash while saving never leaves a broken shard behind.
+
+        Args:
+            shard (str): ID of the shard
+        """
+        db = self.jsonifyShard(shard)
+        path = self.shardPath(shard)
+
+        with open(f"{path}.tmp", "wb") as dbf:
+            jsonData = json.dumps(db)
+            compressedBytes = zlib.compress(jsonData.encode(), 9)
+            dbf.write(compressedBytes)
+        os.replace(f"{path}.tmp", path)
+
+    def saveCheckpoint(
+        self,
+        shard: str,
+        record: dict[str, Any]
+    ) -> None:
+        """Queues a checkpoint of a shard for the checkpoint thread,
+        which is started with the first one.
+
+        Args:
+            shard (str): ID of the shard
+            record (dict[str, Any]): templates, segments and frontier of the checkpoint, `full` if it has the whole shard
+        """
+        if self.checkpointThread is None:
+            self.checkpointThread = threading.Thread(target=self.writeCheckpoints, daemon=True)
+            self.checkpointThread.start()
+        self.checkpointQueue.put((shard, record))
+
+    def appendCheckpoint(
+        self,
+        shard: str,
+        record: dict[str, Any]
+    ) -> None:
+        """Appends a checkpoint to the checkpoint log of the shard.
+        
+        Every record is a zlib compressed JSON with its length in front of it,
+        so a record that was cut off by a crash is simply ignored when loading.
+        A full checkpoint replaces the log the same way `saveShard()` replaces the shard file.
+
+        Args:
+            shard (str): ID of the shard
+            record (dict[str, Any]): templates, segments and frontier of the checkpoint, `full` if it has the whole shard
+        """
+        info = self.data['shards'][shard]
+        if record['full']:
+            record.update(shard=int(shard), root=info['root'], volume=info['volume'])
+        compressedBytes = zlib.compress(json.dumps(record).encode(), 1)
+        path = self.shardPath(shard, "checkpoint")
+
+        if record['full']:
+            with open(f"{path}.tmp", "wb") as log:
+                log.write(len(compressedBytes).to_bytes(4, "little") + compressedBytes)
+            os.replace(f"{path}.tmp", path)
+        else:
+            with open(path, "ab") as log:
+                log.write(len(compressedBytes).to_bytes(4, "little") + compressedBytes)
+
+    def writeCheckpoints(self) -> None:
+        """The checkpoint thread, writes the queued checkpoints
+        until `stopCheckpoints()` puts None into the queue.
+        """
+        while True:
+            item = self.checkpointQueue.get()
+            if item is None:
+                return
+            shard, record = item
+            try:
+                self.appendCheckpoint(shard, record)
+                self.log.log.debug("Saved checkpoint of shard %s (%d directories left).", shard, len(record['frontier']))
+            except (OSError, KeyError) as e:
+                self.log.log.error("Couldn't save checkpoint of shard %s (%s)", shard, e)
+
+    def stopCheckpoints(self) -> None:
+        """Writes the checkpoints that are still queued and stops the checkpoint thread
+        """
+        if self.checkpointThread is not None:
+            self.checkpointQueue.put(None)
+            self.checkpointThread.join()
+            self.checkpointThread = None
+
+    def run(self) -> None:
+        """Saves every shard and logs it.
+        The checkpoint logs aren't needed anymore after that.
+        """
+        self.stopCheckpoints()
+        for shard in self.shards:
+            self.log.log.debug("Saving shard %s...", shard)
+            self.saveShard(shard)
+            try:
+                os.remove(self.shardPath(shard, "checkpoint"))
+            except FileNotFoundError:
+                pass
+        self.log.log.debug("Saved %d shards.", len(self.shards))
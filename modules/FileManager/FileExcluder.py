@@ -0,0 +1,131 @@
+# FlashBar - ./modules/FileManager/FileExcluder.py -> Decides which directories the spider doesn't crawl.
+# Copyright (C) 2025  Florian, Floerianc on Github (https://www.github.com/floerianc)
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import re
+import fnmatch
+import threading
+import warnings
+from typing import Union
+
+class FileExcluder:
+    """Compiles the exclusion rules from the config into one
+    single regular expression so the spider only has to do one
+    match per directory name.
+
+    Rules are either glob patterns (e.g. `*.tmp`, `node_modules`)
+    or regular expressions with a `re:` prefix (e.g. `re:^\\$.*`).
+    Every rule is also compiled on its own. The combined pattern only
+    rejects the names no rule matches, the rule that matched is then found
+    by trying the rules in order. Rules with groups can't be combined
+    (their back references and group names would clash), if there are any,
+    every name is matched against the rules one by one.
+
+    For every rule it counts how many directories it excluded and how many
+    entries that saved. Only the entries directly inside an excluded
+    directory are counted, counting its whole subtree would mean crawling it.
+    The drive threads share one excluder, so the counters are locked.
+    """
+    def __init__(
+        self,
+        rules: list[str]
+    ) -> None:
+        """Initializes the FileExcluder by compiling all the rules
+
+        Args:
+            rules (list[str]): list of glob patterns and "re:" prefixed regexes
+        """
+        self.rules: list[tuple[str, re.Pattern]] = []
+        self.skipped: dict[str, int] = {}
+        self.saved: dict[str, int] = {}
+        self.lock = threading.Lock()
+        self.matcher = self.compile(rules)
+
+    def compile(
+        self,
+        rules: list[str]
+    ) -> Union[re.Pattern, None]:
+        """Compiles every rule and, if possible, all of them into one pattern.
+
+        Broken regexes are skipped with a warning instead of
+        breaking the whole crawl.
+
+        Args:
+            rules (list[str]): list of rules
+
+        Returns:
+            Union[re.Pattern, None]: Combined pattern or None if the rules can't be combined or there are none.
+        """
+        for rule in rules:
+            if rule.startswith("re:"):
+                pattern = rule.removeprefix("re:")
+            else:
+                pattern = fnmatch.translate(rule)
+
+            try:
+                compiled = re.compile(pattern, re.IGNORECASE)
+            except re.error as e:
+                warnings.warn(f"Invalid exclusion rule '{rule}' ({e}), skipping rule.")
+                continue
+
+            self.rules.append((rule, compiled))
+            self.skipped[rule] = 0
+            self.saved[rule] = 0
+
+        if not self.rules or any(compiled.groups for rule, compiled in self.rules):
+            return None
+        try:
+            return re.compile("|".join(f"(?:{compiled.pattern})" for rule, compiled in self.rules), re.IGNORECASE)
+        except re.error as e:
+            warnings.warn(f"Couldn't combine the exclusion rules ({e}), matching them one by one.")
+            return None
+
+    def isExcluded(
+        self,
+        name: str,
+        path: Union[str, None] = None
+    ) -> bool:
+        """Checks if a directory should be skipped and
+        counts the skip for the first rule that matched.
+
+        Args:
+            name (str): Name of the directory (not the full path)
+            path (Union[str, None], optional): Full path to the directory, used to count the entries it saved. Defaults to None.
+
+        Returns:
+            bool: True if the directory (and its whole subtree) should be skipped
+        """
+        if self.matcher is not None and self.matcher.fullmatch(name) is None:
+            return False
+
+        for rule, compiled in self.rules:
+            if compiled.fullmatch(name) is not None:
+                break
+        else:
+            return False
+
+        # the directory itself is an entry that isn't indexed, too
+        saved = 1
+        if path is not None:
+            try:
+                with os.scandir(path) as entries:
+                    saved += sum(1 for entry in entries)
+            except OSError:
+                pass
+        with self.lock:
+            self.skipped[rule] += 1
+            self.saved[rule] += saved
+        return True
@@ -0,0 +1,737 @@
+# FlashBar - ./modules/FileManager/FileLocator.py -> Finds, deletes and updates single entries of the index.
+# Copyright (C) 2025  Florian, Floerianc on Github (https://www.github.com/floerianc)
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    Callable,
+    Iterator,
+    Union
+)
+from modules.Logger import Logger
+from modules.FileManager.FileCounters import FileCounters
+from modules.FileManager.FileDBInserter import (
+    ENTRY_KINDS,
+    SHARD_BITS,
+    FileDBInserter,
+    nextSegment,
+    shardOf,
+    templateID
+)
+
+# the names of this many directories are kept for looking up entries
+LOCATE_CACHE = 256
+# the template collection checks if it was cancelled after this many entries
+COLLECT_CHUNK = 65536
+# moved entries are added to an update segment of their shard, which is sealed at this size
+UPDATE_SEGMENT_SIZE = 4096
+
+class FileLocator:
+    """Knows where every entry of the index is, so single files can
+    be deleted or moved without scanning every segment.
+
+    The inserter puts all files of a directory into one segment next to
+    each other, so instead of remembering every single file, the locator
+    remembers the runs (segment, first slot, last slot) of every template.
+    The names of the directories looked up last are indexed from their
+    runs once, so deleting more entries of a directory is a dict look-up.
+
+    Segments are immutable, so a deleted entry gets a tombstone instead
+    (one byte per slot in `data['tombstones']`) which the searchers skip.
+    A moved or renamed entry gets a tombstone and is added again to the
+    open update segment of its shard, which is published like the inserter
+    publishes its segments. Shards that are being crawled or saved can't
+    be changed, as their inserter creates templates and segments without the lock.
+    The FileCompactor rewrites segments with too many tombstones later on
+    and lets `collectTemplates()` remove the templates nothing uses anymore.
+    Paths from the GUI are deleted on a thread of the locator (`removePathLater()`).
+
+    Everything added or deleted is counted by its FileCounters,
+    the inserters count their entries there, too.
+    """
+    lock = threading.RLock()
+
+    def __init__(
+        self,
+        windowData: dict[str, Any],
+        log: Logger,
+        busyShards: Union[Callable[[], set[str]], None] = None
+    ) -> None:
+        """Initializes the locator
+
+        Args:
+            windowData (dict[str, Any]): data of all the files and templates stored
+            log (Logger): Logger
+            busyShards (Union[Callable[[], set[str]], None], optional): returns the IDs of the shards being crawled or saved. Defaults to None.
+        """
+        self.data = windowData
+        self.log = log
+        self.busyShards = busyShards or set
+
+        # kind -> template ID -> list of (segment key, start, end)
+        self.runs: dict[str, dict[int, list[tuple[str, int, int]]]] = {kind: {} for kind in ENTRY_KINDS}
+        # directory -> template ID, only built once a path has to be looked up
+        self.reverse: Union[dict[str, int], None] = None
+        # (kind, template ID) -> [runs it was built from, name -> list of (segment key, slot), runs indexed]
+        self.names: OrderedDict[tuple[str, int], list[Any]] = OrderedDict()
+        # shards which might have templates without any entries
+        self.dirty: set[int] = set()
+        # shard -> changes of its entries, the template collection starts over if it changed meanwhile
+        self.versions: dict[int, int] = {}
+        # shards whose entries or templates changed since their shard file was saved
+        self.unsaved: set[int] = set()
+        # (kind, shard) -> key of the open update segment
+        self.updateKeys: dict[tuple[str, int], str] = {}
+        # shard -> next local template ID, only known once a template was added by the locator
+        self.nextLocal: dict[int, int] = {}
+        self.counters = FileCounters()
+        self.pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="locator")
+
+    def addRun(
+        self,
+        kind: str,
+        template: int,
+        key: str,
+        start: int,
+        end: int
+    ) -> None:
+        """Remembers where the entries of a template were put.
+        Called by the inserter for every group it scans.
+
+        Args:
+            kind (str): "files" or "dirs"
+            template (int): ID of the template
+            key (str): key of the segment
+            start (int): first slot
+            end (int): slot after the last one
+        """
+        self.runs[kind].setdefault(template, []).append((key, start, end))
+
+    def addTemplates(
+        self,
+        templates: dict[str, str]
+    ) -> None:
+        """Adds new templates to the reverse look-up dict, if it was built already.
+        Called by the inserter and when a shard is mounted, after the
+        templates were added to the dataset.
+
+        Args:
+            templates (dict[str, str]): template ID -> directory
+        """
+        with self.lock:
+            if self.reverse is not None:
+                self.reverse.update((template, int(index)) for index, template in templates.items())
+            for index in templates:
+                shard = shardOf(int(index))
+                if shard in self.nextLocal:
+                    self.nextLocal[shard] = max(self.nextLocal[shard], (int(index) >> SHARD_BITS) + 1)
+
+    def segmentRuns(
+        self,
+        segment: tuple[tuple[int, str], ...]
+    ) -> Iterator[tuple[int, int, int]]:
+        """Splits a segment into the runs of its templates
+
+        Args:
+            segment (tuple[tuple[int, str], ...]): the segment
+
+        Yields:
+            Iterator[tuple[int, int, int]]: (template ID, first slot, slot after the last one)
+        """
+        start = 0
+        for slot in range(1, len(segment) + 1):
+            if slot == len(segment) or segment[slot][0] != segment[start][0]:
+                yield segment[start][0], start, slot
+                start = slot
+
+    def indexSegment(
+        self,
+        kind: str,
+        key: str,
+        segment: tuple[tuple[int, str], ...]
+    ) -> None:
+        """Adds the runs of a whole segment, e.g. after it was
+        loaded from a shard file or compacted.
+
+        Args:
+            kind (str): "files" or "dirs"
+            key (str): key of the segment
+            segment (tuple[tuple[int, str], ...]): the segment
+        """
+        for template, start, end in self.segmentRuns(segment):
+            self.addRun(kind, template, key, start, end)
+
+    def changed(
+        self,
+        shard: int
+    ) -> None:
+        """Counts a change of a shard's entries or templates,
+        the shard has to be saved again. Has to be called with the lock held.
+
+        Args:
+            shard (int): ID of the shard
+        """
+        self.versions[shard] = self.versions.get(shard, 0) + 1
+        self.unsaved.add(shard)
+
+    def saved(
+        self,
+        shard: int,
+        version: int
+    ) -> None:
+        """Marks a shard as saved, unless it changed since the version
+        that was read before saving it
+
+        Args:
+            shard (int): ID of the shard
+            version (int): version of the shard before it was saved
+        """
+        with self.lock:
+            if self.versions.get(shard, 0) == version:
+                self.unsaved.discard(shard)
+
+    def dropShard(
+        self,
+        shard: int
+    ) -> None:
+        """Forgets everything about a shard, e.g. after it was unmounted
+
+        Args:
+            shard (int): ID of the shard
+        """
+        with self.lock:
+            prefix = f"{shard}."
+            for kind in ENTRY_KINDS:
+                runs = self.runs[kind]
+                for template in [template for template in runs if shardOf(template) == shard]:
+                    del runs[template]
+                tombstones = self.data['tombstones'][kind]
+                for key in [key for key in tombstones if key.startswith(prefix)]:
+                    del tombstones[key]
+            self.dropUpdates(shard)
+            self.dirty.discard(shard)
+            self.reverse = None
+            self.names.clear()
+            self.changed(shard)
+            # an unmounted shard has nothing left to save
+            self.unsaved.discard(shard)
+
+    def dropUpdates(
+        self,
+        shard: int
+    ) -> None:
+        """Forgets the open update segments and the next template ID of a
+        shard, e.g. after its segments were renumbered.
+        Has to be called with the lock held.
+
+        Args:
+            shard (int): ID of the shard
+        """
+        for kind in ENTRY_KINDS:
+            self.updateKeys.pop((kind, shard), None)
+        self.nextLocal.pop(shard, None)
+
+    def isDead(
+        self,
+        kind: str,
+        key: str,
+        slot: int
+    ) -> bool:
+        """Checks if an entry has a tombstone
+
+        Args:
+            kind (str): "files" or "dirs"
+            key (str): key of the segment
+            slot (int): slot in the segment
+
+        Returns:
+            bool: True if the entry was deleted
+        """
+        dead = self.data['tombstones'][kind].get(key)
+        return dead is not None and slot < len(dead) and bool(dead[slot])
+
+    def locate(
+        self,
+        kind: str,
+        template: int,
+        name: str
+    ) -> Union[tuple[str, int], None]:
+        """Finds the segment and slot of a live entry.
+        Has to be called with the lock held.
+        
+        The names in the runs of the directory are put into a dict the
+        first time, runs added by the inserter since then are added to it
+        the next time. Only runs whose segment isn't published completely
+        yet are looked through one by one.
+
+        Args:
+            kind (str): "files" or "dirs"
+            template (int): ID of the template (directory)
+            name (str): name of the file or directory
+
+        Returns:
+            Union[tuple[str, int], None]: (segment key, slot) or None if it isn't indexed
+        """
+        runs = self.runs[kind].get(template)
+        if not runs:
+            return None
+        segments = self.data[kind]
+        
+        cached = self.names.get((kind, template))
+        if cached is None or cached[0] is not runs:
+            cached = [runs, {}, 0]
+            self.names[(kind, template)] = cached
+            if len(self.names) > LOCATE_CACHE:
+                self.names.popitem(last=False)
+        else:
+            self.names.move_to_end((kind, template))
+        
+        names, indexed = cached[1], cached[2]
+        while indexed < len(runs):
+            key, start, end = runs[indexed]
+            segment = segments.get(key)
+            if segment is None or len(segment) < end:
+                break
+            for slot in range(start, end):
+                names.setdefault(segment[slot][1], []).append((key, slot))
+            indexed += 1
+        cached[2] = indexed
+        
+        for key, slot in names.get(name, ()):
+            if not self.isDead(kind, key, slot):
+                return key, slot
+        for key, start, end in runs[indexed:]:
+            segment = segments.get(key)
+            if segment is None:
+                continue
+            for slot in range(start, min(end, len(segment))):
+                if segment[slot][1] == name and not self.isDead(kind, key, slot):
+                    return key, slot
+        return None
+
+    def delete(
+        self,
+        kind: str,
+        template: int,
+        name: str
+    ) -> bool:
+        """Puts a tombstone on an entry, searches won't find it anymore
+
+        Args:
+            kind (str): "files" or "dirs"
+            template (int): ID of the template (directory)
+            name (str): name of the file or directory
+
+        Returns:
+            bool: False if the entry isn't indexed
+        """
+        with self.lock:
+            location = self.locate(kind, template, name)
+            if location is None:
+                return False
+
+            key, slot = location
+            tombstones = self.data['tombstones'][kind]
+            dead = tombstones.get(key)
+            size = len(self.data[kind][key])
+            if dead is None or len(dead) < size:
+                # unsealed segments can still grow, so the tombstones grow with them
+                dead = (dead or bytearray()) + bytearray(size - len(dead or b""))
+                tombstones[key] = dead
+            dead[slot] = 1
+            self.dirty.add(shardOf(template))
+            self.changed(shardOf(template))
+            self.counters.add(shardOf(template), kind, (name,), -1)
+            self.counters.emitChanged()
+            return True
+
+    def templateOf(
+        self,
+        directory: str
+    ) -> Union[int, None]:
+        """Returns the template ID of a directory
+
+        Args:
+            directory (str): full path to the directory
+
+        Returns:
+            Union[int, None]: ID of the template or None if there's none
+        """
+        with self.lock:
+            if self.reverse is None:
+                self.reverse = {template: int(index) for index, template in list(self.data['templates'].items())}
+            return self.reverse.get(directory)
+
+    def addTemplate(
+        self,
+        shard: int,
+        directory: str
+    ) -> int:
+        """Returns the template ID of a directory and creates
+        the template in the shard if there's none yet.
+        Has to be called with the lock held, while the shard isn't crawled.
+
+        Args:
+            shard (int): ID of the shard
+            directory (str): full path to the directory
+
+        Returns:
+            int: ID of the template
+        """
+        template = self.templateOf(directory)
+        if template is not None:
+            return template
+
+        templates = self.data['templates']
+        if shard not in self.nextLocal:
+            self.nextLocal[shard] = max((int(index) >> SHARD_BITS for index in list(templates) if shardOf(int(index)) == shard), default=-1) + 1
+        template = templateID(shard, self.nextLocal[shard])
+        self.nextLocal[shard] += 1
+        templates[str(template)] = directory
+        self.addTemplates({str(template): directory})
+        self.counters.addTemplates(shard, 1)
+        return template
+
+    def insert(
+        self,
+        kind: str,
+        shard: int,
+        directory: str,
+        name: str
+    ) -> bool:
+        """Adds a single entry to the open update segment of its shard
+        and publishes it, the same way the inserter publishes its segments.
+
+        Args:
+            kind (str): "files" or "dirs"
+            shard (int): ID of the shard the entry belongs to
+            directory (str): full path to the directory it's in
+            name (str): name of the file or directory
+
+        Returns:
+            bool: False if the shard is being crawled or saved
+        """
+        with self.lock:
+            if str(shard) in self.busyShards():
+                return False
+            template = self.addTemplate(shard, directory)
+            key = self.updateKeys.get((kind, shard))
+            segment = self.data[kind].get(key, ()) if key is not None else ()
+            if key is None or len(segment) >= UPDATE_SEGMENT_SIZE:
+                key = f"{shard}.{nextSegment(self.data, shard)}"
+                self.updateKeys[(kind, shard)] = key
+                segment = ()
+
+            with FileDBInserter.publishLock:
+                entries = dict(self.data[kind])
+                entries[key] = segment + ((template, name),)
+                self.data[kind] = entries
+                self.data['generation'] += 1
+            self.addRun(kind, template, key, len(segment), len(segment) + 1)
+            self.changed(shard)
+            self.counters.add(shard, kind, (name,), 1)
+            self.counters.emitChanged()
+            return True
+
+    def templatesBelow(
+        self,
+        directory: str
+    ) -> list[tuple[str, str]]:
+        """Returns the templates of a directory and of everything below it
+
+        Args:
+            directory (str): full path to the directory
+
+        Returns:
+            list[tuple[str, str]]: list of (template ID, directory)
+        """
+        prefix = os.path.join(directory, "")
+        return [(index, template) for index, template in list(self.data['templates'].items()) if template == directory or template.startswith(prefix)]
+
+    def movePath(
+        self,
+        path: str,
+        newPath: str
+    ) -> bool:
+        """Moves or renames a file or directory by its full paths. The old
+        entry gets a tombstone and the new one is added to an update segment
+        of the shard the new directory belongs to (or the old shard if the
+        new directory isn't indexed). The contents of a moved directory
+        keep their entries, only their templates get the new paths.
+
+        Args:
+            path (str): old full path
+            newPath (str): new full path
+
+        Returns:
+            bool: False if the old path isn't indexed or one of the shards is being crawled or saved
+        """
+        directory, name = os.path.split(path)
+        newDirectory, newName = os.path.split(newPath)
+        with self.lock:
+            template = self.templateOf(directory)
+            if template is None:
+                return False
+            shard = shardOf(template)
+            # the nearest indexed directory above the new one tells its shard
+            parent = newDirectory
+            parentTemplate = self.templateOf(parent)
+            while parentTemplate is None and os.path.dirname(parent) != parent:
+                parent = os.path.dirname(parent)
+                parentTemplate = self.templateOf(parent)
+            newShard = shardOf(parentTemplate) if parentTemplate is not None else shard
+
+            # a moved directory takes the templates below it along, maybe of other shards
+            below = self.templatesBelow(path) if self.locate('dirs', template, name) is not None else []
+            busy = self.busyShards()
+            if any(str(shardOf(int(index))) in busy for index, _ in below) or str(shard) in busy or str(newShard) in busy:
+                return False
+
+            moved = False
+            for kind in ENTRY_KINDS:
+                if self.delete(kind, template, name):
+                    self.insert(kind, newShard, newDirectory, newName)
+                    moved = True
+            if moved:
+                templates = self.data['templates']
+                for index, oldDirectory in below:
+                    newTemplate = newPath + oldDirectory[len(path):]
+                    # the dict keeps its size, so searchers iterating over it aren't affected
+                    templates[index] = newTemplate
+                    if self.reverse is not None:
+                        self.reverse.pop(oldDirectory, None)
+                        self.reverse[newTemplate] = int(index)
+                    self.changed(shardOf(int(index)))
+                self.log.log.debug("Moved %s to %s in the index.", path, newPath)
+            return moved
+
+    def removePath(
+        self,
+        path: str
+    ) -> bool:
+        """Deletes a file or directory by its full path,
+        e.g. when it doesn't exist anymore
+
+        Args:
+            path (str): full path
+
+        Returns:
+            bool: True if an entry was deleted
+        """
+        directory, name = os.path.split(path)
+        template = self.templateOf(directory)
+        if template is None:
+            return False
+
+        deleted = False
+        for kind in ENTRY_KINDS:
+            deleted = self.delete(kind, template, name) or deleted
+        if deleted:
+            self.log.log.debug("Deleted %s from the index.", path)
+        return deleted
+
+    def removePathLater(
+        self,
+        path: str
+    ) -> None:
+        """Deletes a file or directory by its full path on the locator's thread,
+        so the GUI doesn't wait for the lock or the reverse look-up dict.
+
+        Args:
+            path (str): full path
+        """
+        try:
+            self.pool.submit(self.removePath, path)
+        except RuntimeError:
+            # the pool is shut down already
+            pass
+
+    def shutdown(self) -> None:
+        """Stops the locator's thread, paths that are still queued aren't deleted
+        """
+        self.pool.shutdown(wait=True, cancel_futures=True)
+
+    def compact(
+        self,
+        kind: str,
+        key: str
+    ) -> int:
+        """Rewrites a segment without its tombstoned entries.
+
+        The live entries are published under a new key and the old key is
+        removed in the same step, so a searcher either sees the old segment
+        with its tombstones or the new one without any.
+
+        Args:
+            kind (str): "files" or "dirs"
+            key (str): key of the segment
+
+        Returns:
+            int: amount of entries removed
+        """
+        with self.lock:
+            tombstones = self.data['tombstones'][kind]
+            dead = tombstones.get(key)
+            segment = self.data[kind].get(key)
+            if dead is None or segment is None:
+                return 0
+
+            live = tuple(entry for slot, entry in enumerate(segment) if slot >= len(dead) or not dead[slot])
+            shard = int(key.split(".")[0])
+            newKey = f"{shard}.{nextSegment(self.data, shard)}"
+            with FileDBInserter.publishLock:
+                entries = dict(self.data[kind])
+                del entries[key]
+                if live:
+                    entries[newKey] = live
+                self.data[kind] = entries
+                self.data['generation'] += 1
+            del tombstones[key]
+
+            runs = self.runs[kind]
+            for template in {template for template, name in segment}:
+                remaining = [run for run in runs.get(template, ()) if run[0] != key]
+                if remaining:
+                    runs[template] = remaining
+                else:
+                    runs.pop(template, None)
+                self.names.pop((kind, template), None)
+            self.indexSegment(kind, newKey, live)
+            if self.updateKeys.get((kind, shard)) == key:
+                # the update segment is sealed by compacting it
+                del self.updateKeys[(kind, shard)]
+            self.changed(shard)
+            return len(segment) - len(live)
+
+    def collectTemplates(
+        self,
+        shard: int,
+        cancelled: Union[Callable[[], bool], None] = None
+    ) -> Union[int, None]:
+        """Removes the templates of a shard which have no live entries
+        anymore and gives the remaining ones dense IDs again.
+
+        Every segment of the shard is rewritten with the new IDs and without
+        its tombstoned entries. The new segments, templates and runs are
+        built without the lock, COLLECT_CHUNK entries at a time, so deleting
+        entries in the meantime doesn't have to wait for it.
+        They're published in one step under the lock, so searchers either
+        see the old IDs or the new ones. If the shard changed meanwhile, or
+        the collection was cancelled, nothing is published.
+        
+        Must not run while the shard (or any other shard) is being crawled,
+        as the inserters add templates without the lock, so `cancelled`
+        should check for crawls. It's checked again under the lock.
+
+        Args:
+            shard (int): ID of the shard
+            cancelled (Union[Callable[[], bool], None], optional): returns True if the collection should be given up. Defaults to None.
+
+        Returns:
+            Union[int, None]: amount of templates removed, None if nothing was published because it was cancelled or the shard changed
+        """
+        cancelled = cancelled or (lambda: False)
+        prefix = f"{shard}."
+        version = self.versions.get(shard, 0)
+        tombstones = self.data['tombstones']
+        scanned = 0
+
+        def nextChunk(entries: int) -> bool:
+            nonlocal scanned
+            scanned += entries
+            if scanned < COLLECT_CHUNK:
+                return False
+            scanned = 0
+            # gives the other threads (and the GIL) a chance between the chunks
+            time.sleep(0)
+            return cancelled()
+
+        liveSegments: dict[str, list[list[tuple[int, str]]]] = {}
+        used: set[int] = set()
+        for kind in ENTRY_KINDS:
+            liveSegments[kind] = []
+            for key, segment in list(self.data[kind].items()):
+                if not key.startswith(prefix):
+                    continue
+                dead = tombstones[kind].get(key)
+                if dead is not None:
+                    segment = [entry for slot, entry in enumerate(segment) if slot >= len(dead) or not dead[slot]]
+                if segment:
+                    liveSegments[kind].append(segment)
+                    used.update(template for template, name in segment)
+                if nextChunk(len(segment)):
+                    return None
+
+        templates = self.data['templates']
+        shardTemplates = sorted(int(key) for key in list(templates) if shardOf(int(key)) == shard)
+        # entries without a template can't be shown anyway
+        used.intersection_update(shardTemplates)
+        remap = {old: templateID(shard, new) for new, old in enumerate(sorted(used))}
+        removed = len(shardTemplates) - len(used)
+        if removed == 0 and all(old == new for old, new in remap.items()):
+            with self.lock:
+                if self.versions.get(shard, 0) == version:
+                    self.dirty.discard(shard)
+            return 0
+
+        shardDirectories = {str(new): templates[str(old)] for old, new in remap.items()}
+        newSegments: dict[str, dict[str, tuple[tuple[int, str], ...]]] = {kind: {} for kind in ENTRY_KINDS}
+        newRuns: dict[str, dict[int, list[tuple[str, int, int]]]] = {kind: {} for kind in ENTRY_KINDS}
+        for kind, segments in liveSegments.items():
+            for number, segment in enumerate(segments):
+                key = f"{shard}.{number}"
+                newSegment = tuple((remap[template], name) for template, name in segment if template in remap)
+                newSegments[kind][key] = newSegment
+                for template, start, end in self.segmentRuns(newSegment):
+                    newRuns[kind].setdefault(template, []).append((key, start, end))
+                if nextChunk(len(segment)):
+                    return None
+
+        with self.lock:
+            if cancelled() or self.versions.get(shard, 0) != version:
+                return None
+
+            newTemplates = dict(self.data['templates'])
+            for old in shardTemplates:
+                newTemplates.pop(str(old), None)
+            newTemplates.update(shardDirectories)
+            with FileDBInserter.publishLock:
+                for kind in ENTRY_KINDS:
+                    entries = {key: segment for key, segment in self.data[kind].items() if not key.startswith(prefix)}
+                    entries.update(newSegments[kind])
+                    self.data[kind] = entries
+                self.data['templates'] = newTemplates
+                self.data['generation'] += 1
+
+            for kind in ENTRY_KINDS:
+                runs = self.runs[kind]
+                for old in shardTemplates:
+                    runs.pop(old, None)
+                runs.update(newRuns[kind])
+                for key in [key for key in tombstones[kind] if key.startswith(prefix)]:
+                    del tombstones[kind][key]
+            self.dropUpdates(shard)
+            self.dirty.discard(shard)
+            self.reverse = None
+            self.names.clear()
+            self.changed(shard)
+        self.counters.addTemplates(shard, -removed)
+        self.counters.emitChanged()
+        return removed
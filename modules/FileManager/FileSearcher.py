@@ -25,11 +25,18 @@ from PyQt5.QtCore import(
 )
 from datetime import datetime
 from rapidfuzz import fuzz
-from typing import Any
+from typing import (
+    Any,
+    Union
+)
 import modules.config as Config
 import modules.utils as utils
 from modules.Logger import Logger
 from modules.OSM import OSM
+from modules.FileManager.FileDBInserter import (
+    ENTRY_KINDS,
+    FileDBInserter
+)
 
 class SearchFilter:
     def __init__(self) -> None:
@@ -224,11 +231,16 @@ class SearchFilter:
 
 class FileSearcher(QThread):
     """Searches for the files from the users input
+    
+    `reconstruct` is emitted with the entries of the best results
+    ((template ID, name) tuples) and the templates of the searched snapshot.
+    The paths are only put together for the results that are shown.
 
     **Inherits from QThread**
     """
     checkPaths = pyqtSignal(str)
-    reconstruct = pyqtSignal(list)
+    # the templates are sent as object so they aren't copied
+    reconstruct = pyqtSignal(list, object)
     
     def __init__(
         self, 
@@ -255,39 +267,86 @@ class FileSearcher(QThread):
             'name=',
             'after=',
             'before=',
-            'on='
+            'on=',
+            'kind='
         ]
+        # which segments `kind=` searches, without it files and directories are searched
+        self.kinds = {
+            'file': ('files',),
+            'dir': ('dirs',),
+        }
         self.checkPaths.connect(self.search)
     
+    def takeSnapshot(self) -> dict[str, Any]:
+        """Grabs the published segments, tombstones and templates at once.
+        
+        The FileDBInserter and the template collection only ever replace
+        these dicts, so holding the publish lock for grabbing the references
+        is enough for them to match, even if the template IDs are remapped
+        while we're searching.
+
+        Returns:
+            dict[str, Any]: segments of every kind, tombstones, templates and generation
+        """
+        with FileDBInserter.publishLock:
+            snapshot = {kind: self.data[kind] for kind in ENTRY_KINDS}
+            snapshot['tombstones'] = self.data['tombstones']
+            snapshot['templates'] = self.data['templates']
+            snapshot['generation'] = self.data['generation']
+        return snapshot
+    
     def getSortedFiles(
         self, 
-        filename: str
+        filename: str,
+        kind: Union[str, None] = None,
+        snapshot: Union[dict[str, Any], None] = None
     ) -> list[tuple[int, str]]:
-        """Checks for matches in the file names and the users input.
+        """Checks for matches in the file and directory names and the users input.
         
         Depending on how much they overlap we get a score calculated by fuzz.
         If the score exceeds the minimum match requirement we add it to the list.
+        Directories are scored the same way, so they're ranked between the files.
 
         Args:
             filename (str): File name
+            kind (Union[str, None], optional): "file" or "dir" to only search one kind of entry. Defaults to None.
+            snapshot (Union[dict[str, Any], None], optional): snapshot to search in. Defaults to a new one.
 
         Returns:
             list[tuple[int, str]]: List of possible files the user could be looking for in decending order
         """
         possibleFiles = []
+        if snapshot is None:
+            snapshot = self.takeSnapshot()
         
-        for fileList in list(self.data['files'].values()):
-            for tpl in fileList:
-                score = fuzz.ratio(tpl[1], filename)
-                if score >= self.MIN_MATCH:
-                    possibleFiles.append((score, tpl))
+        for entryKind in self.kinds.get(kind or "", ENTRY_KINDS):
+            segments = snapshot[entryKind]
+            tombstones = snapshot['tombstones'][entryKind]
+            self.log.log.debug("Searching %s of generation %d (%d segments)", entryKind, snapshot['generation'], len(segments))
+            for key, fileList in segments.items():
+                dead = tombstones.get(key)
+                if dead is None:
+                    for tpl in fileList:
+                        score = fuzz.ratio(tpl[1], filename)
+                        if score >= self.MIN_MATCH:
+                            possibleFiles.append((score, tpl))
+                else:
+                    # only segments with deleted entries have to check the tombstones
+                    deadSlots = len(dead)
+                    for slot, tpl in enumerate(fileList):
+                        if slot < deadSlots and dead[slot]:
+                            continue
+                        score = fuzz.ratio(tpl[1], filename)
+                        if score >= self.MIN_MATCH:
+                            possibleFiles.append((score, tpl))
         
         possibleFiles.sort(reverse=True, key=lambda x: x[0])
         return possibleFiles
     
     def reconstructPaths(
         self, 
-        paths: list[tuple[int, str]]
+        paths: list[tuple[int, str]],
+        templates: Union[dict[str, str], None] = None
     ) -> list[tuple[int, str]]:
         """Reconstructs the paths of the possible files
         
@@ -296,13 +355,21 @@ class FileSearcher(QThread):
 
         Args:
             filename (str): File name the user is looking for
+            templates (Union[dict[str, str], None], optional): templates of the searched snapshot. Defaults to the current ones.
 
         Returns:
             list[str]: Returns a list of full paths to the files
         """
         results = []
         
-        return [(score, (os.path.join(self.data['templates'][str(template)], name))) for score, (template, name) in paths]
+        # a template can be missing if its volume was unmounted during the search
+        if templates is None:
+            templates = self.data['templates']
+        for score, (template, name) in paths:
+            directory = templates.get(str(template))
+            if directory is not None:
+                results.append((score, os.path.join(directory, name)))
+        return results
         for i in range(self.config.MAX_RESULTS) if len(paths) >= self.config.MAX_RESULTS else range(len(paths)):
             template, name = paths[i][1]
             try:
@@ -409,17 +476,17 @@ class FileSearcher(QThread):
     
     def returnBest(
         self, 
-        paths: list[tuple[int, str]], 
+        paths: list[tuple[int, tuple[int, str]]], 
         amount: int
-    ) -> list[str]:
+    ) -> list[tuple[int, str]]:
         """Returns the files that fit the query the best.
 
         Args:
-            paths (list[tuple[int, str]]): List of full paths to files.
+            paths (list[tuple[int, tuple[int, str]]]): List of scores and entries of the files.
             amount (int): Amount of files returned. (amount=5 --> top 5 files)
 
         Returns:
-            list[str]: _description_
+            list[tuple[int, str]]: Entries (template ID, name) of the best files
         """
         amount = amount if len(paths) >= self.config.MAX_RESULTS else len(paths)
         return [paths[i][1] for i in range(amount)]
@@ -435,18 +502,26 @@ class FileSearcher(QThread):
             query (str): The query is the file name the user is looking for
         """
         advanced: bool | None = None
+        kind = None
         if self.isAdvancedSearch(query):
             filteredQuery = self.filterQuery(query)
+            kind = self.getFilters(query)['kind=']
             advanced = True
         else:
             filteredQuery = query
             advanced = False
         
-        sortedPaths = self.getSortedFiles(filteredQuery)
-        results = self.reconstructPaths(sortedPaths)
+        snapshot = self.takeSnapshot()
+        templates = snapshot['templates']
+        sortedPaths = self.getSortedFiles(filteredQuery, kind, snapshot)
+        # a template can be missing if its volume was unmounted during the search
+        results = [(score, entry) for score, entry in sortedPaths if str(entry[0]) in templates]
         if advanced:
-            results = self.applyAdvancedFilters(results, query)
+            # the filters need the full paths, so they're only put together here
+            paths = self.reconstructPaths(results, templates)
+            entries = {path: entry for (_, path), (_, entry) in zip(paths, results)}
+            results = [(score, entries[path]) for score, path in self.applyAdvancedFilters(paths, query)]
         finalResults = self.returnBest(results, self.config.MAX_RESULTS)
         
         self.pp.pprint(finalResults)
-        self.reconstruct.emit(finalResults)
\ No newline at end of file
+        self.reconstruct.emit(finalResults, templates)
\ No newline at end of file
@@ -15,15 +15,20 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import time
+import heapq
 import threading
-import json
-import zlib
 import os
 from PyQt5.QtCore import QThread
-from typing import Any
+from typing import (
+    Any,
+    Union
+)
 import modules.config as Config
 import modules.OSM as osm
 from modules.Logger import Logger
+from modules.FileManager.FileCrawlGovernor import FileCrawlGovernor
+from modules.FileManager.FileDBInserter import shardOf
+from modules.FileManager.FileExcluder import FileExcluder
 
 class FileSpider(QThread):
     """The FileSpider is the part of the program responsible
@@ -39,83 +44,322 @@ class FileSpider(QThread):
     def __init__(
         self, 
         windowData: dict[str, Any],
-        log: Logger
+        log: Logger,
+        userData: Union[dict[str, Any], None] = None,
+        shards: Union[list[str], None] = None,
+        checkpoints: Union[dict[str, dict[str, Any]], None] = None,
+        governor: Union[FileCrawlGovernor, None] = None
     ) -> None:
         """Initializes the FileSpider by loading it's config and windowData
 
         Args:
             windowData (dict[str, Any]): data of all the files and templates stored
+            userData (Union[dict[str, Any], None], optional): bookmarks, recent files and relevancy used to seed the crawl. Defaults to None.
+            shards (Union[list[str], None], optional): IDs of the shards (volumes) to crawl. Defaults to every shard.
+            checkpoints (Union[dict[str, dict[str, Any]], None], optional): saved checkpoints of shards to resume. Defaults to None.
+            governor (Union[FileCrawlGovernor, None], optional): shared governor deciding how fast to crawl. Defaults to a new one.
         """
         super().__init__()
         self.config = Config.Config('Spider')
         self.log = log
         self.osm = osm.OSM()
         self.data = windowData
-        self.buffer = []
-        self.BATCH_SIZE = self.config.BATCH_SIZE
+        self.userData = userData
+        self.shards = shards if shards is not None else list(self.data['shards'])
+        self.stopped = threading.Event()
+        self.governor = governor if governor is not None else FileCrawlGovernor()
+        self.excluder = FileExcluder(self.config.EXCLUDE)
+        self.checkpoints = checkpoints or {}
+        # inode numbers of the crawled directories per device, paths if there are no inode numbers
+        self.visited: dict[int, set[int]] = {}
+        self.visitedPaths: set[str] = set()
+        self.aliases: list[str] = []
     
     def queueFiles(
         self, 
-        filePaths: list[str]
+        groups: list[tuple[str, list[str], list[str]]],
+        shard: int
     ) -> None:
-        """Queues a list of files
+        """Queues a batch of files grouped by their directory
 
         Args:
-            filePaths (list[str]): list of full paths of files
+            groups (list[tuple[str, list[str], list[str]]]): list of (directory, file names, subdirectory names)
+            shard (int): ID of the shard (drive) the files belong to
         """
-        self.data['queue'].put(filePaths)
+        self.data['queues'][shard].put(groups)
     
-    def jsonifyDB(self) -> dict[str, Any]:
-        """Turns the dictionary object into a object
-        which can be dumped into a JSON without problems
+    def queueCheckpoint(
+        self,
+        frontier: list[tuple[float, str]],
+        shard: int
+    ) -> None:
+        """Queues a checkpoint of the crawl behind the batches
+        that were already queued. The inserter saves it with the shard.
+        
+        The visited directories aren't part of it, a resumed crawl
+        gets them from the shard's templates.
 
-        Returns:
-            dict[str, Any]: modified DB
+        Args:
+            frontier (list[tuple[float, str]]): directories that weren't crawled yet with their (negated) priority
+            shard (int): ID of the shard (drive)
+        """
+        self.data['queues'][shard].checkpoint({
+            'frontier': list(frontier),
+        })
+    
+    def reportExclusions(self) -> None:
+        """Saves how many entries each exclusion rule saved
+        and which aliases were skipped into the DB and logs them.
         """
-        db = self.data.copy()
-        del db['queue']
+        self.data['excluded'] = dict(self.excluder.saved)
+        for rule, skipped in self.excluder.skipped.items():
+            self.log.log.info("Exclusion rule '%s' skipped %d directories (at least %d entries).", rule, skipped, self.excluder.saved[rule])
         
-        for i, fileSet in enumerate(db['files'].values()):
-            fileList = list(fileSet)
-            db['files'][str(i)] = fileList
+        self.data['aliases'] = list(self.aliases)
+        self.log.log.info("Skipped %d aliases of already crawled directories (%d directories crawled).", len(self.aliases), sum(map(len, self.visited.values())) + len(self.visitedPaths))
+    
+    def visit(
+        self,
+        directory: str,
+        inode: int,
+        inodes: set[int]
+    ) -> bool:
+        """Marks a directory as visited.
         
-        return db
+        Directories are identified by their inode number instead of their
+        path, so a directory that can be reached through a junction,
+        symlink or bind mount is only crawled once.
+        The inode numbers come from `DirEntry.inode()` of `os.scandir`. On unix
+        they're part of the directory listing, on Windows the first call
+        stats the directory (once per directory, like the listing itself).
+        If the file system has no inode numbers, the path is used.
+
+        Args:
+            directory (str): Full path to the directory
+            inode (int): inode number of the directory, 0 if there is none
+            inodes (set[int]): visited inode numbers of the directory's device
+
+        Returns:
+            bool: False if the directory was already visited
+        """
+        if inode:
+            if inode in inodes:
+                return False
+            inodes.add(inode)
+            return True
+        
+        key = os.path.normcase(directory)
+        if key in self.visitedPaths:
+            return False
+        self.visitedPaths.add(key)
+        return True
     
-    def saveJSON(self) -> None:
-        """Saves the whole data in a JSON. Using zlib compression
+    def statInode(
+        self,
+        directory: str
+    ) -> tuple[int, int]:
+        """Gets the device and inode number of a directory
+        that wasn't found through `os.scandir` (drives and seeds).
+
+        Args:
+            directory (str): Full path to the directory
+
+        Returns:
+            tuple[int, int]: device and inode number, (0, 0) if it can't be read
         """
-        time.sleep(1)
-        db = self.jsonifyDB()
+        try:
+            stat = os.stat(directory)
+            return stat.st_dev, stat.st_ino
+        except OSError:
+            return 0, 0
+    
+    @staticmethod
+    def isWithin(
+        path: str,
+        root: str
+    ) -> bool:
+        """Checks if a path is the root or lies below it. Unlike
+        `str.startswith` "/mnt/data2" isn't within "/mnt/data".
+
+        Args:
+            path (str): Normalized path
+            root (str): Normalized root directory
+
+        Returns:
+            bool: True if the path is within the root
+        """
+        try:
+            return os.path.commonpath([path, root]) == root
+        except ValueError:
+            # paths on different Windows drives have nothing in common
+            return False
+    
+    def seedDirectories(self) -> dict[str, float]:
+        """Collects the directories the user most likely searches in
+        so the spider can crawl them before anything else.
+        
+        The directories come from the bookmarks, recent files and the
+        relevance paths in the user data and the user's profile folders.
+
+        Returns:
+            dict[str, float]: Directory and its starting priority
+        """
+        PRIORITY = self.config.SEED_PRIORITY
+        seeds: dict[str, float] = {}
+        
+        def addSeed(directory: str, priority: float) -> None:
+            if directory and os.path.isdir(directory):
+                seeds[directory] = max(seeds.get(directory, 0), priority)
         
-        with open(f"{self.osm.exeDir()}\\user\\user.db", "wb") as dbf:
-            jsonData = json.dumps(db)
-            compressedBytes = zlib.compress(jsonData.encode(), 9)
-            dbf.write(compressedBytes)
+        profile = os.path.expanduser("~")
+        addSeed(profile, PRIORITY)
+        for folder in ("Desktop", "Documents", "Downloads", "Pictures", "Music", "Videos"):
+            addSeed(os.path.join(profile, folder), PRIORITY * 2)
+        
+        if self.userData:
+            for path in self.userData.get('relevancy', {}):
+                addSeed(os.path.dirname(path), PRIORITY * 3)
+            for path in self.userData.get('recent', []):
+                addSeed(os.path.dirname(path), PRIORITY * 4)
+            for path in self.userData.get('bookmarks', []):
+                addSeed(os.path.dirname(path), PRIORITY * 4)
+        return seeds
     
     def runThroughDrive(
         self, 
-        drive: str
+        drive: str,
+        seeds: Union[dict[str, float], None] = None,
+        shard: int = 0,
+        frontier: Union[list[tuple[float, str]], None] = None
     ) -> None:
         """Runs through the entire drive's files and adds them to the DB.
         
+        Instead of going through the drive in whatever order os.walk
+        returns, the directories are put into a priority queue.
+        The seeds start with a high priority and every subdirectory inherits
+        the priority of its parent multiplied by PRIORITY_DECAY, so the
+        deeper we go, the less important a directory gets.
+        
+        Before listing a directory every drive thread waits for the
+        governor and rests as long as it tells it to afterwards, so the
+        crawl stays inside its budget and pauses while the user searches.
+        
+        The spider never crosses into another mount point, as every
+        physical mount is its own shard and pseudo file systems (e.g. /proc)
+        aren't crawled at all.
+        
+        Every CHECKPOINT_INTERVAL seconds the frontier is checkpointed,
+        so an interrupted crawl can continue from the saved frontier.
+        The directories crawled before the checkpoint are the shard's
+        templates then, so they're known without saving the visited directories.
+        
         Check the called methods for more info
 
         Args:
             drive (str): Drive name (e.g. "C:\\")
+            seeds (Union[dict[str, float], None], optional): Directories crawled first with their priority. Defaults to None.
+            shard (int, optional): ID of the shard (drive), decides which inserter gets the files. Defaults to 0.
+            frontier (Union[list[tuple[float, str]], None], optional): frontier of a checkpoint to resume instead of starting at the drive. Defaults to None.
         """
-        buffer = self.buffer
-        BATCH_SIZE = self.BATCH_SIZE
-        
-        for root, _, files in os.walk(drive):
-            try:
-                for file in files:
-                    buffer.append(os.path.join(root, file))
-                    if len(buffer) >= BATCH_SIZE:
-                        self.data['queue'].put(buffer)
+        buffer = []
+        buffered = 0
+        governor = self.governor
+        DECAY = self.config.PRIORITY_DECAY
+        isExcluded = self.excluder.isExcluded
+        visit = self.visit
+        INTERVAL = self.config.CHECKPOINT_INTERVAL
+        driveRoot = os.path.normcase(os.path.normpath(drive))
+        otherMounts = {os.path.normcase(os.path.normpath(mount)) for mount in self.osm.mountPoints} - {driveRoot}
+        lastCheckpoint = time.time()
+        # the governor only counts the CPU time of the drive threads, not of the whole process
+        lastCPU = time.thread_time()
+        
+        # the spider never leaves the drive's mount, so every directory is on the drive's device
+        device, _ = self.statInode(drive)
+        inodes = self.visited.setdefault(device, set())
+        
+        # seeds belong to the drive whose mount is the innermost one above them
+        nestedMounts = [mount for mount in otherMounts if self.isWithin(mount, driveRoot)]
+        ownSeeds = {}
+        for directory, priority in (seeds or {}).items():
+            path = os.path.normcase(os.path.normpath(directory))
+            if self.isWithin(path, driveRoot) and not any(self.isWithin(path, mount) for mount in nestedMounts):
+                seedDevice, inode = self.statInode(directory)
+                # a mount the OSM doesn't list would still put the seed on another device
+                if seedDevice == device:
+                    ownSeeds[directory] = (priority, inode)
+        # seeds are reached a second time through their parent, that's not an alias
+        seeded = {os.path.normcase(directory) for directory in ownSeeds}
+        # a resumed crawl reaches the directories crawled or queued before the checkpoint again
+        known = set()
+        
+        # heapq is a min-heap so the priorities are negated
+        # directories are marked as visited when they're pushed, the drive and the seeds here
+        if frontier is not None:
+            frontier = [(priority, directory) for priority, directory in frontier]
+            known.update(os.path.normcase(template) for key, template in list(self.data['templates'].items()) if shardOf(int(key)) == shard)
+            known.update(os.path.normcase(directory) for priority, directory in frontier)
+        else:
+            frontier = [(-1.0, drive)]
+            visit(drive, self.statInode(drive)[1], inodes)
+            for directory, (priority, inode) in ownSeeds.items():
+                frontier.append((-priority, directory))
+                visit(directory, inode, inodes)
+        heapq.heapify(frontier)
+        
+        try:
+            while frontier and not self.stopped.is_set():
+                if INTERVAL > 0 and time.time() - lastCheckpoint >= INTERVAL:
+                    # everything crawled so far has to be queued before the checkpoint
+                    self.queueFiles(buffer, shard)
+                    buffer = []
+                    buffered = 0
+                    self.queueCheckpoint(frontier, shard)
+                    lastCheckpoint = time.time()
+            
+                if not governor.acquire(self.stopped):
+                    break
+                listStart = time.perf_counter()
+            
+                priority, root = heapq.heappop(frontier)
+            
+                names = []
+                dirs = []
+                try:
+                    with os.scandir(root) as entries:
+                        for entry in entries:
+                            if entry.is_dir():
+                                if not entry.is_symlink() and not isExcluded(entry.name, entry.path) and os.path.normcase(entry.path) not in otherMounts:
+                                    if visit(entry.path, entry.inode(), inodes):
+                                        if not known or os.path.normcase(entry.path) not in known:
+                                            heapq.heappush(frontier, (priority * DECAY, entry.path))
+                                    elif os.path.normcase(entry.path) not in seeded and os.path.normcase(entry.path) not in known:
+                                        self.aliases.append(entry.path)
+                                        self.log.log.debug("Skipped alias of an already crawled directory: %s", entry.path)
+                                    dirs.append(entry.name)
+                            else:
+                                names.append(entry.name)
+                except (PermissionError, OSError) as e:
+                    self.log.log.info(f"Skipped: {root} ({e})")
+            
+                cpu = time.thread_time()
+                rest = governor.release(time.perf_counter() - listStart, cpu - lastCPU)
+                lastCPU = cpu
+                if rest > 0:
+                    self.stopped.wait(rest)
+            
+                if names or dirs:
+                    # the directory is the template, so the inserter doesn't have to split any paths
+                    buffer.append((root, names, dirs))
+                    buffered += len(names) + len(dirs)
+                    if buffered >= governor.batchSize:
+                        self.queueFiles(buffer, shard)
                         buffer = []
-            except (PermissionError, OSError) as e:
-                self.log.log.info(f"Skipped: {root} ({e})")
-                continue
+                        buffered = 0
+            self.queueFiles(buffer, shard)
+        finally:
+            # the inserter waits for the end of the crawl, even if crawling the drive failed
+            self.data['queues'][shard].finish()
     
     def run(self) -> None:
         """This is the main part of the Thread
@@ -125,14 +369,29 @@ class FileSpider(QThread):
         templates and file names
         """
         startTime = time.time()
-        drives = self.osm.drives
+        seeds = self.seedDirectories()
+        self.log.log.debug("Seeding crawl with %d directories.", len(seeds))
+        
+        # every drive is its own shard with its own inserter
+        driveThreads = []
+        for shard in self.shards:
+            drive = self.data['shards'][shard]['root']
+            checkpoint = self.checkpoints.get(shard)
+            if checkpoint is not None:
+                self.log.log.info("Resuming crawl of %s (%d directories left).", drive, len(checkpoint['frontier']))
+            frontier = checkpoint['frontier'] if checkpoint is not None else None
+            newT = threading.Thread(target=self.runThroughDrive, args=[drive, seeds, int(shard), frontier])
+            newT.start()
+            driveThreads.append(newT)
+        for driveThread in driveThreads:
+            driveThread.join()
         
-        for drive in drives:
-            if "C" not in drive:
-                newT = threading.Thread(target=self.runThroughDrive, args=[drive,])
-                newT.start()
-        self.runThroughDrive(drives[0])
         endTime = time.time()
         self.log.log.debug("Finished full-scan in %d seconds.", int(endTime-startTime))
-        self.queueFiles(self.buffer)
-        self.saveJSON()
\ No newline at end of file
+        self.reportExclusions()
+    
+    def stop(self) -> None:
+        """Stops crawling after the current directory.
+        The queues are still finished, so the inserters stop too.
+        """
+        self.stopped.set()
\ No newline at end of file
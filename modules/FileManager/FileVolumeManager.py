@@ -0,0 +1,472 @@
+# FlashBar - ./modules/FileManager/FileVolumeManager.py -> Mounts, unmounts and refreshes the shard of each volume.
+# Copyright (C) 2025  Florian, Floerianc on Github (https://www.github.com/floerianc)
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from PyQt5.QtCore import (
+    QObject,
+    QThread,
+    QTimer,
+    pyqtSignal
+)
+from typing import (
+    Any,
+    Union
+)
+import os
+import modules.config as Config
+import modules.OSM as osm
+from modules.Logger import Logger
+from modules.FileManager.FileCompactor import FileCompactor
+from modules.FileManager.FileCrawlGovernor import FileCrawlGovernor
+from modules.FileManager.FileDBInserter import (
+    ENTRY_KINDS,
+    FileDBInserter,
+    FileDBIndexer,
+    shardOf
+)
+from modules.FileManager.FileDBLoader import FileDBLoader
+from modules.FileManager.FileDBSaver import FileDBSaver
+from modules.FileManager.FileLocator import FileLocator
+from modules.FileManager.FileSpider import FileSpider
+
+class FileVolumeManager(QObject):
+    """Every volume (drive, USB stick, network share...) is its own
+    shard with its own file in ./user/shards/ and its own segments.
+
+    This class decides which shards can be loaded from their file and
+    which have to be crawled, and it mounts and unmounts the shards while
+    the program is running, e.g. when a USB stick is plugged in or removed.
+    A volume can also be refreshed without touching the other ones.
+    Shard files with the checkpoint of an unfinished crawl are mounted
+    and their crawl is resumed from the checkpoint.
+
+    All crawls share one governor, so together they stay inside the
+    crawl budget and can be paused while the user searches.
+    They also share one locator, which the compactor cleans up,
+    and its counters, which know the size of the index at any time.
+
+    `started` is emitted once the shard files are mounted and the crawls started,
+    `indexed` when no crawl is running anymore,
+    `changed` whenever a shard was mounted, unmounted or indexed.
+    """
+    started = pyqtSignal()
+    indexed = pyqtSignal()
+    changed = pyqtSignal()
+
+    def __init__(
+        self,
+        windowData: dict[str, Any],
+        log: Logger,
+        userData: Union[dict[str, Any], None] = None
+    ) -> None:
+        super().__init__()
+        self.config = Config.Config('DB')
+        self.data = windowData
+        self.log = log
+        self.userData = userData
+        self.osm = osm.OSM()
+        self.loader = FileDBLoader(self.log)
+        self.mounter: Union[FileDBLoader, None] = None
+
+        # every crawl is a spider, an indexer and a saver for one or more shards
+        self.crawls: list[dict[str, Any]] = []
+        self.savers: list[FileDBSaver] = []
+        self.checkpoints: dict[str, dict[str, Any]] = {}
+        self.governor = FileCrawlGovernor()
+        self.locator = FileLocator(self.data, self.log, lambda: self.busyShards)
+        self.counters = self.locator.counters
+        self.compactor = FileCompactor(self.data, self.log, self.locator, lambda: self.busyShards)
+
+        self.pollTimer = QTimer()
+        self.pollTimer.setInterval(self.config.VOLUME_POLL * 1000)
+        self.pollTimer.timeout.connect(self.poll)
+
+    @property
+    def crawling(self) -> bool:
+        """Returns True if any volume is being crawled
+
+        Returns:
+            bool: True if crawling
+        """
+        return bool(self.crawls)
+
+    @property
+    def crawlingShards(self) -> set[str]:
+        """Returns the IDs of all shards that are being crawled
+
+        Returns:
+            set[str]: IDs of the shards
+        """
+        return {shard for crawl in self.crawls for shard in crawl['shards']}
+
+    @property
+    def busyShards(self) -> set[str]:
+        """Returns the IDs of all shards that are being crawled or saved
+        and the ones whose crawl still has to be resumed
+
+        Returns:
+            set[str]: IDs of the shards
+        """
+        return self.crawlingShards | {shard for saver in self.savers for shard in saver.shards} | set(self.checkpoints)
+
+    def shardOfDrive(
+        self,
+        drive: str
+    ) -> Union[str, None]:
+        """Returns the ID of the mounted shard of a drive
+
+        Args:
+            drive (str): Drive name (e.g. "C:\\")
+
+        Returns:
+            Union[str, None]: ID of the shard or None if it isn't mounted
+        """
+        for shard, info in list(self.data['shards'].items()):
+            if info['root'] == drive:
+                return shard
+        return None
+
+    def driveOf(
+        self,
+        path: str
+    ) -> Union[str, None]:
+        """Returns the mounted drive a path is on, the innermost one
+        if the drive is mounted inside of another one
+
+        Args:
+            path (str): Full path to a file or directory
+
+        Returns:
+            Union[str, None]: Drive name or None if no mounted drive has the path
+        """
+        path = os.path.normcase(os.path.abspath(path))
+        drives = []
+        for info in list(self.data['shards'].values()):
+            root = os.path.normcase(os.path.abspath(info['root']))
+            try:
+                if os.path.commonpath([path, root]) == root:
+                    drives.append((len(root), info['root']))
+            except ValueError:
+                # paths on different Windows drives have nothing in common
+                continue
+        return max(drives)[1] if drives else None
+
+    def freeShardID(self) -> str:
+        """Returns the lowest shard ID which isn't used yet
+
+        Returns:
+            str: ID of the shard
+        """
+        shardID = 0
+        while str(shardID) in self.data['shards']:
+            shardID += 1
+        return str(shardID)
+
+    def start(self) -> None:
+        """Mounts every volume which has a recent shard file in the background,
+        `mounted()` continues once they're all mounted.
+
+        Mounting only publishes new segments, so searching while
+        the shards are mounted is fine, it just finds less.
+        """
+        self.mounter = FileDBLoader(self.log, None, self.mount)
+        self.mounter.loaded.connect(self.mounted)
+        self.mounter.start()
+
+    def mounted(
+        self,
+        drives: list[str],
+        toCrawl: list[str]
+    ) -> None:
+        """Crawls the volumes that couldn't be mounted and resumes unfinished crawls.
+        Then starts looking for new or removed volumes.
+
+        Args:
+            drives (list[str]): drives of the system
+            toCrawl (list[str]): drives without a recent shard file
+        """
+        if toCrawl:
+            self.crawl(toCrawl)
+        self.resume()
+        self.compactor.start(QThread.Priority.LowestPriority)
+        if self.config.VOLUME_POLL > 0:
+            self.pollTimer.start()
+
+        self.started.emit()
+        if not self.crawling:
+            self.indexed.emit()
+
+    def mount(
+        self,
+        drive: str
+    ) -> bool:
+        """Tries to load the shard file of a drive's volume and
+        publishes its templates and segments.
+        If the shard has a checkpoint, it's kept for `resume()`.
+        Drives that already have a shard are skipped.
+
+        Runs on the thread of a FileDBLoader. The files dict is copied
+        and replaced like the inserters do it, so searches running at the
+        same time aren't affected.
+
+        Args:
+            drive (str): Drive name (e.g. "C:\\")
+
+        Returns:
+            bool: False if there's no recent shard file or its ID is already used
+        """
+        if self.shardOfDrive(drive) is not None:
+            return True
+        try:
+            volume = self.osm.volumeID(drive)
+        except OSError as e:
+            self.log.log.error("Couldn't identify volume of %s (%s)", drive, e)
+            return False
+
+        db = self.loader.loadShard(volume)
+        if db is None:
+            return False
+
+        shard = str(db['shard'])
+        # the locator's lock keeps the template collection from replacing the templates meanwhile
+        # and `crawl()` from giving the shard ID to another drive
+        with self.locator.lock:
+            if shard in self.data['shards']:
+                self.log.log.info("Shard ID %s of volume %s is already used, volume has to be crawled again.", shard, volume)
+                return False
+            self.data['shards'][shard] = {'root': drive, 'volume': volume}
+            self.data['templates'].update(db['templates'])
+            self.locator.addTemplates(db['templates'])
+            with FileDBInserter.publishLock:
+                for kind in ENTRY_KINDS:
+                    entries = dict(self.data[kind])
+                    entries.update(db[kind])
+                    self.data[kind] = entries
+                self.data['generation'] += 1
+            for kind in ENTRY_KINDS:
+                for key, segment in db[kind].items():
+                    self.locator.indexSegment(kind, key, segment)
+            # saved shards still have the templates of deleted entries
+            self.locator.dirty.add(int(shard))
+        self.counters.countShard(int(shard), db)
+
+        if db.get('checkpoint'):
+            self.checkpoints[shard] = db['checkpoint']
+        self.log.log.info("Mounted shard %s (%s, volume %s) with %d templates.", shard, drive, volume, len(db['templates']))
+        self.changed.emit()
+        return True
+
+    def unmount(
+        self,
+        shard: str
+    ) -> None:
+        """Removes the templates and segments of a shard from the index.
+        Shards that are being crawled can't be unmounted.
+
+        Args:
+            shard (str): ID of the shard
+        """
+        if shard in self.crawlingShards:
+            return
+
+        shardID = int(shard)
+        prefix = f"{shard}."
+        with FileDBInserter.publishLock:
+            for kind in ENTRY_KINDS:
+                self.data[kind] = {key: segment for key, segment in self.data[kind].items() if not key.startswith(prefix)}
+            self.data['generation'] += 1
+
+        with self.locator.lock:
+            templates = self.data['templates']
+            for key in [key for key in list(templates) if shardOf(int(key)) == shardID]:
+                del templates[key]
+            self.locator.dropShard(shardID)
+        self.counters.dropShard(shardID)
+
+        self.checkpoints.pop(shard, None)
+        info = self.data['shards'].pop(shard)
+        self.data['queues'].pop(shardID, None)
+        self.log.log.info("Unmounted shard %s (%s, volume %s).", shard, info['root'], info['volume'])
+        self.changed.emit()
+
+    def crawl(
+        self,
+        drives: list[str]
+    ) -> None:
+        """Gives every drive a new shard and starts crawling them
+
+        Args:
+            drives (list[str]): Drive names (e.g. ["C:\\", "D:\\"])
+        """
+        shards = []
+        for drive in drives:
+            try:
+                volume = self.osm.volumeID(drive)
+            except OSError as e:
+                self.log.log.error("Couldn't identify volume of %s (%s)", drive, e)
+                continue
+            # a FileDBLoader might mount a shard at the same time
+            with self.locator.lock:
+                shard = self.freeShardID()
+                self.data['shards'][shard] = {'root': drive, 'volume': volume}
+            shards.append(shard)
+
+        if shards:
+            self.crawlShards(shards)
+
+    def resume(self) -> None:
+        """Resumes the crawls of every mounted shard with a checkpoint
+        """
+        if self.checkpoints:
+            checkpoints = self.checkpoints
+            self.checkpoints = {}
+            self.crawlShards(list(checkpoints), checkpoints)
+
+    def crawlShards(
+        self,
+        shards: list[str],
+        checkpoints: Union[dict[str, dict[str, Any]], None] = None
+    ) -> None:
+        """Starts a spider and an indexer for the shards.
+        The saver is created right away, so the inserters can save checkpoints.
+
+        Args:
+            shards (list[str]): IDs of the shards
+            checkpoints (Union[dict[str, dict[str, Any]], None], optional): checkpoints to resume from. Defaults to None.
+        """
+        saver = FileDBSaver(self.data, self.log, shards)
+        self.log.log.info("Crawling shards %s.", ", ".join(shards))
+        # the template collection can't run while the inserters add templates, and the
+        # inserters copy the templates and segment numbers of resumed shards when they're created
+        with self.locator.lock:
+            crawl = {
+                'shards': shards,
+                'saver': saver,
+                'indexer': FileDBIndexer(self.data, self.log, shards, saver, self.locator),
+                'spider': FileSpider(self.data, self.log, self.userData, shards, checkpoints, self.governor),
+            }
+            crawl['indexer'].indexed.connect(lambda: self.crawlFinished(crawl))
+            self.crawls.append(crawl)
+            # the governor limits the crawl, the priorities keep the rest of the system responsive
+            crawl['spider'].start(QThread.Priority.LowPriority)
+            crawl['indexer'].start(QThread.Priority.LowPriority)
+
+    def crawlFinished(
+        self,
+        crawl: dict[str, Any]
+    ) -> None:
+        """Saves the shards of a finished crawl and emits `indexed`
+        if it was the last crawl running.
+
+        Args:
+            crawl (dict[str, Any]): the finished crawl
+        """
+        self.crawls.remove(crawl)
+        for shard in crawl['shards']:
+            self.data['queues'].pop(int(shard), None)
+
+        saver = crawl['saver']
+        saver.finished.connect(lambda: self.savers.remove(saver))
+        self.savers.append(saver)
+        saver.start()
+
+        self.changed.emit()
+        if not self.crawls:
+            self.indexed.emit()
+
+    def refresh(
+        self,
+        drive: str
+    ) -> None:
+        """Crawls a drive again without touching the other shards
+
+        Args:
+            drive (str): Drive name (e.g. "C:\\")
+        """
+        shard = self.shardOfDrive(drive)
+        if shard is not None:
+            if shard in self.crawlingShards:
+                return
+            self.unmount(shard)
+        self.crawl([drive])
+
+    def refreshPath(
+        self,
+        path: str
+    ) -> None:
+        """Crawls the drive a file or directory is on again
+
+        Args:
+            path (str): Full path to a file or directory
+        """
+        drive = self.driveOf(path)
+        if drive is not None:
+            self.refresh(drive)
+
+    def poll(self) -> None:
+        """Lists the drives of the system and mounts the new ones on a
+        FileDBLoader, so neither stat'ing the mount points nor loading
+        a shard file blocks the GUI. `polled()` does the rest.
+        """
+        if self.mounter is not None and self.mounter.isRunning():
+            return
+        self.mounter = FileDBLoader(self.log, None, self.mount)
+        self.mounter.loaded.connect(self.polled)
+        self.mounter.start()
+
+    def polled(
+        self,
+        drives: list[str],
+        toCrawl: list[str]
+    ) -> None:
+        """Compares the mounted shards with the drives of the system.
+        Removed drives are unmounted, new drives without a shard file are crawled.
+
+        Args:
+            drives (list[str]): drives of the system
+            toCrawl (list[str]): new drives without a recent shard file
+        """
+        for shard, info in list(self.data['shards'].items()):
+            if info['root'] not in drives:
+                self.unmount(shard)
+
+        if toCrawl:
+            self.crawl(toCrawl)
+        self.resume()
+
+    def stop(self) -> None:
+        """Cancels every running crawl without saving it and waits
+        for the threads. Shards that are being saved are waited for.
+        """
+        self.pollTimer.stop()
+        if self.mounter is not None:
+            self.mounter.requestInterruption()
+            self.mounter.wait()
+        self.compactor.stop()
+        for crawl in self.crawls:
+            # the indexer is stopped first, so it can't emit `indexed` for a cancelled crawl
+            crawl['indexer'].stop()
+            crawl['spider'].stop()
+        for crawl in self.crawls:
+            crawl['spider'].wait()
+            crawl['indexer'].wait()
+            # the checkpoints are kept, so the crawl can be resumed next time
+            crawl['saver'].stopCheckpoints()
+        for saver in list(self.savers):
+            saver.wait()
+        self.compactor.wait()
+        self.locator.shutdown()
+        # deletes and moves since the compactor ran last
+        self.compactor.saveShards()
@@ -1,4 +1,12 @@
-from modules.FileManager.FileDBInserter import FileDBInserter
+from modules.FileManager.FileBatchQueue import FileBatchQueue
+from modules.FileManager.FileCompactor import FileCompactor
+from modules.FileManager.FileCounters import FileCounters
+from modules.FileManager.FileCrawlGovernor import FileCrawlGovernor
+from modules.FileManager.FileDBInserter import FileDBInserter, FileDBIndexer
 from modules.FileManager.FileDBLoader import FileDBLoader
+from modules.FileManager.FileDBSaver import FileDBSaver
+from modules.FileManager.FileExcluder import FileExcluder
+from modules.FileManager.FileLocator import FileLocator
 from modules.FileManager.FileSearcher import FileSearcher, SearchFilter
-from modules.FileManager.FileSpider import FileSpider
\ No newline at end of file
+from modules.FileManager.FileSpider import FileSpider
+from modules.FileManager.FileVolumeManager import FileVolumeManager
\ No newline at end of file
@@ -0,0 +1,143 @@
+# FlashBar - ./modules/IconCache.py -> Hands out shared icons for files and directories.
+# Copyright (C) 2025  Florian, Floerianc on Github (https://www.github.com/floerianc)
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+from collections import OrderedDict
+from PyQt5.QtCore import QFileInfo
+from PyQt5.QtGui import QIcon
+from PyQt5.QtWidgets import QFileIconProvider
+from typing import Union
+import modules.config as Config
+import modules.utils as utils
+
+# these files bring their own icon, so their native icon is cached per file instead of per extension
+OWN_ICON_EXTS = (
+    '.exe',
+    '.lnk',
+    '.ico',
+    '.url'
+)
+
+class IconCache:
+    """Every icon of ./icons/ is decoded once and shared by every list,
+    so a row only gets a reference to an existing QIcon.
+
+    If NATIVE_ICONS is enabled, the icons of the OS (e.g. the
+    Windows shell) are used instead. Asking the OS is slow, so they
+    are kept in a LRU cache with ICON_CACHE entries, per extension
+    or per file for files that bring their own icon (.exe, .lnk...).
+    If the OS has no icon, the bundled one is used.
+
+    All icons have to be requested from the GUI thread.
+    """
+    shared: Union['IconCache', None] = None
+
+    def __init__(self) -> None:
+        """Initializes the IconCache and loads every bundled icon
+        """
+        self.config = Config.Config('UI')
+        self.icons: dict[str, QIcon] = {}
+        iconFiles = os.listdir(utils.iconDir()) if os.path.isdir(utils.iconDir()) else []
+        for filename in iconFiles:
+            name, extension = os.path.splitext(filename)
+            if extension.lower() == ".png":
+                self.icons[name] = QIcon(os.path.join(utils.iconDir(), filename))
+
+        self.native: OrderedDict[str, QIcon] = OrderedDict()
+        self.provider = QFileIconProvider() if self.config.NATIVE_ICONS else None
+
+    @classmethod
+    def instance(cls) -> 'IconCache':
+        """Returns the IconCache of the process, it's created on first use
+
+        Returns:
+            IconCache: the shared IconCache
+        """
+        if cls.shared is None:
+            cls.shared = cls()
+        return cls.shared
+
+    def bundledIcon(
+        self,
+        path: str,
+        isDir: bool
+    ) -> QIcon:
+        """Returns the bundled icon of a file's extension
+
+        Args:
+            path (str): Full path to the file
+            isDir (bool): True for directories
+
+        Returns:
+            QIcon: shared icon
+        """
+        name = "folder" if isDir else utils.iconName(path)
+        return self.icons.get(name) or self.icons.get("txt") or QIcon()
+
+    def nativeIcon(
+        self,
+        path: str,
+        isDir: bool
+    ) -> QIcon:
+        """Returns the icon the OS shows for a file, cached in the LRU cache
+
+        Args:
+            path (str): Full path to the file
+            isDir (bool): True for directories
+
+        Returns:
+            QIcon: icon of the OS, null if the OS has none
+        """
+        extension = os.path.splitext(path)[1].lower()
+        if isDir:
+            key = os.sep
+        elif extension in OWN_ICON_EXTS:
+            key = path
+        else:
+            key = extension
+
+        icon = self.native.get(key)
+        if icon is not None:
+            self.native.move_to_end(key)
+            return icon
+
+        icon = self.provider.icon(QFileInfo(path)) # type: ignore
+        self.native[key] = icon
+        if len(self.native) > max(1, self.config.ICON_CACHE):
+            self.native.popitem(last=False)
+        return icon
+
+    def icon(
+        self,
+        path: str,
+        isDir: Union[bool, None] = None
+    ) -> QIcon:
+        """Returns the icon of a file or directory
+
+        Args:
+            path (str): Full path to the file
+            isDir (Union[bool, None], optional): True for directories, checked on the filesystem if None. Defaults to None.
+
+        Returns:
+            QIcon: shared icon
+        """
+        if isDir is None:
+            isDir = os.path.isdir(path)
+        if self.provider is not None:
+            icon = self.nativeIcon(path, isDir)
+            if not icon.isNull():
+                return icon
+        return self.bundledIcon(path, isDir)
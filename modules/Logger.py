@@ -14,8 +14,9 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import os
 import logging
-import time
+import threading
 import modules.config as Config
 from PyQt5.QtCore import QThread
 from typing import(
@@ -27,17 +28,24 @@ from modules.OSM import OSM
 if TYPE_CHECKING:
     from app import SearchBar
 
-osm = OSM()
-exePath = osm.exeDir()
-
-logging.basicConfig(
-    filename=f"{exePath}\\log.log",
-    format='%(asctime)s %(message)s',
-    filemode='w'
-)
 logger = logging.getLogger()
-logger.setLevel(logging.DEBUG)
-logger.info("Working directory: %s", exePath)
+
+def configureLogging() -> None:
+    """Lets the root logger write to ./log.log.
+    
+    It's called by the first Logger instead of at import time, so
+    importing a module that uses the Logger doesn't touch the log file.
+    """
+    if logger.handlers:
+        return
+    exePath = OSM().exeDir()
+    logging.basicConfig(
+        filename=os.path.join(exePath, "log.log"),
+        format='%(asctime)s %(message)s',
+        filemode='w'
+    )
+    logger.setLevel(logging.DEBUG)
+    logger.info("Working directory: %s", exePath)
 
 class Logger(QThread):
     """Logger class logs information regarding the program
@@ -55,23 +63,44 @@ class Logger(QThread):
             windowData (dict[str, any]): data of the window
         """
         super().__init__()
+        configureLogging()
         self.log = logger
         self.config = Config.Config('Logging')
         self.window = window
         self.data = window.dataset
-        self.finishedScan = False
+        self.scanDone = threading.Event()
+    
+    def logQueue(self) -> None:
+        """Logs the state of the queue between the spider and the inserter.
+        
+        A queue that's always full with a lot of stall time means the
+        spider is waiting on the inserter, an empty queue means the inserter
+        is waiting on the spider.
+        """
+        for shard, fileQueue in list(self.data['queues'].items()):
+            stats = fileQueue.stats
+            self.log.info(
+                "Queue %d: %d batches, %.1f MB (peak %.1f MB), spider stalled %d times for %.2f seconds",
+                shard,
+                stats['depth'],
+                stats['bytes'] / 1048576,
+                stats['peak'] / 1048576,
+                stats['stalls'],
+                stats['stallTime']
+            )
+    
+    def scanFinished(self) -> None:
+        """Tells the Logger that indexing is done, so it
+        stops logging and the thread can end
+        """
+        self.scanDone.set()
     
     def run(self) -> None:
         """Sleeps for a while (declared in config)
-        and then logs the amount of files and templates.
+        and then logs the amount of files and templates
+        until the scan is finished.
         """
-        temp = 0
-        while not self.finishedScan:
-            time.sleep(self.config.INTERVAL)
-            if self.window.files <= temp:
-                self.finishedScan = True
-                continue
-            else:
-                files = self.window.files
-                self.log.info("%d Files, %d Templates", files, len(self.data['templates']))
-                temp = files
\ No newline at end of file
+        while not self.scanDone.wait(self.config.INTERVAL):
+            self.log.info("%d Files, %d Templates", self.window.files, self.window.templates)
+            self.logQueue()
+        self.log.info("Scan finished: %d Files, %d Templates", self.window.files, self.window.templates)
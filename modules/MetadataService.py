@@ -0,0 +1,153 @@
+# FlashBar - ./modules/MetadataService.py -> Stats files in the background for the GUI.
+# Copyright (C) 2025  Florian, Floerianc on Github (https://www.github.com/floerianc)
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import stat
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from PyQt5.QtCore import (
+    QObject,
+    pyqtSignal
+)
+from typing import Union
+import modules.config as Config
+
+# expired entries are only removed once the cache is bigger than this
+MAX_ENTRIES = 4096
+
+@dataclass(frozen=True)
+class FileMetadata:
+    exists: bool
+    isDir: bool = False
+    size: int = 0
+    mtime: float = 0.0
+
+class MetadataService(QObject):
+    """Stats files on a small thread pool, so the GUI thread never
+    waits for the filesystem (e.g. a slow network drive).
+
+    `get()` returns what's cached and otherwise queues the path and
+    returns None. Once the metadata is there, `resolved` is emitted on
+    the GUI thread with the path and its FileMetadata, and the lists
+    update their rows. Metadata is cached for METADATA_TTL seconds.
+
+    **Inherits from QObject**
+    """
+    resolved = pyqtSignal(str, object)
+    # emitted by the workers, delivered to the thread of the service
+    fetched = pyqtSignal(str, object)
+
+    def __init__(self) -> None:
+        """Initializes the MetadataService and its thread pool
+        """
+        super().__init__()
+        self.config = Config.Config('UI')
+        self.pool = ThreadPoolExecutor(max_workers=max(1, self.config.METADATA_WORKERS), thread_name_prefix="metadata")
+        # path -> (time it was fetched, metadata)
+        self.cache: dict[str, tuple[float, FileMetadata]] = {}
+        self.pending: set[str] = set()
+        self.fetched.connect(self.store)
+
+    def get(
+        self,
+        path: str
+    ) -> Union[FileMetadata, None]:
+        """Returns the cached metadata of a path. If there's none or
+        it expired, it's fetched in the background.
+
+        Args:
+            path (str): Full path to the file
+
+        Returns:
+            Union[FileMetadata, None]: metadata or None until `resolved` is emitted for the path
+        """
+        cached = self.cache.get(path)
+        if cached is not None and time.monotonic() - cached[0] < self.config.METADATA_TTL:
+            return cached[1]
+        self.request(path)
+        return None
+
+    def request(
+        self,
+        path: str
+    ) -> None:
+        """Queues a path to be fetched, unless it's queued already
+
+        Args:
+            path (str): Full path to the file
+        """
+        if path in self.pending:
+            return
+        self.pending.add(path)
+        try:
+            self.pool.submit(self.fetch, path)
+        except RuntimeError:
+            # the pool is shut down already
+            self.pending.discard(path)
+
+    def fetch(
+        self,
+        path: str
+    ) -> None:
+        """Stats a file, runs on a worker thread
+
+        Args:
+            path (str): Full path to the file
+        """
+        try:
+            result = os.stat(path)
+            metadata = FileMetadata(True, stat.S_ISDIR(result.st_mode), result.st_size, result.st_mtime)
+        except (OSError, ValueError):
+            metadata = FileMetadata(False)
+        self.fetched.emit(path, metadata)
+
+    def store(
+        self,
+        path: str,
+        metadata: FileMetadata
+    ) -> None:
+        """Caches fetched metadata and emits `resolved`
+
+        Args:
+            path (str): Full path to the file
+            metadata (FileMetadata): metadata of the file
+        """
+        self.pending.discard(path)
+        now = time.monotonic()
+        self.cache.pop(path, None)
+        self.cache[path] = (now, metadata)
+        if len(self.cache) > MAX_ENTRIES:
+            self.prune(now)
+        self.resolved.emit(path, metadata)
+
+    def prune(
+        self,
+        now: float
+    ) -> None:
+        """Removes expired entries and, if that isn't enough, the oldest ones
+
+        Args:
+            now (float): current time of time.monotonic()
+        """
+        self.cache = {path: entry for path, entry in self.cache.items() if now - entry[0] < self.config.METADATA_TTL}
+        while len(self.cache) > MAX_ENTRIES:
+            del self.cache[next(iter(self.cache))]
+
+    def stop(self) -> None:
+        """Cancels every queued path, running stats aren't waited for
+        """
+        self.pool.shutdown(wait=False, cancel_futures=True)
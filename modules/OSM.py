@@ -0,0 +1,354 @@
+# FlashBar - modules/OSM.py -> Handles some of the logic regarding pathing and logical drives
+# Copyright (C) 2025  Florian, Floerianc on Github (https://www.github.com/floerianc)
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import warnings
+import os
+import re
+import sys
+import subprocess
+from abc import (
+    ABC,
+    abstractmethod
+)
+if sys.platform == "win32":
+    import win32api
+    import winreg
+
+# file systems that don't hold any user files and are never crawled
+PSEUDO_FILESYSTEMS = {
+    "proc", "sysfs", "tmpfs", "devtmpfs", "devpts", "cgroup", "cgroup2",
+    "securityfs", "pstore", "debugfs", "tracefs", "configfs", "fusectl",
+    "mqueue", "hugetlbfs", "bpf", "autofs", "binfmt_misc", "nsfs", "ramfs",
+    "efivarfs", "rpc_pipefs", "selinuxfs", "squashfs", "fuse.portal", "fuse.gvfsd-fuse",
+}
+
+class OSMBackend(ABC):
+    """Everything that works differently on each operating system.
+    
+    The OSM picks the backend of the current platform, so the rest
+    of the program never has to check which OS it is running on.
+    A backend that misses one of the abstract methods can't be created.
+    """
+    @abstractmethod
+    def drives(self) -> list[str]:
+        """Returns the roots of every volume that should be crawled
+
+        Returns:
+            list[str]: list of drives
+        """
+    
+    def mountPoints(self) -> list[str]:
+        """Returns every mount point in the system, including the
+        ones that aren't crawled. The spider never crosses into them.
+
+        Returns:
+            list[str]: list of mount points
+        """
+        return self.drives()
+    
+    def volumeID(self, drive: str) -> str:
+        """Returns an ID which identifies the volume of a drive
+
+        Args:
+            drive (str): Drive name
+
+        Returns:
+            str: ID of the volume
+        """
+        return f"dev{os.stat(drive).st_dev}"
+    
+    def autostart(self) -> str:
+        """Returns the path to the autostart folder
+
+        Returns:
+            str: path as string
+        """
+        return ""
+    
+    @abstractmethod
+    def addToAutostart(self, path: str) -> None:
+        """Starts the program whenever the user logs in
+
+        Args:
+            path (str): path to the executable
+        """
+    
+    @abstractmethod
+    def openFolder(self, folder: str) -> None:
+        """Opens a folder in the file manager
+
+        Args:
+            folder (str): path to the folder
+        """
+
+
+class WindowsBackend(OSMBackend):
+    """Uses the logical drives, volume serials and registry of Windows
+    """
+    def drives(self) -> list[str]:
+        return win32api.GetLogicalDriveStrings().split("\000")[:-1] # C:\\ & E:\\
+    
+    def volumeID(self, drive: str) -> str:
+        """Returns an ID which identifies the volume of a drive,
+        even if it gets a different drive letter next time.
+        
+        Uses the volume's serial number and falls back to the device number
+        if the volume doesn't have one (e.g. some network shares).
+
+        Args:
+            drive (str): Drive name (e.g. "C:\\")
+
+        Returns:
+            str: ID of the volume
+        """
+        try:
+            serial = win32api.GetVolumeInformation(drive)[1]
+            return f"{serial & 0xFFFFFFFF:08X}"
+        except Exception as e:
+            warnings.warn(f"Couldn't get the volume serial of {drive} ({e})", Warning)
+            return super().volumeID(drive)
+    
+    def autostart(self) -> str:
+        appdata = os.getenv("appdata")
+        if appdata:
+            return appdata+"\\Microsoft\\Windows\\Start Menu\\Programs\\Startup"
+        else:
+            return ""
+    
+    def addToAutostart(self, path: str) -> None:
+        """Adds the program to the autorun in Windows registry
+        """
+        key = winreg.HKEY_CURRENT_USER
+        key_value = "Software\\Microsoft\\Windows\\CurrentVersion\\Run"
+        
+        open = winreg.OpenKey(key, key_value, 0, winreg.KEY_ALL_ACCESS)
+        
+        winreg.SetValueEx(open, "FlashBar", 0, winreg.REG_SZ, path)
+        winreg.CloseKey(open)
+    
+    def openFolder(self, folder: str) -> None:
+        subprocess.run(['explorer', folder], check=False)
+
+
+class LinuxBackend(OSMBackend):
+    """Finds the volumes in /proc/self/mounts and identifies
+    them by their file system UUID
+    """
+    def mounts(self) -> list[tuple[str, str, str]]:
+        """Reads every mount of the system
+
+        Returns:
+            list[tuple[str, str, str]]: list of (device, mount point, file system type)
+        """
+        mounts = []
+        try:
+            with open("/proc/self/mounts", "r") as mountFile:
+                for line in mountFile:
+                    fields = line.split()
+                    if len(fields) < 3:
+                        continue
+                    # spaces and tabs in mount points are escaped as octal (e.g. \040)
+                    mountPoint = re.sub(r"\\([0-7]{3})", lambda match: chr(int(match.group(1), 8)), fields[1])
+                    mounts.append((fields[0], mountPoint, fields[2]))
+        except OSError as e:
+            warnings.warn(f"Couldn't read the mounts ({e})", Warning)
+            mounts.append(("rootfs", "/", "rootfs"))
+        return mounts
+    
+    def drives(self) -> list[str]:
+        """Returns the mount point of every physical file system.
+        
+        Pseudo file systems are skipped and a file system that is
+        mounted more than once (bind mounts) is only returned once.
+
+        Returns:
+            list[str]: list of mount points (e.g. ["/", "/home"])
+        """
+        drives = []
+        devices = set()
+        for device, mountPoint, fsType in self.mounts():
+            if fsType in PSEUDO_FILESYSTEMS:
+                continue
+            try:
+                stDev = os.stat(mountPoint).st_dev
+            except OSError:
+                continue
+            if stDev in devices:
+                continue
+            devices.add(stDev)
+            drives.append(mountPoint)
+        return drives
+    
+    def mountPoints(self) -> list[str]:
+        return [mountPoint for device, mountPoint, fsType in self.mounts()]
+    
+    def volumeID(self, drive: str) -> str:
+        """Returns the UUID of the file system mounted at the drive,
+        so a USB stick keeps its ID wherever it gets mounted.
+        Falls back to the device number.
+
+        Args:
+            drive (str): Mount point (e.g. "/home")
+
+        Returns:
+            str: ID of the volume
+        """
+        devices = {mountPoint: device for device, mountPoint, fsType in self.mounts()}
+        device = devices.get(drive)
+        if device and device.startswith("/dev/"):
+            try:
+                for uuid in os.listdir("/dev/disk/by-uuid"):
+                    if os.path.realpath(os.path.join("/dev/disk/by-uuid", uuid)) == os.path.realpath(device):
+                        return uuid
+            except OSError:
+                pass
+        return super().volumeID(drive)
+    
+    def autostart(self) -> str:
+        config = os.getenv("XDG_CONFIG_HOME") or os.path.expanduser("~/.config")
+        return os.path.join(config, "autostart")
+    
+    def addToAutostart(self, path: str) -> None:
+        """Adds a .desktop entry to the XDG autostart folder
+        """
+        os.makedirs(self.autostart(), exist_ok=True)
+        with open(os.path.join(self.autostart(), "flashbar.desktop"), "w") as desktop:
+            desktop.write(f"[Desktop Entry]\nType=Application\nName=FlashBar\nExec={sys.executable} {path}\n")
+    
+    def openFolder(self, folder: str) -> None:
+        subprocess.run(['xdg-open', folder], check=False)
+
+
+class OSM:
+    """This class manages most of the work with the OS itself
+    
+    Everything that depends on the platform is handed over to
+    the backend of the current OS.
+    """
+    def __init__(self) -> None:
+        self.backend: OSMBackend = WindowsBackend() if sys.platform == "win32" else LinuxBackend()
+    
+    @property
+    def autostart(self) -> str:
+        """Returns the path to the autostart folder
+
+        Returns:
+            str: path as string
+        """
+        return self.backend.autostart()
+    
+    @property
+    def drives(self) -> list[str]:
+        """Returns the list of logical drives (Windows)
+        or physical mount points (Linux) in the system
+        
+        Returns:
+            list[str]: list of drives
+        """
+        return self.backend.drives()
+    
+    @property
+    def mountPoints(self) -> list[str]:
+        """Returns every mount point, even the ones that aren't crawled
+
+        Returns:
+            list[str]: list of mount points
+        """
+        return self.backend.mountPoints()
+    
+    def volumeID(self, drive: str) -> str:
+        """Returns an ID which identifies the volume of a drive,
+        even if it gets a different drive letter or mount point next time.
+
+        Args:
+            drive (str): Drive name (e.g. "C:\\" or "/home")
+
+        Returns:
+            str: ID of the volume
+        """
+        return self.backend.volumeID(drive)
+    
+    def openFolder(self, folder: str) -> None:
+        """Opens a folder in the file manager of the OS
+
+        Args:
+            folder (str): path to the folder
+        """
+        self.backend.openFolder(folder)
+    
+    def fileSize(self, path: str) -> int:
+        try:
+            return os.path.getsize(path)
+        except Exception as e:
+            warnings.warn(str(e), Warning)
+            return -1
+    
+    def dirFiles(self, root: str) -> list:
+        """Returns the full file path of each file in a directory
+        
+        Args:
+            root (str): root path
+            
+        Returns:
+            list: list of full paths
+        """
+        # root + file for each file in directory if its actually a file lol
+        try:
+            return [os.path.join(root, file) for file in os.listdir(root) if os.path.isfile(os.path.join(root, file))]
+        except Exception as e:
+            print(e)
+            return []
+    
+    def splitPath(self, path: str) -> list:
+        """Splits path up into two.
+        
+        - Path
+        - Filename
+        
+        Args:
+            path (str): full path to the file
+        
+        Returns:
+            list: splitted up list
+        """
+        return path.rsplit(os.sep, 1)
+    
+    def exeDir(self) -> str:
+        """Returns the directory of the file executed to launch the app.
+        
+        This is very useful for whenever the app is launched by autorun
+        as usually windows sets the cwd (current working directory) to sys32.
+        
+        To counter this every class which uses the filesystem needs access to this class
+        and this function so we can work with paths relative to the executable file.
+
+        Returns:
+            str: Path as string
+        """
+        # if getattr(sys, 'frozen', False):
+        #     path = sys.executable
+        # else:
+        #     path = os.path.abspath(sys.argv[0])
+        return self.splitPath(sys.executable if getattr(sys, 'frozen', False) else os.path.abspath(sys.argv[0]))[0]
+    
+    def _RunRegistry(self) -> None:
+        """Adds the program to the autorun of the OS
+        """
+        if getattr(sys, 'frozen', False):
+            path = sys.executable
+        else:
+            path = os.path.abspath(sys.argv[0])
+        self.backend.addToAutostart(path)
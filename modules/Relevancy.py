@@ -14,6 +14,7 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+from collections import deque
 from dataclasses import (
     dataclass,
     field
@@ -22,80 +23,162 @@ from datetime import (
     datetime,
     timedelta
 )
-from typing import Union, List
+from typing import Union, Deque
+
+# a click counts half as much after this time
+HALF_LIFE = timedelta(weeks=1)
+# amount of the latest clicks that are kept
+RECENT_CLICKS = 16
+# files clicked this often within FREQUENT_WITHIN are boosted
+FREQUENT_CLICKS = 10
+FREQUENT_WITHIN = timedelta(weeks=1)
+FREQUENT_BOOST = 4
+
+def decay(age: timedelta) -> float:
+    """Returns how much a click of the given age still counts
+
+    Args:
+        age (timedelta): time since the click
+
+    Returns:
+        float: 1 for a click right now, 0.5 after HALF_LIFE and so on
+    """
+    return 0.5 ** (age / HALF_LIFE)
 
 @dataclass
 class Relevance:
-    path: str
-    clicks: List[datetime] = field(default_factory=list)
+    """Frecency of a file: how often and how recently it was opened.
     
-    @property
-    def accesses(self) -> int:
-        return len(self.clicks)
+    Instead of every click, only a decayed score is kept, which is
+    updated on every click, and the latest RECENT_CLICKS clicks.
+    So the score is calculated in constant time and the user data
+    doesn't grow with every click.
+    """
+    path: str
+    # sum of all clicks decayed to `updated`
+    score: float = 0.0
+    updated: Union[datetime, None] = None
+    accesses: int = 0
+    recent: Deque[datetime] = field(default_factory=lambda: deque(maxlen=RECENT_CLICKS))
     
     @property
     def lastAccess(self) -> Union[datetime, None]:
-        if len(self.clicks) == 0:
+        if len(self.recent) == 0:
             return None
-        return self.clicks[-1]
+        return self.recent[-1]
+    
+    def click(
+        self, 
+        at: Union[datetime, None] = None
+    ) -> None:
+        """Counts a click on the file
+
+        Args:
+            at (Union[datetime, None], optional): time of the click. Defaults to now.
+        """
+        if at is None:
+            at = datetime.today()
+        if self.updated is None or at >= self.updated:
+            self.score = self.scoreAt(at) + 1
+            self.updated = at
+        else:
+            self.score += decay(self.updated - at)
+        self.accesses += 1
+        self.recent.append(at)
+    
+    def scoreAt(
+        self, 
+        now: datetime
+    ) -> float:
+        """Returns the decayed score at a given time
+
+        Args:
+            now (datetime): time the score is calculated for
+
+        Returns:
+            float: sum of every click, each one decayed by its age
+        """
+        if self.updated is None:
+            return 0.0
+        return self.score * decay(now - self.updated)
+    
+    def isFrequentAt(
+        self, 
+        now: datetime
+    ) -> bool:
+        # only the latest clicks are kept, which are enough to tell
+        return sum(1 for click in self.recent if click >= now - FREQUENT_WITHIN) >= FREQUENT_CLICKS
     
     @property
     def isFrequent(self) -> bool:
-        accessesInWeek = 0
-        today = datetime.today()
-        
-        for click in self.clicks:
-            if click >= (today - timedelta(weeks=1)):
-                accessesInWeek += 1
-        return accessesInWeek >= 10
+        return self.isFrequentAt(datetime.today())
     
-    @property
-    def relevanceScore(self) -> int:
-        rating = self.accesses
-        if rating == 0:
-            return 0
-        
-        if self.lastAccess:
-            LastAccess = self.lastAccess
-            timeDifference = datetime.today() - LastAccess
-            rating -= timeDifference.days
-        
-        if self.clicks:
-            # >10x in 7d
-            if self.isFrequent:
-                rating *= 4
+    def relevanceScoreAt(
+        self, 
+        now: datetime
+    ) -> float:
+        """Returns the relevance score at a given time, so a list
+        can be sorted with the same time for every file
+
+        Args:
+            now (datetime): time the score is calculated for
+
+        Returns:
+            float: decayed score, boosted if the file is used frequently
+        """
+        rating = self.scoreAt(now)
+        # >10x in 7d
+        if self.isFrequentAt(now):
+            rating *= FREQUENT_BOOST
         return rating
     
+    @property
+    def relevanceScore(self) -> float:
+        return self.relevanceScoreAt(datetime.today())
+    
     def toDict(self) -> dict:
         return {
             'path': self.path,
-            'clicks': [dt.isoformat() for dt in self.clicks]
+            'score': self.score,
+            'updated': self.updated.isoformat() if self.updated else None,
+            'accesses': self.accesses,
+            'recent': [dt.isoformat() for dt in self.recent]
         }
     
     @classmethod
     def fromDict(cls, data: dict) -> 'Relevance':
+        if "clicks" in data:
+            # older user data kept every click, they're counted again in order
+            relevance = cls(path = data["path"])
+            for click in sorted(datetime.fromisoformat(dt) for dt in data["clicks"]):
+                relevance.click(click)
+            return relevance
+        
         return cls(
             path = data["path"],
-            clicks = [datetime.fromisoformat(dt) for dt in data.get("clicks", [])]
+            score = data.get("score", 0.0),
+            updated = datetime.fromisoformat(data["updated"]) if data.get("updated") else None,
+            accesses = data.get("accesses", 0),
+            recent = deque((datetime.fromisoformat(dt) for dt in data.get("recent", [])), maxlen=RECENT_CLICKS)
         )
 
 
 if __name__ == "__main__":
-    dummyObj = Relevance(
-        "C:\\hello.txt",
-        [
-            datetime(2024, 6, 26, 11, 30, 0),
-            datetime(2025, 6, 26, 12, 30, 0),
-            datetime(2025, 6, 26, 13, 30, 0),
-            datetime(2025, 6, 26, 14, 30, 0),
-            datetime(2025, 6, 26, 15, 30, 0),
-            datetime(2025, 6, 26, 16, 30, 0),
-            datetime(2025, 6, 26, 17, 30, 0),
-            datetime(2025, 6, 26, 18, 30, 0),
-            datetime(2025, 6, 26, 19, 30, 0),
-            datetime(2025, 6, 26, 20, 30, 0),
-            datetime(2025, 6, 26, 21, 00, 0),
+    dummyObj = Relevance.fromDict({
+        'path': "C:\\hello.txt",
+        'clicks': [
+            "2024-06-26T11:30:00",
+            "2025-06-26T12:30:00",
+            "2025-06-26T13:30:00",
+            "2025-06-26T14:30:00",
+            "2025-06-26T15:30:00",
+            "2025-06-26T16:30:00",
+            "2025-06-26T17:30:00",
+            "2025-06-26T18:30:00",
+            "2025-06-26T19:30:00",
+            "2025-06-26T20:30:00",
+            "2025-06-26T21:00:00",
         ]
-    )
+    })
     print(dummyObj.isFrequent)
-    print(dummyObj.relevanceScore)
\ No newline at end of file
+    print(dummyObj.relevanceScore)
@@ -0,0 +1,300 @@
+# FlashBar - ./modules/ResultModel.py -> Model behind the list of search results.
+# Copyright (C) 2025  Florian, Floerianc on Github (https://www.github.com/floerianc)
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+from PyQt5.QtCore import (
+    Qt,
+    QAbstractListModel,
+    QModelIndex,
+    pyqtSignal
+)
+from PyQt5.QtGui import (
+    QBrush,
+    QColor,
+    QIcon
+)
+from typing import (
+    Any,
+    Callable,
+    Union
+)
+from modules.IconCache import IconCache
+from modules.MetadataService import (
+    FileMetadata,
+    MetadataService
+)
+
+# the full path of a row, works for list widget items too
+PATH_ROLE = Qt.ItemDataRole.UserRole
+
+class ResultModel(QAbstractListModel):
+    """Holds the results of a search as entries of the index,
+    (template ID, name) tuples, with the templates they were found with.
+    The template IDs can be remapped by the template collection later,
+    the templates of the search keep matching them.
+
+    Nothing is done for a row until the view asks for it: its full path is
+    only put together once it's needed and then cached. The first time
+    a row becomes visible its metadata is requested from the MetadataService.
+    Until it's there, the row shows the icon of its extension. Then the icon,
+    the tool-tip and if the file still exists are cached until the next search.
+    So the view only pays for the rows on screen, no matter how many results
+    there are, and never waits for the filesystem.
+
+    Rows of files that don't exist anymore are greyed out and `missing`
+    is emitted for them, so they can be removed from the index.
+
+    Instead of results the model can also show a single message
+    (e.g. "Loading..."), which has no path.
+
+    **Inherits from QAbstractListModel**
+    """
+    missing = pyqtSignal(str)
+
+    def __init__(
+        self,
+        metadata: MetadataService,
+        toolTip: Callable[[str, FileMetadata], str]
+    ) -> None:
+        """Initializes the ResultModel
+
+        Args:
+            metadata (MetadataService): fetches the metadata of the visible rows
+            toolTip (Callable[[str, FileMetadata], str]): creates the tool-tip of a path
+        """
+        super().__init__()
+        self.metadata = metadata
+        self.toolTip = toolTip
+        self.entries: list[tuple[int, str]] = []
+        self.templates: dict[str, str] = {}
+        # row -> full path, only for rows whose path was needed
+        self.paths: dict[int, str] = {}
+        # full path -> rows, so the metadata finds its rows
+        self.rows: dict[str, list[int]] = {}
+        self.message: Union[str, None] = None
+        # row -> (exists, icon, tool-tip), only for rows whose metadata is there
+        self.decorations: dict[int, tuple[bool, QIcon, str]] = {}
+        self.metadata.resolved.connect(self.update)
+
+    def rowCount( # type: ignore
+        self,
+        parent: QModelIndex = QModelIndex()
+    ) -> int:
+        """Returns the amount of rows
+
+        Args:
+            parent (QModelIndex, optional): always invalid for lists. Defaults to QModelIndex().
+
+        Returns:
+            int: amount of results or 1 if a message is shown
+        """
+        if parent.isValid():
+            return 0
+        if self.message is not None:
+            return 1
+        return len(self.entries)
+
+    def setEntries(
+        self,
+        entries: list[tuple[int, str]],
+        templates: dict[str, str]
+    ) -> None:
+        """Replaces the rows with new results
+
+        Args:
+            entries (list[tuple[int, str]]): (template ID, name) of the results
+            templates (dict[str, str]): templates of the index the results were found in
+        """
+        self.beginResetModel()
+        self.entries = list(entries)
+        self.templates = templates
+        self.paths = {}
+        self.rows = {}
+        self.message = None
+        self.decorations = {}
+        self.endResetModel()
+
+    def setMessage(
+        self,
+        message: str
+    ) -> None:
+        """Replaces the rows with a single message
+
+        Args:
+            message (str): Text of the message (e.g. "Loading...")
+        """
+        self.beginResetModel()
+        self.entries = []
+        self.templates = {}
+        self.paths = {}
+        self.rows = {}
+        self.message = message
+        self.decorations = {}
+        self.endResetModel()
+
+    def clear(self) -> None:
+        """Removes every row
+        """
+        self.setEntries([], {})
+
+    def directory(
+        self,
+        row: int
+    ) -> str:
+        """Returns the directory of a row
+
+        Args:
+            row (int): row of the result
+
+        Returns:
+            str: template of the entry, empty if its template is missing
+        """
+        return self.templates.get(str(self.entries[row][0]), "")
+
+    def path(
+        self,
+        row: int
+    ) -> str:
+        """Returns the full path of a row, it's put together the first time
+
+        Args:
+            row (int): row of the result
+
+        Returns:
+            str: Full path to the file
+        """
+        path = self.paths.get(row)
+        if path is None:
+            path = self.paths[row] = os.path.join(self.directory(row), self.entries[row][1])
+            self.rows.setdefault(path, []).append(row)
+        return path
+
+    def decoration(
+        self,
+        path: str,
+        metadata: FileMetadata
+    ) -> tuple[bool, QIcon, str]:
+        """Creates the icon and tool-tip of a path from its metadata
+
+        Args:
+            path (str): Full path to the file
+            metadata (FileMetadata): metadata of the file
+
+        Returns:
+            tuple[bool, QIcon, str]: if it exists, icon and tool-tip
+        """
+        if metadata.exists:
+            return (True, IconCache.instance().icon(path, metadata.isDir), self.toolTip(path, metadata))
+        self.missing.emit(path)
+        return (False, QIcon(), "This file doesn't exist anymore.")
+
+    def decorate(
+        self,
+        row: int
+    ) -> tuple[bool, QIcon, str]:
+        """Returns the decoration of a row. If its metadata isn't
+        there yet, it's requested and a placeholder is returned.
+
+        Args:
+            row (int): row of the result
+
+        Returns:
+            tuple[bool, QIcon, str]: if it exists, icon and tool-tip
+        """
+        decoration = self.decorations.get(row)
+        if decoration is None:
+            path = self.path(row)
+            metadata = self.metadata.get(path)
+            if metadata is None:
+                # `update()` replaces it once the metadata is there
+                return (True, IconCache.instance().icon(path, False), "Loading...")
+            decoration = self.decoration(path, metadata)
+            self.decorations[row] = decoration
+        return decoration
+
+    def update(
+        self,
+        path: str,
+        metadata: FileMetadata
+    ) -> None:
+        """Decorates the rows of a path once its metadata was fetched
+
+        Args:
+            path (str): Full path to the file
+            metadata (FileMetadata): metadata of the file
+        """
+        rows = self.rows.get(path)
+        if not rows:
+            return
+        decoration = self.decoration(path, metadata)
+        roles = [Qt.ItemDataRole.DecorationRole, Qt.ItemDataRole.ToolTipRole, Qt.ItemDataRole.ForegroundRole]
+        for row in rows:
+            self.decorations[row] = decoration
+            self.dataChanged.emit(self.index(row), self.index(row), roles)
+
+    def data( # type: ignore
+        self,
+        index: QModelIndex,
+        role: int = Qt.ItemDataRole.DisplayRole
+    ) -> Any:
+        """Returns the data of a row for a role
+
+        Args:
+            index (QModelIndex): index of the row
+            role (int, optional): requested role. Defaults to Qt.ItemDataRole.DisplayRole.
+
+        Returns:
+            Any: display text, icon, tool-tip, colour or path of the row, None for every other role
+        """
+        if not index.isValid():
+            return None
+        if self.message is not None:
+            return self.message if role == Qt.ItemDataRole.DisplayRole else None
+
+        row = index.row()
+        if row >= len(self.entries):
+            return None
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            return f"{self.entries[row][1]} ({self.directory(row)})"
+        elif role == PATH_ROLE:
+            return self.path(row)
+        elif role == Qt.ItemDataRole.DecorationRole:
+            return self.decorate(row)[1]
+        elif role == Qt.ItemDataRole.ToolTipRole:
+            return self.decorate(row)[2]
+        elif role == Qt.ItemDataRole.ForegroundRole:
+            if not self.decorate(row)[0]:
+                return QBrush(QColor(Qt.GlobalColor.gray))
+        return None
+
+    def flags( # type: ignore
+        self,
+        index: QModelIndex
+    ) -> Qt.ItemFlags:
+        """Messages can't be selected, every result can
+
+        Args:
+            index (QModelIndex): index of the row
+
+        Returns:
+            Qt.ItemFlags: flags of the row
+        """
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        if self.message is not None:
+            return Qt.ItemFlag.ItemIsEnabled
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
@@ -0,0 +1,71 @@
+# FlashBar - ./modules/StartupProfile.py -> Measures how long each phase of the start takes.
+# Copyright (C) 2025  Florian, Floerianc on Github (https://www.github.com/floerianc)
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# imported before anything else by app.py, so it must not import anything heavy itself
+import time
+import logging
+
+class StartupProfile:
+    """Remembers how long every phase of the start took,
+    from the imports until the shards are mounted.
+
+    `mark()` ends the current phase. If profiling is enabled
+    (`--profile-startup`), `report()` prints and logs a table of all
+    phases once the start is done, otherwise it does nothing.
+    """
+    def __init__(
+        self,
+        enabled: bool
+    ) -> None:
+        """Initializes the StartupProfile, the first phase starts now
+
+        Args:
+            enabled (bool): If the phases should be reported
+        """
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self.last = self.started
+        self.phases: list[tuple[str, float]] = []
+        self.reported = False
+
+    def mark(
+        self,
+        phase: str
+    ) -> None:
+        """Ends the current phase
+
+        Args:
+            phase (str): name of the phase that just ended (e.g. "import PyQt5")
+        """
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def report(self) -> None:
+        """Prints and logs the duration of every phase, only once
+        """
+        if not self.enabled or self.reported:
+            return
+        self.reported = True
+
+        lines = ["Startup profile:"]
+        total = 0.0
+        for phase, duration in self.phases:
+            total += duration
+            lines.append(f"  {phase:<28}{duration * 1000:>9.1f} ms{total * 1000:>10.1f} ms")
+        report = "\n".join(lines)
+        print(report)
+        logging.getLogger().info(report)
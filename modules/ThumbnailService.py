@@ -0,0 +1,324 @@
+# FlashBar - ./modules/ThumbnailService.py -> Decodes and caches the image previews in the background.
+# Copyright (C) 2025  Florian, Floerianc on Github (https://www.github.com/floerianc)
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import queue
+import hashlib
+import itertools
+import threading
+from collections import OrderedDict
+from PyQt5.QtCore import (
+    Qt,
+    QObject,
+    pyqtSignal
+)
+from PyQt5.QtGui import (
+    QImage,
+    QImageReader
+)
+from typing import Union
+import modules.config as Config
+import modules.utils as utils
+from modules.OSM import OSM
+
+# the preview the user hovers over is decoded before any prefetched one
+HOVER_PRIORITY = 0
+PREFETCH_PRIORITY = 1
+# share of THUMBNAIL_DISK_CACHE left after the least recently used thumbnails were deleted
+DISK_CACHE_TRIM = 0.9
+
+class ThumbnailService(QObject):
+    """Decodes the image previews on worker threads, already downscaled
+    to THUMBNAIL_SIZE, so hovering over a huge image never stalls the UI.
+
+    Decoded thumbnails are kept in a LRU cache of THUMBNAIL_CACHE images
+    and saved to ./user/thumbnails/, keyed by the path, size and
+    modification time of the image, so a changed image is decoded again.
+    Once the folder is bigger than THUMBNAIL_DISK_CACHE MB, the least
+    recently used thumbnails (oldest modification time) are deleted,
+    a thumbnail that's loaded from the disk is touched.
+
+    `request()` is used for the hovered image, `prefetch()` for the images
+    visible in the results. A new request or prefetch drops the old one
+    that didn't start yet, so moving the mouse over a list only decodes
+    the image it stops at. `ready` is emitted on the GUI thread for every decoded image.
+
+    **Inherits from QObject**
+    """
+    ready = pyqtSignal(str, QImage)
+    # emitted by the workers, delivered to the thread of the service
+    decoded = pyqtSignal(str, QImage)
+
+    def __init__(self) -> None:
+        """Initializes the ThumbnailService and starts its workers
+        """
+        super().__init__()
+        self.config = Config.Config('UI')
+        self.cacheDir = os.path.join(OSM().exeDir(), "user", "thumbnails")
+        self.images: OrderedDict[str, QImage] = OrderedDict()
+        # path -> generation it was queued in, only prefetches
+        self.pending: dict[str, int] = {}
+        # hovered image, requests of other images are skipped
+        self.hoverPath: Union[str, None] = None
+        # size of the disk cache in bytes, counted by the first worker that saves a thumbnail
+        self.diskUsage: Union[int, None] = None
+        self.diskLock = threading.Lock()
+
+        self.queue: queue.PriorityQueue = queue.PriorityQueue()
+        self.order = itertools.count()
+        # prefetches of an older generation are skipped
+        self.generation = 0
+        self.decoded.connect(self.store)
+
+        self.workers = [
+            threading.Thread(target=self.work, name=f"thumbnails-{n}", daemon=True)
+            for n in range(max(1, self.config.THUMBNAIL_WORKERS))
+        ]
+        for worker in self.workers:
+            worker.start()
+
+    def isImage(
+        self,
+        path: str
+    ) -> bool:
+        """Returns True if a preview can be shown for the file
+
+        Args:
+            path (str): Full path to the file
+
+        Returns:
+            bool: True if the extension is an image extension
+        """
+        return path.lower().endswith(tuple(utils.imageExts))
+
+    def get(
+        self,
+        path: str
+    ) -> Union[QImage, None]:
+        """Returns the thumbnail of an image if it's in the memory cache
+
+        Args:
+            path (str): Full path to the image
+
+        Returns:
+            Union[QImage, None]: thumbnail or None if it has to be requested
+        """
+        image = self.images.get(path)
+        if image is not None:
+            self.images.move_to_end(path)
+        return image
+
+    def request(
+        self,
+        path: str
+    ) -> None:
+        """Decodes the thumbnail of the hovered image as soon as possible.
+        A request of the previously hovered image that didn't start yet is dropped.
+
+        Args:
+            path (str): Full path to the image
+        """
+        if path == self.hoverPath:
+            return
+        self.hoverPath = path
+        if path not in self.images:
+            self.queue.put((HOVER_PRIORITY, next(self.order), self.generation, path))
+
+    def cancelRequest(self) -> None:
+        """Drops the request of the hovered image if it didn't start yet,
+        e.g. when the mouse moved to a file without a preview.
+        """
+        self.hoverPath = None
+
+    def prefetch(
+        self,
+        paths: list[str]
+    ) -> None:
+        """Decodes the thumbnails of the visible images in the background.
+        Queued prefetches of earlier calls are dropped.
+
+        Args:
+            paths (list[str]): Full paths of the visible files, files without a preview are ignored
+        """
+        self.generation += 1
+        for path in paths:
+            if self.isImage(path):
+                self.enqueue(path, PREFETCH_PRIORITY)
+
+    def enqueue(
+        self,
+        path: str,
+        priority: int
+    ) -> None:
+        """Queues a prefetch of an image unless it's cached or queued already
+
+        Args:
+            path (str): Full path to the image
+            priority (int): PREFETCH_PRIORITY
+        """
+        if path in self.images or self.pending.get(path) == self.generation:
+            return
+        self.pending[path] = self.generation
+        self.queue.put((priority, next(self.order), self.generation, path))
+
+    def cachePath(
+        self,
+        path: str,
+        result: os.stat_result
+    ) -> str:
+        """Returns the path of an image's thumbnail on the disk
+
+        Args:
+            path (str): Full path to the image
+            result (os.stat_result): stat of the image
+
+        Returns:
+            str: path in ./user/thumbnails/
+        """
+        key = f"{path}|{result.st_size}|{result.st_mtime_ns}|{self.config.THUMBNAIL_SIZE}"
+        return os.path.join(self.cacheDir, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".png")
+
+    def decode(
+        self,
+        path: str
+    ) -> QImage:
+        """Loads the thumbnail from the disk cache or decodes the image
+        downscaled and saves it to the disk cache. Runs on a worker.
+
+        Args:
+            path (str): Full path to the image
+
+        Returns:
+            QImage: thumbnail, null if the image can't be read
+        """
+        try:
+            cached = self.cachePath(path, os.stat(path))
+        except OSError:
+            return QImage()
+
+        if os.path.exists(cached):
+            image = QImage(cached)
+            if not image.isNull():
+                try:
+                    # the modification time tells the disk cache which thumbnails were used last
+                    os.utime(cached)
+                except OSError:
+                    pass
+                return image
+
+        reader = QImageReader(path)
+        reader.setAutoTransform(True)
+        size = reader.size()
+        limit = self.config.THUMBNAIL_SIZE
+        if size.isValid() and (size.width() > limit or size.height() > limit):
+            # only the downscaled image is decoded, which is a lot faster for JPEGs
+            reader.setScaledSize(size.scaled(limit, limit, Qt.AspectRatioMode.KeepAspectRatio))
+        image = reader.read()
+        if image.isNull():
+            return image
+
+        try:
+            os.makedirs(self.cacheDir, exist_ok=True)
+            # written to a temporary file first, so other workers never read half a thumbnail
+            temporary = f"{cached}.{threading.get_ident()}.tmp"
+            if image.save(temporary, "PNG"):
+                os.replace(temporary, cached)
+                self.trimDiskCache(os.path.getsize(cached))
+        except OSError:
+            pass
+        return image
+
+    def trimDiskCache(
+        self,
+        added: int
+    ) -> None:
+        """Counts a new thumbnail in ./user/thumbnails/ and deletes the least
+        recently used ones down to DISK_CACHE_TRIM of THUMBNAIL_DISK_CACHE
+        once the folder is too big. Runs on a worker.
+
+        Args:
+            added (int): size of the new thumbnail in bytes
+        """
+        limit = self.config.THUMBNAIL_DISK_CACHE * 1024 * 1024
+        if limit <= 0:
+            return
+
+        with self.diskLock:
+            if self.diskUsage is None:
+                # the new thumbnail is already in the folder
+                self.diskUsage = sum(entry.stat().st_size for entry in os.scandir(self.cacheDir) if entry.name.endswith(".png"))
+            else:
+                self.diskUsage += added
+            if self.diskUsage <= limit:
+                return
+
+            thumbnails = []
+            for entry in os.scandir(self.cacheDir):
+                if entry.name.endswith(".png"):
+                    stat = entry.stat()
+                    thumbnails.append((stat.st_mtime, stat.st_size, entry.path))
+            thumbnails.sort()
+            self.diskUsage = sum(size for mtime, size, path in thumbnails)
+            for mtime, size, path in thumbnails:
+                if self.diskUsage <= limit * DISK_CACHE_TRIM:
+                    break
+                try:
+                    os.remove(path)
+                    self.diskUsage -= size
+                except OSError:
+                    pass
+
+    def work(self) -> None:
+        """Decodes queued images until `stop()` is called
+        """
+        while True:
+            priority, order, generation, path = self.queue.get()
+            if path is None:
+                return
+            if priority == PREFETCH_PRIORITY and generation != self.generation:
+                continue
+            # the mouse moved on before the request started or a prefetch decoded it meanwhile
+            if priority == HOVER_PRIORITY and (path != self.hoverPath or path in self.images):
+                continue
+            self.decoded.emit(path, self.decode(path))
+
+    def store(
+        self,
+        path: str,
+        image: QImage
+    ) -> None:
+        """Caches a decoded thumbnail and emits `ready`
+
+        Args:
+            path (str): Full path to the image
+            image (QImage): thumbnail, null if it couldn't be decoded
+        """
+        self.pending.pop(path, None)
+        if image.isNull():
+            return
+        self.images[path] = image
+        self.images.move_to_end(path)
+        while len(self.images) > max(1, self.config.THUMBNAIL_CACHE):
+            self.images.popitem(last=False)
+        self.ready.emit(path, image)
+
+    def stop(self) -> None:
+        """Lets the workers exit once their current image is decoded,
+        queued images are dropped
+        """
+        for worker in self.workers:
+            # sorted before every queued image, the workers are daemons so they don't block the exit
+            self.queue.put((HOVER_PRIORITY - 1, next(self.order), 0, None))
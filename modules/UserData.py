@@ -14,21 +14,35 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import os
 import json
-import pprint
 import zlib
-from typing import Any
+import logging
+import queue
+import threading
+import time
+from typing import (
+    Any,
+    Union
+)
 from modules.OSM import OSM
 from modules.Relevancy import Relevance
 
 osm = OSM()
+logger = logging.getLogger()
 
-def jsonify(userData: dict[str, list | dict]) -> dict[str, Any]:
-    for key in userData:
-        if key == "relevancy":
-            jsonable = {key: value.toDict() for key, value in userData['relevancy'].items()} # type: ignore
-            userData['relevancy'] = jsonable
-    return userData
+# the journal is compacted into the snapshot once it's bigger than this (bytes)
+JOURNAL_SIZE = 256 * 1024
+# changes made within this many seconds are written together
+GROUP_COMMIT = 0.05
+# keeps loading and compacting from seeing a half-replaced snapshot and journal
+fileLock = threading.Lock()
+
+def snapshotPath() -> str:
+    return os.path.join(osm.exeDir(), "user", "data.db")
+
+def journalPath() -> str:
+    return os.path.join(osm.exeDir(), "user", "data.journal")
 
 def dejsonify(userData: dict[str, list | dict]) -> dict[str, Any]:
     for key in userData:
@@ -37,25 +51,180 @@ def dejsonify(userData: dict[str, list | dict]) -> dict[str, Any]:
             userData['relevancy'] = dictable
     return userData
 
-def saveData(userData: dict[str, Any]) -> None:
-    with open(f"{osm.exeDir()}\\user\\data.db", "wb") as bmf:
-        shellCopy = userData.copy()
-        shellCopy = jsonify(shellCopy)
-        
-        jsonData = json.dumps(shellCopy)
-        compressed = zlib.compress(jsonData.encode(), 9)
+def applyRecord(
+    jsonData: dict[str, Any], 
+    record: dict[str, Any]
+) -> None:
+    """Applies a change of the journal to the json-able user data.
+    Every record holds the new value, so applying it twice does no harm.
+
+    Args:
+        jsonData (dict[str, Any]): json-able user data
+        record (dict[str, Any]): {"key": "recent" or "bookmarks", "value": list} or {"key": "relevancy", "path": str, "value": dict}
+    """
+    if record['key'] == "relevancy":
+        jsonData.setdefault('relevancy', {})[record['path']] = record['value']
+    else:
+        jsonData[record['key']] = record['value']
+
+def writeSnapshot(jsonData: dict[str, Any]) -> None:
+    """Replaces the snapshot with the json-able user data and clears the journal.
+    Has to be called with the fileLock held.
+
+    Args:
+        jsonData (dict[str, Any]): json-able user data
+    """
+    compressed = zlib.compress(json.dumps(jsonData).encode(), 9)
+    # written to a temporary file first, so a crash never leaves half a snapshot
+    temporary = snapshotPath() + ".tmp"
+    with open(temporary, "wb") as bmf:
         bmf.write(compressed)
+    os.replace(temporary, snapshotPath())
+    # the journal is older than the snapshot now, replaying it would do no harm but takes time
+    open(journalPath(), "w").close()
 
-def loadData() -> dict[str, Any] | None:
+def loadJson() -> dict[str, Any] | None:
+    """Loads the snapshot and replays the journal on top of it
+
+    Returns:
+        dict[str, Any] | None: json-able user data or None if there's none
+    """
+    jsonData = None
     try:
-        with open(f"{osm.exeDir()}\\user\\data.db", "rb") as bmf:
-            compressed = bmf.read()
-            decompressed = zlib.decompress(compressed)
-            decodedData = decompressed.decode()
-            jsonData = json.loads(decodedData)
-            dictData = dejsonify(jsonData)
-            pprint.pprint(dictData, indent=4)
-            return dictData
+        with open(snapshotPath(), "rb") as bmf:
+            jsonData = json.loads(zlib.decompress(bmf.read()).decode())
+    except FileNotFoundError:
+        pass
     except Exception as e:
-        print(e)
-        return None
\ No newline at end of file
+        logger.error("Couldn't load the user data snapshot (%s)", e)
+    
+    try:
+        with open(journalPath(), "r", encoding="utf-8") as journal:
+            for line in journal:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # a record can be cut off if the program was killed while writing it
+                    continue
+                if jsonData is None:
+                    jsonData = {'bookmarks': [], 'recent': [], 'relevancy': {}}
+                applyRecord(jsonData, record)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.error("Couldn't replay the user data journal (%s)", e)
+    return jsonData
+
+def loadData() -> dict[str, Any] | None:
+    with fileLock:
+        jsonData = loadJson()
+    if jsonData is None:
+        return None
+    return dejsonify(jsonData)
+
+class UserDataJournal:
+    """Saves changes of the user data in the background.
+    
+    Instead of writing the whole user data on every click, only the
+    changed value is queued. A writer thread appends everything queued
+    within GROUP_COMMIT seconds to ./user/data.journal with a single write.
+    Once the journal is bigger than JOURNAL_SIZE, it's compacted into
+    the snapshot ./user/data.db. `loadData()` replays the journal on top of the snapshot.
+    """
+    def __init__(self) -> None:
+        self.queue: queue.Queue[Union[dict[str, Any], None]] = queue.Queue()
+        self.writer = threading.Thread(target=self.work, name="user-data", daemon=True)
+        self.writer.start()
+    
+    def record(
+        self, 
+        key: str, 
+        value: Any, 
+        path: Union[str, None] = None
+    ) -> None:
+        """Queues a change of the user data
+
+        Args:
+            key (str): "recent", "bookmarks" or "relevancy"
+            value (Any): new list of recent files or bookmarks, or the `toDict()` of a Relevance. Mustn't be changed afterwards.
+            path (Union[str, None], optional): path of the Relevance. Defaults to None.
+        """
+        record: dict[str, Any] = {'key': key, 'value': value}
+        if path is not None:
+            record['path'] = path
+        self.queue.put(record)
+    
+    def work(self) -> None:
+        """Writes queued changes until `stop()` is called
+        """
+        stopped = False
+        while not stopped:
+            records = [self.queue.get()]
+            # everything queued meanwhile is written together
+            deadline = time.monotonic() + GROUP_COMMIT
+            while records[-1] is not None:
+                try:
+                    records.append(self.queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            if records[-1] is None:
+                stopped = True
+                records.pop()
+            
+            try:
+                if records:
+                    self.append(records)
+                    if os.path.getsize(journalPath()) > JOURNAL_SIZE:
+                        self.compact()
+            except OSError:
+                # nobody waits for the writer, so the error is only logged
+                logger.exception("Couldn't write the user data journal")
+    
+    def append(
+        self, 
+        records: list[dict[str, Any]]
+    ) -> None:
+        """Appends records to the journal with a single write
+
+        Args:
+            records (list[dict[str, Any]]): queued changes
+        """
+        lines = "".join(json.dumps(record) + "\n" for record in records)
+        with fileLock:
+            if self.cutOff():
+                lines = "\n" + lines
+            with open(journalPath(), "a", encoding="utf-8") as journal:
+                journal.write(lines)
+                journal.flush()
+                os.fsync(journal.fileno())
+    
+    def cutOff(self) -> bool:
+        """Returns True if the last record of the journal was cut off,
+        so the next one has to start on a new line
+
+        Returns:
+            bool: True if the journal doesn't end with a line break
+        """
+        try:
+            with open(journalPath(), "rb") as journal:
+                journal.seek(0, os.SEEK_END)
+                if journal.tell() == 0:
+                    return False
+                journal.seek(-1, os.SEEK_END)
+                return journal.read(1) != b"\n"
+        except FileNotFoundError:
+            return False
+    
+    def compact(self) -> None:
+        """Replays the journal into a new snapshot and clears the journal
+        """
+        with fileLock:
+            jsonData = loadJson()
+            if jsonData is not None:
+                writeSnapshot(jsonData)
+    
+    def stop(self) -> None:
+        """Writes every queued change and stops the writer
+        """
+        self.queue.put(None)
+        self.writer.join()
@@ -14,6 +14,7 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import os
 from configparser import ConfigParser
 from modules.OSM import OSM
 
@@ -32,7 +33,7 @@ class Config(ConfigParser):
         It creates a ConfigParser
         """
         super().__init__()
-        self.read(f"{OSM().exeDir()}\\user\\settings.cfg")
+        self.read(os.path.join(OSM().exeDir(), "user", "settings.cfg"))
         self.type = types
         
         map = {
@@ -52,6 +53,14 @@ class Config(ConfigParser):
         self.FADE_TIMER = self.getint('UI', 'FADE_TIMER', fallback=20)
         self.ICON_WIDTH = self.getint('UI', 'ICON_WIDTH', fallback=32)
         self.ICON_HEIGHT = self.getint('UI', 'ICON_HEIGHT', fallback=32)
+        self.NATIVE_ICONS = self.getboolean('UI', 'NATIVE_ICONS', fallback=False)
+        self.ICON_CACHE = self.getint('UI', 'ICON_CACHE', fallback=256)
+        self.METADATA_WORKERS = self.getint('UI', 'METADATA_WORKERS', fallback=4)
+        self.METADATA_TTL = self.getint('UI', 'METADATA_TTL', fallback=30)
+        self.THUMBNAIL_SIZE = self.getint('UI', 'THUMBNAIL_SIZE', fallback=256)
+        self.THUMBNAIL_CACHE = self.getint('UI', 'THUMBNAIL_CACHE', fallback=128)
+        self.THUMBNAIL_WORKERS = self.getint('UI', 'THUMBNAIL_WORKERS', fallback=2)
+        self.THUMBNAIL_DISK_CACHE = self.getint('UI', 'THUMBNAIL_DISK_CACHE', fallback=256)
     
     def Control(self) -> None:
         """Loads every setting from the Control section
@@ -59,16 +68,28 @@ class Config(ConfigParser):
         self.KEY1 = self.get("Control", "KEY1", fallback="ctrl")
         self.KEY2 = self.get("Control", "KEY2", fallback="space")
         self.DEBOUNCE = self.getint("Control", "DEBOUNCE", fallback=500)
+        self.MIN_DEBOUNCE = self.getint("Control", "MIN_DEBOUNCE", fallback=30)
     
     def Spider(self) -> None:
         """Loads every setting from the Spider section
         """
         self.BATCH_SIZE = self.getint("Spider", "BATCH_SIZE", fallback=16384)
+        self.QUEUE_BUDGET = self.getint("Spider", "QUEUE_BUDGET", fallback=64)
+        self.SEED_PRIORITY = self.getfloat("Spider", "SEED_PRIORITY", fallback=100.0)
+        self.PRIORITY_DECAY = self.getfloat("Spider", "PRIORITY_DECAY", fallback=0.5)
+        self.CHECKPOINT_INTERVAL = self.getint("Spider", "CHECKPOINT_INTERVAL", fallback=30)
+        self.CRAWL_BUDGET = self.getint("Spider", "CRAWL_BUDGET", fallback=50)
+        self.CRAWL_WORKERS = self.getint("Spider", "CRAWL_WORKERS", fallback=4)
+        self.LATENCY_TARGET = self.getint("Spider", "LATENCY_TARGET", fallback=20)
+        self.EXCLUDE = [rule.strip() for rule in self.get("Spider", "EXCLUDE", fallback="").splitlines() if rule.strip()]
     
     def DB(self) -> None:
         """Loads every setting from the DB section
         """
         self.CHUNK_SIZE = self.getint("DB", "CHUNK_SIZE", fallback=50000)
+        self.VOLUME_POLL = self.getint("DB", "VOLUME_POLL", fallback=5)
+        self.COMPACT_INTERVAL = self.getint("DB", "COMPACT_INTERVAL", fallback=60)
+        self.COMPACT_RATIO = self.getfloat("DB", "COMPACT_RATIO", fallback=0.25)
     
     def Search(self) -> None:
         """Loads every setting from the Search section
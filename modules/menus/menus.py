@@ -31,15 +31,17 @@ class Templates:
         openDir = QAction("Open Directory", menu)
         copyPath = QAction("Copy Path", menu)
         bookmark = QAction("Add to Bookmarks", menu)
+        refresh = QAction("Refresh Drive", menu)
         
-        curItem = cls.ui.searchResults.currentItem()
-        if curItem:
+        curItem = cls.ui.searchResults.currentIndex()
+        if curItem.isValid() and cls.pathOf(curItem):
             openFile.triggered.connect(lambda: cls.openFile(curItem))
             openDir.triggered.connect(lambda: cls.openDirectory(curItem))
-            copyPath.triggered.connect(lambda: cls.copyPath(cls.rebuildPath(curItem.text())))
+            copyPath.triggered.connect(lambda: cls.copyPath(cls.pathOf(curItem)))
             bookmark.triggered.connect(lambda: cls.addToBookmarks(curItem))
+            refresh.triggered.connect(lambda: cls.refreshDrive(cls.pathOf(curItem)))
         
-        menu.addActions([openFile, openDir, copyPath, bookmark])
+        menu.addActions([openFile, openDir, copyPath, bookmark, refresh])
         menu.exec_(event.globalPos())
         return True
     
@@ -54,7 +56,7 @@ class Templates:
         if curItem:
             openFile.triggered.connect(lambda: cls.openFile(curItem))
             openDir.triggered.connect(lambda: cls.openDirectory(curItem))
-            copyPath.triggered.connect(lambda: cls.copyPath(cls.rebuildPath(curItem.text())))
+            copyPath.triggered.connect(lambda: cls.copyPath(cls.pathOf(curItem)))
             rmBookmark.triggered.connect(lambda: cls.removeFromBookmarks(curItem, True))
         
         menu.addActions([openFile, openDir, copyPath, rmBookmark])
@@ -72,7 +74,7 @@ class Templates:
         if curItem:
             openFile.triggered.connect(lambda: cls.openFile(curItem))
             openDir.triggered.connect(lambda: cls.openDirectory(curItem))
-            copyPath.triggered.connect(lambda: cls.copyPath(cls.rebuildPath(curItem.text())))
+            copyPath.triggered.connect(lambda: cls.copyPath(cls.pathOf(curItem)))
             bookmark.triggered.connect(lambda: cls.addToBookmarks(curItem))
         
         menu.addActions([openFile, openDir, copyPath, bookmark])
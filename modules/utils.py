@@ -15,6 +15,7 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import os
+import functools
 import warnings
 from modules.OSM import OSM
 from dataclasses import dataclass
@@ -44,46 +45,50 @@ imageExts = [
     '.jpeg'
 ]
 
-def getIcon(filename: str) -> str:
-    """Returns the path to an icon for a certain extension
-    
-    It takes the file's name and then looks for the extension
-    of the file.
-    
-    It then looks at the extensionToIcon dictionary and looks
-    for a fitting icon for the specific extension.
+# extension -> name of the icon in ./icons/
+extensionToIcon = {
+    '.bmp': 'bmp',
+    '.csv': 'csv',
+    '.doc': 'doc',
+    '.docx': 'doc',
+    '.gif': 'gif',
+    '.html': 'html',
+    '.jpg': 'jpg',
+    '.jpeg': 'jpg',
+    '.json': 'json',
+    '.mp3': 'mp3',
+    '.mp4': 'mp4',
+    '.odt': 'odt',
+    '.pdf': 'pdf',
+    '.png': 'png',
+    '.tiff': 'tiff',
+    '.txt': 'txt',
+    '.xls': 'xls',
+    '.zip': 'zip',
+    ".exe": "exe",
+}
+
+@functools.lru_cache(maxsize=None)
+def iconDir() -> str:
+    """Returns the directory of the bundled icons.
+    The executable doesn't move, so it's only looked up once.
+
+    Returns:
+        str: path to ./icons/
+    """
+    return os.path.join(OSM().exeDir(), "icons")
+
+def iconName(filename: str) -> str:
+    """Returns the name of the bundled icon for a file's extension
 
     Args:
         filename (str): name of the file
 
     Returns:
-        str: path to the icon
+        str: name of the icon (e.g. "pdf"), "txt" if there's no fitting one
     """
     extension = os.path.splitext(filename)[1].lower()
-    extensionToIcon = {
-        '.bmp': 'bmp',
-        '.csv': 'csv',
-        '.doc': 'doc',
-        '.docx': 'doc',
-        '.gif': 'gif',
-        '.html': 'html',
-        '.jpg': 'jpg',
-        '.jpeg': 'jpg',
-        '.json': 'json',
-        '.mp3': 'mp3',
-        '.mp4': 'mp4',
-        '.odt': 'odt',
-        '.pdf': 'pdf',
-        '.png': 'png',
-        '.tiff': 'tiff',
-        '.txt': 'txt',
-        '.xls': 'xls',
-        '.zip': 'zip',
-        ".exe": "exe",
-    }
-
-    icon_name = extensionToIcon.get(extension, 'txt')  # fallback to 'txt' if not found
-    return f"{OSM().exeDir()}\\icons\\{icon_name}.png"
+    return extensionToIcon.get(extension, 'txt')  # fallback to 'txt' if not found
 
 def interpretSize(query: str) -> int:
     """Interprets a string as a size in bytes.
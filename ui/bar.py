@@ -33,9 +33,10 @@ class Ui_Form(object):
         self.tabs.setObjectName("tabs")
         self.tab = QtWidgets.QWidget()
         self.tab.setObjectName("tab")
-        self.searchResults = QtWidgets.QListWidget(self.tab)
+        self.searchResults = QtWidgets.QListView(self.tab)
         self.searchResults.setGeometry(QtCore.QRect(0, 0, 1000, 231))
         self.searchResults.setSizeAdjustPolicy(QtWidgets.QAbstractScrollArea.AdjustIgnored)
+        self.searchResults.setUniformItemSizes(True)
         self.searchResults.setObjectName("searchResults")
         self.tabs.addTab(self.tab, "")
         self.tab_2 = QtWidgets.QWidget()